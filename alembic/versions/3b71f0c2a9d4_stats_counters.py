@@ -0,0 +1,61 @@
+"""stats counters
+
+Revision ID: 3b71f0c2a9d4
+Revises: 08d2928adcf8
+Create Date: 2026-10-18 14:02:11.418230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3b71f0c2a9d4'
+down_revision: Union[str, Sequence[str], None] = '08d2928adcf8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+pr_status = postgresql.ENUM('OPEN', 'MERGED', name='pr_status', create_type=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stats_reviewer_assignments',
+    sa.Column('reviewer_id', sa.String(), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('reviewer_id')
+    )
+    op.create_table('stats_author_prs',
+    sa.Column('author_id', sa.String(), nullable=False),
+    sa.Column('status', pr_status, nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('author_id', 'status')
+    )
+    op.create_table('stats_pr_status',
+    sa.Column('status', pr_status, nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('status')
+    )
+
+    # начальное заполнение из существующих данных
+    op.execute(
+        "INSERT INTO stats_reviewer_assignments (reviewer_id, count) "
+        "SELECT reviewer_id, count(*) FROM pr_reviewers GROUP BY reviewer_id"
+    )
+    op.execute(
+        "INSERT INTO stats_author_prs (author_id, status, count) "
+        "SELECT author_id, status, count(*) FROM pull_requests GROUP BY author_id, status"
+    )
+    op.execute(
+        "INSERT INTO stats_pr_status (status, count) "
+        "SELECT status, count(*) FROM pull_requests GROUP BY status"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('stats_pr_status')
+    op.drop_table('stats_author_prs')
+    op.drop_table('stats_reviewer_assignments')
@@ -0,0 +1,42 @@
+"""daily stats rollups
+
+Revision ID: 5c2e9a7d1f36
+Revises: 3b71f0c2a9d4
+Create Date: 2026-10-18 15:27:40.512904
+
+History is not backfilled here; run `python -m app.commands.backfill_daily_stats`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e9a7d1f36'
+down_revision: Union[str, Sequence[str], None] = '3b71f0c2a9d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stats_daily_users',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('prs_opened', sa.BigInteger(), nullable=False),
+    sa.Column('prs_merged', sa.BigInteger(), nullable=False),
+    sa.Column('assignments', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'user_id')
+    )
+    op.create_table('stats_daily_merge_time',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('bucket', sa.SmallInteger(), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'bucket')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('stats_daily_merge_time')
+    op.drop_table('stats_daily_users')
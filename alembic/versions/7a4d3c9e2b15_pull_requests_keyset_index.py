@@ -0,0 +1,43 @@
+"""pull_requests keyset index
+
+Revision ID: 7a4d3c9e2b15
+Revises: 5c2e9a7d1f36
+Create Date: 2026-10-18 16:41:05.207318
+
+The index is built with CREATE INDEX CONCURRENTLY (outside of the migration
+transaction), so writes to pull_requests are not blocked while it is built.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4d3c9e2b15'
+down_revision: Union[str, Sequence[str], None] = '5c2e9a7d1f36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_pull_requests_created_at_id',
+            'pull_requests',
+            ['created_at', 'pull_request_id'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_pull_requests_created_at_id',
+            table_name='pull_requests',
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
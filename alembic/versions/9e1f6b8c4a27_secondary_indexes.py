@@ -0,0 +1,56 @@
+"""secondary indexes
+
+Revision ID: 9e1f6b8c4a27
+Revises: 7a4d3c9e2b15
+Create Date: 2026-10-18 17:20:52.883164
+
+Indexes are built with CREATE INDEX CONCURRENTLY (outside of the migration
+transaction), so writes are not blocked on large tables. If a concurrent build
+fails it leaves an INVALID index behind: drop it and re-run the upgrade.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '9e1f6b8c4a27'
+down_revision: Union[str, Sequence[str], None] = '7a4d3c9e2b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_pr_reviewers_reviewer_id', 'pr_reviewers', ['reviewer_id', 'pull_request_id'], None),
+    ('ix_pull_requests_author_id_status', 'pull_requests', ['author_id', 'status'], None),
+    ('ix_team_members_user_id', 'team_members', ['user_id'], None),
+    (
+        'ix_pull_requests_open_created_at_id',
+        'pull_requests',
+        ['created_at', 'pull_request_id'],
+        sa.text("status = 'OPEN'"),
+    ),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=where,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table, if_exists=True, postgresql_concurrently=True
+            )
@@ -0,0 +1,92 @@
+"""pr_reviewers created_at keyset index
+
+Revision ID: c3f9a1e7d254
+Revises: d1a7c5e93f08
+Create Date: 2026-10-18 21:05:37.412906
+
+/users/getReview filters by reviewer_id (pr_reviewers) and orders by
+(created_at, pull_request_id) of pull_requests: no single index serves both.
+The PR's created_at never changes, so it is copied to pr_reviewers and indexed
+together with reviewer_id; the new index replaces (reviewer_id, pull_request_id):
+it leads with reviewer_id as well, so it serves every lookup the old one did.
+
+The backfill runs outside of the migration transaction in primary-key batches,
+so no long transaction holds row locks over the whole table. NOT NULL is added
+through a NOT VALID check constraint: VALIDATE does not block writes, and
+SET NOT NULL then relies on the validated constraint instead of a scan under
+ACCESS EXCLUSIVE. Rows inserted by the previous app version while the
+migration runs are picked up by the final pass.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f9a1e7d254'
+down_revision: Union[str, Sequence[str], None] = 'd1a7c5e93f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 10_000
+NOT_NULL_CHECK = 'ck_pr_reviewers_pr_created_at_not_null'
+BACKFILL = (
+    "UPDATE pr_reviewers r SET pr_created_at = p.created_at "
+    "FROM pull_requests p WHERE p.pull_request_id = r.pull_request_id "
+    "AND r.pr_created_at IS NULL"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('pr_reviewers', sa.Column('pr_created_at', sa.DateTime(timezone=True), nullable=True))
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        last_id = bind.execute(sa.text("SELECT coalesce(max(id), 0) FROM pr_reviewers")).scalar_one()
+        for start in range(0, last_id, BATCH_SIZE):
+            bind.execute(
+                sa.text(BACKFILL + " AND r.id > :start AND r.id <= :stop"),
+                {'start': start, 'stop': start + BATCH_SIZE},
+            )
+        bind.execute(sa.text(BACKFILL))
+        op.execute(
+            f"ALTER TABLE pr_reviewers ADD CONSTRAINT {NOT_NULL_CHECK} "
+            "CHECK (pr_created_at IS NOT NULL) NOT VALID"
+        )
+        op.execute(f"ALTER TABLE pr_reviewers VALIDATE CONSTRAINT {NOT_NULL_CHECK}")
+        op.alter_column('pr_reviewers', 'pr_created_at', nullable=False)
+        op.drop_constraint(NOT_NULL_CHECK, 'pr_reviewers', type_='check')
+        op.create_index(
+            'ix_pr_reviewers_reviewer_created_at',
+            'pr_reviewers',
+            ['reviewer_id', 'pr_created_at', 'pull_request_id'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_pr_reviewers_reviewer_id',
+            table_name='pr_reviewers',
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_pr_reviewers_reviewer_id',
+            'pr_reviewers',
+            ['reviewer_id', 'pull_request_id'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_pr_reviewers_reviewer_created_at',
+            table_name='pr_reviewers',
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+    op.drop_column('pr_reviewers', 'pr_created_at')
@@ -1,19 +1,70 @@
-from collections.abc import AsyncGenerator
+import logging
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Annotated, Any
 
-from fastapi import Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Depends, Header
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.core.db import async_engine
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal, read_router
+from app.core.db_routing import READ_YOUR_WRITES_HEADER, ReadRouter, read_your_writes_pinned
 
+logger = logging.getLogger(__name__)
 
-async def get_session() -> AsyncGenerator[AsyncSession, Any]:
-    async with AsyncSession(bind=async_engine, expire_on_commit=False) as session:
+
+@asynccontextmanager
+async def session_scope(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> AsyncIterator[AsyncSession]:
+    """
+    Request session that holds a pooled connection only inside the service's
+    `async with db_session.begin()` blocks: AsyncSession checks one out on the first
+    statement and returns it when the block ends. Requests answered from a cache or
+    rejected before any query never touch the pool.
+
+    A transaction still open at teardown means a service read outside a block and
+    kept the connection for the whole response; it is rolled back and logged.
+    """
+    async with session_factory() as session:
         try:
             yield session
         except Exception:
             await session.rollback()
             raise
+        if session.in_transaction():
+            logger.warning("Request session still in a transaction at teardown, rolling back")
+            await session.rollback()
+
+
+async def get_session() -> AsyncGenerator[AsyncSession, Any]:
+    async with session_scope(AsyncSessionLocal) as session:
+        yield session
 
 
 DBSession = Annotated[AsyncSession, Depends(get_session)]
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """For work that outlives the request (background jobs)."""
+    return AsyncSessionLocal
+
+
+DBSessionFactory = Annotated[async_sessionmaker[AsyncSession], Depends(get_session_factory)]
+
+
+def get_read_router() -> ReadRouter:
+    return read_router
+
+
+def get_read_db(
+    router: Annotated[ReadRouter, Depends(get_read_router)],
+    read_your_writes: Annotated[str | None, Header(alias=READ_YOUR_WRITES_HEADER)] = None,
+) -> ReadRouter:
+    """Replicas for read-only service methods; primary for a client that has just written."""
+    if read_your_writes_pinned(read_your_writes, settings.DB_READ_YOUR_WRITES_SECONDS):
+        return router.primary_only()
+    return router
+
+
+DBRead = Annotated[ReadRouter, Depends(get_read_db)]
@@ -0,0 +1,273 @@
+import asyncio
+import hmac
+import logging
+import random
+import re
+import secrets
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.db_routing import READ_YOUR_WRITES_HEADER, issue_read_your_writes_token
+from app.core.metrics import (
+    HTTP_REQUEST_DB_QUERIES,
+    HTTP_REQUEST_DB_SECONDS,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_PROGRESS,
+)
+from app.core.profiling import PROFILE_HEADER, PROFILE_ID_HEADER, SamplingProfiler, write_profile
+from app.core.query_recorder import (
+    QueryRecorder,
+    current_query_recorder,
+    report_request,
+    request_query_recorder,
+)
+from app.core.traffic_capture import CapturedRequest, CaptureWriter, captured_headers
+
+logger = logging.getLogger(__name__)
+
+_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# ключ scope для маршрута, найденного до маршрутизации (расширения ASGI — "<пакет>.<имя>")
+_EXPECTED_ROUTE_KEY = "app.expected_route"
+
+
+class ReadYourWritesMiddleware:
+    """
+    Adds the read-your-writes token to successful responses of writing requests.
+    Clients that echo it back are served from the primary until replicas catch up.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in _SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_token(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = MutableHeaders(scope=message)
+                headers[READ_YOUR_WRITES_HEADER] = issue_read_your_writes_token()
+            await send(message)
+
+        await self.app(scope, receive, send_with_token)
+
+
+class MetricsMiddleware:
+    """
+    Per-route latency, status codes, in-flight requests and DB usage per request;
+    the request's QueryRecorder also enforces the per-route query budget.
+    Routes are labelled by their template (/team/deactivateUsers/jobs/{job_id}),
+    unknown paths share one label to keep the label set bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        recorder = request_query_recorder(method, lambda: _route_template(scope))
+        token = current_query_recorder.set(recorder)
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        # gauge нужен до маршрутизации: маршрут ищется заранее, один раз на запрос
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(
+            method=method, route=_expected_route_template(scope)
+        )
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = _route_template(scope)
+            recorder.resolve_route()
+            HTTP_REQUEST_DURATION.labels(method=method, route=route).observe(
+                time.perf_counter() - started
+            )
+            HTTP_REQUESTS.labels(method=method, route=route, status=str(status)).inc()
+            HTTP_REQUEST_DB_QUERIES.labels(method=method, route=route).observe(recorder.queries)
+            HTTP_REQUEST_DB_SECONDS.labels(method=method, route=route).observe(recorder.seconds)
+            in_progress.dec()
+            current_query_recorder.reset(token)
+            report_request(recorder)
+
+
+class ProfilingMiddleware:
+    """
+    Profiles single requests on demand: those carrying X-Profile with the
+    configured token, and a random PROFILING_SAMPLE_RATE share of the others.
+    The response gets X-Profile-Id, the name of the speedscope file and of the
+    text summary written to PROFILING_OUTPUT_DIR after the response is sent.
+    One profile at a time per worker: requests arriving meanwhile run as usual.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._busy = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._busy:
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        if not _profile_requested(scope, method):
+            await self.app(scope, receive, send)
+            return
+
+        self._busy = True
+        started_at = time.strftime("%Y%m%dT%H%M%S")
+        suffix = secrets.token_hex(3)
+        status = 500
+
+        def profile_id() -> str:
+            # к началу ответа маршрут уже выбран
+            route = re.sub(r"[^0-9A-Za-z]+", "_", _route_template(scope)).strip("_")
+            return f"{started_at}-{route}-{suffix}"
+
+        async def send_with_profile_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message)[PROFILE_ID_HEADER] = profile_id()
+            await send(message)
+
+        # recorder без бюджета: собирает SQL-запросы, в том числе из recorder запроса
+        recorder = QueryRecorder(label=f"{method} {scope['path']}")
+        token = current_query_recorder.set(recorder)
+        profiler = SamplingProfiler(
+            settings.PROFILING_INTERVAL_MS / 1000, settings.PROFILING_SHORT_SWITCH_INTERVAL
+        )
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.stop()
+            current_query_recorder.reset(token)
+            self._busy = False
+            title = f"{method} {scope['path']} ({_route_template(scope)}) -> {status}"
+            extra = [f"{recorder.queries} SQL statements, {recorder.seconds * 1000:.1f} ms in SQL"]
+            summary = await asyncio.to_thread(
+                write_profile, settings.PROFILING_OUTPUT_DIR, profile_id(), profiler, title, extra
+            )
+            logger.info("Request profile written to %s", summary)
+
+
+class TrafficCaptureMiddleware:
+    """
+    Writes a random TRAFFIC_CAPTURE_SAMPLE_RATE share of API requests (method,
+    path, body, status, duration) to rotating JSONL files for later replay.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._writer: CaptureWriter | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not scope["path"].startswith(settings.API_V1_PATH)
+            or random.random() >= settings.TRAFFIC_CAPTURE_SAMPLE_RATE
+        ):
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        # маршрут известен только после маршрутизации: фильтр по TRAFFIC_CAPTURE_ROUTES —
+        # перед записью, тело до этого копится только для попавших в выборку запросов
+        captured = CapturedRequest(
+            started_at=time.time(),
+            method=method,
+            path=scope["path"],
+            query=scope["query_string"].decode("latin-1"),
+            route="",
+            headers=captured_headers(scope["headers"]),
+        )
+
+        async def receive_capturing() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                captured.add_body(message.get("body", b""), settings.TRAFFIC_CAPTURE_MAX_BODY_BYTES)
+            return message
+
+        async def send_capturing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                captured.status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive_capturing, send_capturing)
+        finally:
+            captured.duration_ms = (time.perf_counter() - started) * 1000
+            captured.route = _route_template(scope)
+            if (
+                not settings.TRAFFIC_CAPTURE_ROUTES
+                or f"{method} {captured.route}" in settings.TRAFFIC_CAPTURE_ROUTES
+            ):
+                await self._write(captured)
+
+    async def _write(self, captured: CapturedRequest) -> None:
+        if self._writer is None:
+            self._writer = CaptureWriter(
+                settings.TRAFFIC_CAPTURE_DIR,
+                settings.TRAFFIC_CAPTURE_MAX_FILE_BYTES,
+                settings.TRAFFIC_CAPTURE_MAX_FILES,
+            )
+        # запись и ротация файла — в потоке: цикл событий не ждёт диск
+        await asyncio.to_thread(self._writer.write, captured)
+
+
+def _profile_requested(scope: Scope, method: str) -> bool:
+    if settings.PROFILING_TOKEN:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER.lower().encode():
+                return hmac.compare_digest(value, settings.PROFILING_TOKEN.encode())
+    if (
+        settings.PROFILING_SAMPLE_ROUTES
+        and f"{method} {_expected_route_template(scope)}" not in settings.PROFILING_SAMPLE_ROUTES
+    ):
+        return False
+    return random.random() < settings.PROFILING_SAMPLE_RATE
+
+
+def _route_template(scope: Scope) -> str:
+    """Template of the route chosen by the router (FastAPI puts it in scope["route"])."""
+    path = getattr(scope.get("route"), "path", None)
+    return path if isinstance(path, str) else "<unmatched>"
+
+
+def _expected_route_template(scope: Scope) -> str:
+    """
+    Route template for decisions taken before routing (in-progress gauge, profiling
+    by route). Looked up once per request and kept in scope; a full match wins over
+    a path-only one (same path, other method), as in the router.
+    """
+    if _EXPECTED_ROUTE_KEY not in scope:
+        partial = None
+        for route in scope["app"].router.routes:
+            path = getattr(route, "path", None)
+            if not isinstance(path, str):
+                continue
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                scope[_EXPECTED_ROUTE_KEY] = path
+                break
+            if match == Match.PARTIAL and partial is None:
+                partial = path
+        else:
+            scope[_EXPECTED_ROUTE_KEY] = partial or "<unmatched>"
+    return str(scope[_EXPECTED_ROUTE_KEY])
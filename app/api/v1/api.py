@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 
+from app.api.v1.export import export_endpoints
 from app.api.v1.health import health_endpoints
+from app.api.v1.internal import internal_endpoints
 from app.api.v1.pull_request import pull_request_endpoints
 from app.api.v1.stats import stats_endpoints
 from app.api.v1.team import team_endpoints
@@ -19,3 +21,7 @@ api_router.include_router(
 )
 
 api_router.include_router(stats_endpoints.router, tags=["stats"])
+
+api_router.include_router(export_endpoints.router, prefix="/export", tags=["export"])
+
+api_router.include_router(internal_endpoints.router, prefix="/internal", tags=["internal"])
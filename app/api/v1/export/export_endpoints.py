@@ -0,0 +1,37 @@
+import logging
+from datetime import date
+from typing import Annotated
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+
+from app.api.dependencies import DBSessionFactory
+from app.schemas.schema_enums.pull_request_enums import PRStatus
+from app.services.export_service import ExportService
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+service = ExportService()
+
+
+@router.get(
+    "/pull_requests",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "NDJSON: one pull request with assigned_reviewers per line",
+            "content": {"application/x-ndjson": {}},
+        }
+    },
+)
+async def export_pull_requests(
+    session_factory: DBSessionFactory,
+    status: PRStatus | None = None,
+    day_from: Annotated[date | None, Query(alias="from")] = None,
+    day_to: Annotated[date | None, Query(alias="to")] = None,
+):
+    created_from, created_to = service.resolve_range(day_from, day_to)
+    return StreamingResponse(
+        service.stream_pull_requests(session_factory, status, created_from, created_to),
+        media_type="application/x-ndjson",
+    )
@@ -0,0 +1,89 @@
+import logging
+import os
+
+from fastapi import APIRouter
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.db import async_engine, read_router, replica_engines
+from app.core.db_pool import engine_pool
+from app.schemas.internal import (
+    CacheStatsDTO,
+    CacheStatsResponse,
+    LatencyHistogramDTO,
+    PoolStatsDTO,
+    PoolStatsResponse,
+)
+from app.services.roster_cache import roster_cache
+from app.services.stats_service import stats_response_cache
+from app.services.team_service import team_response_cache
+from app.utils.histogram import LatencyHistogram
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@router.get("/cache", response_model=CacheStatsResponse)
+async def get_cache_stats():
+    caches = roster_cache.stats() | {
+        "stats_response": stats_response_cache.stats(),
+        "team_response": team_response_cache.stats(),
+    }
+    return CacheStatsResponse(
+        caches=[
+            CacheStatsDTO(
+                name=name,
+                hits=stats.hits,
+                misses=stats.misses,
+                hit_ratio=stats.hit_ratio,
+                size=stats.size,
+                maxsize=stats.maxsize,
+            )
+            for name, stats in caches.items()
+        ]
+    )
+
+
+@router.get("/pool", response_model=PoolStatsResponse)
+async def get_pool_stats():
+    # пулы свои в каждом воркере: ответ описывает только обработавший запрос процесс (pid)
+    engines = [("primary", async_engine)] + [
+        (target.name, engine)
+        for target, engine in zip(read_router.replicas, replica_engines, strict=True)
+    ]
+    return PoolStatsResponse(pools=[_pool_stats_dto(name, engine) for name, engine in engines])
+
+
+def _pool_stats_dto(name: str, engine: AsyncEngine) -> PoolStatsDTO:
+    pool = engine_pool(engine)
+    metrics = pool.metrics
+    return PoolStatsDTO(
+        name=name,
+        pid=os.getpid(),
+        size=pool.size(),
+        checked_out=pool.checkedout(),
+        checked_in=pool.checkedin(),
+        # до заполнения пула QueuePool считает overflow отрицательным
+        overflow=max(pool.overflow(), 0),
+        max_overflow=settings.DB_POOL_MAX_OVERFLOW,
+        checkouts=metrics.checkouts,
+        timeouts=metrics.timeouts,
+        liveness=settings.DB_POOL_LIVENESS,
+        liveness_pings=metrics.liveness_pings,
+        liveness_failures=metrics.liveness_failures,
+        wait=_histogram_dto(metrics.wait),
+        checkout=_histogram_dto(metrics.checkout),
+    )
+
+
+def _histogram_dto(histogram: LatencyHistogram) -> LatencyHistogramDTO:
+    return LatencyHistogramDTO(
+        count=histogram.count,
+        sum_ms=histogram.sum_ms,
+        max_ms=histogram.max_ms,
+        p50_ms=histogram.percentile(0.5),
+        p95_ms=histogram.percentile(0.95),
+        p99_ms=histogram.percentile(0.99),
+        bounds_ms=list(histogram.bounds),
+        counts=list(histogram.counts),
+    )
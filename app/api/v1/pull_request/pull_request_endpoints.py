@@ -4,8 +4,12 @@ from fastapi import APIRouter
 
 from app.api.dependencies import DBSession
 from app.schemas.pull_request import (
+    PullRequestCreateBatchRequest,
+    PullRequestCreateBatchResponse,
     PullRequestCreateRequest,
     PullRequestCreateResponse,
+    PullRequestMergeBatchRequest,
+    PullRequestMergeBatchResponse,
     PullRequestMergeRequest,
     PullRequestMergeResponse,
     PullRequestReassignRequest,
@@ -32,6 +36,14 @@ async def create_pull_request(
     return PullRequestCreateResponse(pr=pr)
 
 
+@router.post("/createBatch", response_model=PullRequestCreateBatchResponse)
+async def create_pull_requests_batch(
+    request: PullRequestCreateBatchRequest,
+    db_session: DBSession,
+):
+    return await service.create_pr_batch(db_session=db_session, items=request.items)
+
+
 @router.post(
     "/reassign",
     response_model=PullRequestReassignResponse,
@@ -61,3 +73,14 @@ async def merge_pull_request(
         pull_request_id=request.pull_request_id,
     )
     return PullRequestMergeResponse(pr=pr_dto)
+
+
+@router.post("/mergeBatch", response_model=PullRequestMergeBatchResponse)
+async def merge_pull_requests_batch(
+    request: PullRequestMergeBatchRequest,
+    db_session: DBSession,
+):
+    return await service.merge_pr_batch(
+        db_session=db_session,
+        pull_request_ids=request.pull_request_ids,
+    )
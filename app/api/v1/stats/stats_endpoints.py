@@ -1,9 +1,11 @@
 import logging
+from datetime import date
+from typing import Annotated
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, Query
 
-from app.api.dependencies import DBSession
-from app.schemas.stats import StatsResponse
+from app.api.dependencies import DBRead, DBSession
+from app.schemas.stats import StatsResponse, StatsWindowResponse
 from app.services.stats_service import StatsService
 
 router = APIRouter()
@@ -11,6 +13,25 @@ logger = logging.getLogger(__name__)
 service = StatsService()
 
 
-@router.get("/stats", response_model=StatsResponse)
-async def get_stats(db_session: DBSession):
-    return await service.get_stats(db_session)
+@router.get(
+    "/stats",
+    response_model=StatsResponse,
+    responses={304: {"description": "Not modified (If-None-Match matches ETag)"}},
+)
+async def get_stats(
+    read_db: DBRead,
+    if_none_match: str | None = Header(None),
+):
+    payload = await service.get_stats_payload(read_db)
+    return payload.to_response(if_none_match)
+
+
+@router.get("/stats/window", response_model=StatsWindowResponse)
+async def get_stats_window(
+    db_session: DBSession,
+    day_from: Annotated[date | None, Query(alias="from")] = None,
+    day_to: Annotated[date | None, Query(alias="to")] = None,
+    window: Annotated[str | None, Query(examples=["7d"])] = None,
+):
+    day_from, day_to = service.resolve_window(day_from, day_to, window)
+    return await service.get_window_stats(db_session, day_from, day_to)
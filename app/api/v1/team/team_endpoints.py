@@ -1,14 +1,18 @@
 import logging
+from typing import Annotated
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, Query, Request, Response
 
-from app.api.dependencies import DBSession
+from app.api.dependencies import DBRead, DBSession, DBSessionFactory
 from app.schemas.team import (
     TeamAddRequest,
     TeamAddResponse,
     TeamDeactivateUsersRequest,
     TeamDeactivateUsersResponse,
+    TeamDeactivationJobResponse,
+    TeamDeltaResponse,
     TeamGetResponse,
+    TeamImportResponse,
 )
 from app.services.team_service import TeamService
 
@@ -25,6 +29,7 @@ async def add_team(
     team = await service.create_team(db_session, request)
     return TeamAddResponse(team=team)
 
+
 @router.post("/add_or_update", response_model=TeamAddResponse, status_code=201)
 async def add_team(
     request: TeamAddRequest,
@@ -34,21 +39,56 @@ async def add_team(
     return TeamAddResponse(team=team)
 
 
+@router.post(
+    "/import",
+    response_model=TeamImportResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "description": "NDJSON, one TeamImportRow per line",
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}},
+        }
+    },
+)
+async def import_teams(request: Request, db_session: DBSession):
+    # тело читается потоком, без разбора целиком в память
+    return await service.import_ndjson(db_session, request.stream())
+
+
 @router.get(
     "/get",
-    response_model=TeamGetResponse,
+    response_model=TeamGetResponse | TeamDeltaResponse,
+    responses={304: {"description": "Not modified (If-None-Match matches ETag)"}},
 )
 async def get_team(
     team_name: str,
-    db_session: DBSession,
+    read_db: DBRead,
+    since: Annotated[int | None, Query(ge=0, description="version the client already has")] = None,
+    if_none_match: str | None = Header(None),
 ):
-    team = await service.get_team(db_session, team_name)
-    return TeamGetResponse(team=team)
+    payload = await read_db.run(service.get_team_payload, team_name, if_none_match, since)
+    return payload.to_response(if_none_match)
 
 
-@router.post("/deactivateUsers", response_model=TeamDeactivateUsersResponse)
+@router.post(
+    "/deactivateUsers",
+    response_model=TeamDeactivateUsersResponse | TeamDeactivationJobResponse,
+)
 async def deactivate_users(
     payload: TeamDeactivateUsersRequest,
     db: DBSession,
+    session_factory: DBSessionFactory,
+    response: Response,
+    run_async: bool = Query(False, alias="async"),
 ):
+    if run_async:
+        job = await service.start_deactivation_job(db, session_factory, payload)
+        response.status_code = 202
+        return TeamDeactivationJobResponse(job=job)
     return await service.deactivate_users_and_reassign_prs(db, payload)
+
+
+@router.get("/deactivateUsers/jobs/{job_id}", response_model=TeamDeactivationJobResponse)
+async def get_deactivation_job(job_id: str, db: DBSession):
+    job = await service.get_deactivation_job(db, job_id)
+    return TeamDeactivationJobResponse(job=job)
@@ -1,9 +1,13 @@
 import logging
+from typing import Annotated
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 
-from app.api.dependencies import DBSession
+from app.api.dependencies import DBRead, DBSession
+from app.schemas.schema_enums.pull_request_enums import PRStatus
 from app.schemas.user import (
+    REVIEWS_PAGE_DEFAULT_LIMIT,
+    REVIEWS_PAGE_MAX_LIMIT,
     UserReviewsResponse,
     UserSetIsActiveRequest,
     UserSetIsActiveResponse,
@@ -21,5 +25,13 @@ async def set_is_active(request: UserSetIsActiveRequest, db_session: DBSession):
 
 
 @router.get("/getReview", response_model=UserReviewsResponse)
-async def get_review(user_id: str, db_session: DBSession):
-    return await service.get_reviews(db_session, user_id)
+async def get_review(
+    user_id: str,
+    read_db: DBRead,
+    status: PRStatus | None = None,
+    limit: Annotated[int, Query(ge=1, le=REVIEWS_PAGE_MAX_LIMIT)] = REVIEWS_PAGE_DEFAULT_LIMIT,
+    cursor: str | None = None,
+):
+    return await read_db.run(
+        service.get_reviews, user_id, status=status, limit=limit, cursor=cursor
+    )
@@ -0,0 +1,41 @@
+"""
+Rebuild daily stats rollups (/stats/window) from pull_requests / pr_reviewers.
+
+    uv run python -m app.commands.backfill_daily_stats [--from 2026-01-01] [--to 2026-01-31]
+
+Without --from/--to rebuilds every day that has PR events.
+"""
+
+import argparse
+import asyncio
+from datetime import date
+
+from app.core.db import AsyncSessionLocal, async_engine
+from app.services.stats_service import StatsService
+
+
+async def run(day_from: date | None, day_to: date | None) -> None:
+    async with AsyncSessionLocal() as db_session:
+        result = await StatsService().backfill_daily(db_session, day_from, day_to)
+    await async_engine.dispose()
+
+    if result is None:
+        print("no pull requests, nothing to backfill")
+        return
+    day_from, day_to, users_rows, merge_time_rows = result
+    print(
+        f"rebuilt {day_from}..{day_to}: "
+        f"stats_daily_users={users_rows} stats_daily_merge_time={merge_time_rows}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--from", dest="day_from", type=date.fromisoformat)
+    parser.add_argument("--to", dest="day_to", type=date.fromisoformat)
+    args = parser.parse_args()
+    asyncio.run(run(args.day_from, args.day_to))
+
+
+if __name__ == "__main__":
+    main()
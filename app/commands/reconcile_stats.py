@@ -0,0 +1,37 @@
+"""
+Recompute /stats counter tables from pull_requests / pr_reviewers.
+
+    uv run python -m app.commands.reconcile_stats [--dry-run]
+
+Exits with code 1 if drift was found (useful for a periodic check).
+"""
+
+import argparse
+import asyncio
+import sys
+
+from app.core.db import AsyncSessionLocal, async_engine
+from app.services.stats_service import StatsService
+
+
+async def run(dry_run: bool) -> int:
+    async with AsyncSessionLocal() as db_session:
+        drift = await StatsService().reconcile_counters(db_session, dry_run=dry_run)
+    await async_engine.dispose()
+
+    for counter, key, stored, actual in drift:
+        print(f"{counter} {key}: stored={stored} actual={actual}")
+    action = "found" if dry_run else "fixed"
+    print(f"drift {action}: {len(drift)}")
+    return 1 if drift else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dry-run", action="store_true", help="only report drift")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.dry_run)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Delete /team/get?since= change log entries older than TEAM_CHANGES_RETENTION_HOURS.
+Clients with an older version get a full snapshot instead of a delta.
+
+    uv run python -m app.commands.trim_team_changes
+
+Meant to be run periodically (cron).
+"""
+
+import argparse
+import asyncio
+
+from app.core.db import AsyncSessionLocal, async_engine
+from app.services.team_service import TeamService
+
+
+async def run() -> None:
+    async with AsyncSessionLocal() as db_session:
+        deleted = await TeamService().trim_change_log(db_session)
+    await async_engine.dispose()
+    print(f"team_member_changes deleted: {deleted}")
+
+
+def main() -> None:
+    argparse.ArgumentParser(description=__doc__).parse_args()
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
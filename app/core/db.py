@@ -2,18 +2,57 @@ import datetime
 from typing import Annotated, ClassVar
 
 from sqlalchemy import ARRAY, BigInteger, Integer, text
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, mapped_column
 
-from app.core.config import settings
+from app.core.config import DBSettings, settings
+from app.core.db_pool import InstrumentedAsyncQueuePool, install_idle_ping
+from app.core.db_routing import ReadRouter
+from app.core.metrics import instrument_engine
 
-async_engine = create_async_engine(settings.postgres_async_url, pool_pre_ping=True)
+
+def build_async_engine(
+    url: str,
+    db_settings: DBSettings = settings,
+    connect_args: dict | None = None,
+) -> AsyncEngine:
+    """Engine with the pool configured from DB_POOL_* settings and instrumented for /internal/pool."""
+    engine = create_async_engine(
+        url,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=db_settings.DB_POOL_SIZE,
+        max_overflow=db_settings.DB_POOL_MAX_OVERFLOW,
+        pool_timeout=db_settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=db_settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=db_settings.DB_POOL_LIVENESS == "always",
+        connect_args={
+            "prepared_statement_cache_size": db_settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+            **(connect_args or {}),
+        },
+    )
+    if db_settings.DB_POOL_LIVENESS == "idle":
+        install_idle_ping(engine, db_settings.DB_POOL_PING_IDLE_SECONDS)
+    return engine
+
+
+async_engine = build_async_engine(settings.postgres_async_url)
+instrument_engine(async_engine, "primary")
 
 AsyncSessionLocal = async_sessionmaker(
     bind=async_engine,
     expire_on_commit=False,
 )
 
+replica_engines = [build_async_engine(url) for url in settings.DB_REPLICA_URLS]
+for index, replica_engine in enumerate(replica_engines):
+    instrument_engine(replica_engine, f"replica-{index}")
+
+read_router = ReadRouter(
+    AsyncSessionLocal,
+    [async_sessionmaker(bind=engine, expire_on_commit=False) for engine in replica_engines],
+    retry_seconds=settings.DB_REPLICA_RETRY_SECONDS,
+)
+
 int_pk = Annotated[int, mapped_column(BigInteger, primary_key=True, autoincrement=True)]
 
 created_at = Annotated[
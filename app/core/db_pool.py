@@ -0,0 +1,88 @@
+import time
+from typing import cast
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+from sqlalchemy.pool.base import ConnectionPoolEntry
+
+from app.utils.histogram import LatencyHistogram
+
+
+class PoolMetrics:
+    """Per-process counters of one connection pool (each uvicorn worker has its own pool)."""
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.liveness_pings = 0
+        self.liveness_failures = 0
+        # ожидание свободного соединения (включая открытие нового в пределах overflow)
+        self.wait = LatencyHistogram()
+        # выдача целиком: ожидание + проверка живости + события checkout
+        self.checkout = LatencyHistogram()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records PoolMetrics; metrics survive engine.dispose()."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            self.metrics.checkouts += 1
+            self.metrics.checkout.observe((time.perf_counter() - started) * 1000)
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            self.metrics.wait.observe((time.perf_counter() - started) * 1000)
+
+    def recreate(self) -> "InstrumentedAsyncQueuePool":
+        pool = cast(InstrumentedAsyncQueuePool, super().recreate())
+        pool.metrics = self.metrics
+        return pool
+
+
+def engine_pool(engine: AsyncEngine) -> InstrumentedAsyncQueuePool:
+    """Pool of an engine made by build_async_engine (poolclass=InstrumentedAsyncQueuePool)."""
+    return cast(InstrumentedAsyncQueuePool, engine.sync_engine.pool)
+
+
+def install_idle_ping(engine: AsyncEngine, idle_seconds: float) -> None:
+    """
+    Lighter alternative to pool_pre_ping: a connection is pinged on checkout only
+    if it sat in the pool longer than idle_seconds. A failed ping makes the pool
+    replace the connection (DisconnectionError), as pre-ping does.
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "checkin")
+    def _remember_checkin(dbapi_connection, connection_record) -> None:
+        # info живёт, пока живо DBAPI-соединение: новое соединение не проверяется
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy) -> None:
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        metrics = getattr(sync_engine.pool, "metrics", None)
+        if metrics is not None:
+            metrics.liveness_pings += 1
+        try:
+            dbapi_connection.ping()
+        except Exception as error:
+            if metrics is not None:
+                metrics.liveness_failures += 1
+            raise exc.DisconnectionError("connection failed liveness ping") from error
@@ -0,0 +1,125 @@
+import itertools
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Concatenate
+
+import asyncpg
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+# токен read-your-writes: выдаётся в ответах на успешные записи, клиент возвращает
+# этот заголовок в чтениях
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes"
+
+
+@dataclass
+class ReadTarget:
+    name: str
+    session_factory: async_sessionmaker[AsyncSession]
+    # до этого момента (time.monotonic) реплика считается недоступной
+    down_until: float = 0.0
+    failures: int = 0
+
+
+def is_unavailable_error(error: BaseException) -> bool:
+    """
+    Errors meaning the database could not serve the request at all (retrying
+    elsewhere is safe for reads), as opposed to errors of the query itself.
+    asyncpg errors reach here unwrapped only from connect: query errors are
+    wrapped into DBAPIError.
+    """
+    if isinstance(error, exc.DBAPIError):
+        return error.connection_invalidated
+    return isinstance(
+        error, (OSError, exc.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError)
+    )
+
+
+class ReadRouter:
+    """
+    Runs read-only service methods on a replica: round-robin over replicas not
+    marked down, falling back to the next one and finally to the primary when a
+    replica is unavailable. A failed replica is skipped for retry_seconds
+    (per worker process), then tried again by regular traffic.
+
+    Replicas may lag behind the primary; clients that must see their own writes
+    send the read-your-writes token and are served by primary_only(), which is
+    marked pinned so that shared response caches can be bypassed as well.
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker[AsyncSession],
+        replicas: list[async_sessionmaker[AsyncSession]] | None = None,
+        retry_seconds: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+        pinned: bool = False,
+    ):
+        self.primary = ReadTarget("primary", primary)
+        self.replicas = [
+            ReadTarget(f"replica-{index}", factory) for index, factory in enumerate(replicas or [])
+        ]
+        self.retry_seconds = retry_seconds
+        self._clock = clock
+        self._next = itertools.count()
+        self.pinned = pinned
+
+    def primary_only(self) -> "ReadRouter":
+        return ReadRouter(self.primary.session_factory, clock=self._clock, pinned=True)
+
+    def candidates(self) -> list[ReadTarget]:
+        """Available replicas in round-robin order, then the primary."""
+        now = self._clock()
+        available = [target for target in self.replicas if target.down_until <= now]
+        if available:
+            start = next(self._next) % len(available)
+            available = available[start:] + available[:start]
+        return [*available, self.primary]
+
+    async def run[**P, T](
+        self,
+        fn: Callable[Concatenate[AsyncSession, P], Awaitable[T]],
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> T:
+        """fn(db_session, *args, **kwargs) on the first target that can serve it."""
+        for target in self.candidates():
+            async with target.session_factory() as db_session:
+                try:
+                    return await fn(db_session, *args, **kwargs)
+                except Exception as error:
+                    if target is self.primary or not is_unavailable_error(error):
+                        raise
+                    self._mark_down(target, error)
+        raise AssertionError("primary is always the last candidate")
+
+    def _mark_down(self, target: ReadTarget, error: BaseException) -> None:
+        target.down_until = self._clock() + self.retry_seconds
+        target.failures += 1
+        logger.warning(
+            "Read replica %s unavailable, skipping it for %.0fs: %r",
+            target.name,
+            self.retry_seconds,
+            error,
+        )
+
+
+def issue_read_your_writes_token() -> str:
+    """Milliseconds since the epoch of the write the client has to see."""
+    return str(int(time.time() * 1000))
+
+
+def read_your_writes_pinned(token: str | None, window_seconds: float) -> bool:
+    """A token younger than the window pins reads to the primary; malformed ones are ignored."""
+    if not token:
+        return False
+    try:
+        written_at_ms = int(token)
+    except ValueError:
+        return False
+    # часы разных хостов расходятся: токен «из будущего» в пределах окна тоже принимаем
+    return abs(time.time() * 1000 - written_at_ms) <= window_seconds * 1000
@@ -0,0 +1,131 @@
+"""
+Prometheus metrics of the HTTP layer and of the database engines.
+
+With several uvicorn workers every process keeps its own values; to export
+their sum set PROMETHEUS_MULTIPROC_DIR to an empty writable directory before
+the workers start (entrypoint.sh recreates it). prometheus_client then keeps
+values in mmap-ed files there and /metrics merges the files of all processes.
+"""
+
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.query_recorder import current_query_recorder
+
+_MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS_SECONDS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code.",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start to the end of the response body.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS_SECONDS,
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests being handled right now.",
+    ["method", "route"],
+    # сумма по живым процессам: значения завершившихся воркеров не учитываются
+    multiprocess_mode="livesum",
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed while handling one request.",
+    ["method", "route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent in SQL statements while handling one request.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS_SECONDS,
+)
+DB_QUERIES = Counter(
+    "db_queries_total",
+    "SQL statements executed, including background work.",
+    ["engine"],
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Duration of one SQL statement.",
+    ["engine"],
+    buckets=LATENCY_BUCKETS_SECONDS,
+)
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Count statements and their duration, globally and in the current QueryRecorder."""
+    sync_engine = engine.sync_engine
+    queries = DB_QUERIES.labels(engine=name)
+    duration = DB_QUERY_DURATION.labels(engine=name)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        queries.inc()
+        duration.observe(elapsed)
+        # фоновые задачи (JobRunner, обновление SWR-кэша) стартуют в пустом контексте:
+        # recorder запроса, из которого их запустили, они не видят
+        recorder = current_query_recorder.get()
+        if recorder is not None:
+            recorder.record(statement, elapsed)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _failed(context) -> None:
+        # after_cursor_execute для упавшего запроса не вызывается
+        started = context.connection.info.get("query_started") if context.connection else None
+        if started:
+            started.pop()
+
+
+def render_latest() -> tuple[bytes, str]:
+    """Exposition of all metrics: merged over worker processes in multiprocess mode."""
+    if _MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop the live gauges of a stopped worker (no-op without multiprocess mode)."""
+    if _MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,271 @@
+"""
+Sampling profiler for single requests.
+
+A daemon thread wakes up every interval and records the Python stack of the
+event loop thread, so the profiled code runs unmodified (no tracing hooks) and
+the overhead is one stack walk per sample. Samples taken while another task
+runs on the loop are collapsed into one "<other tasks>" frame, samples with no
+task running show where the loop waits (idle or waiting on I/O, the DB
+included). Code offloaded to threads (sync dependencies) is not sampled.
+
+The result is a speedscope file (https://www.speedscope.app, flame graph and
+time-ordered views) and a plain-text summary next to it.
+"""
+
+import asyncio
+import os
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+import orjson
+
+from app.core.config import BASE_DIR
+
+# запрос, где есть этот заголовок и верным токеном (PROFILING_TOKEN) профилируется;
+# в ответ добавляется идентификатор профиля — имя файлов в PROFILING_OUTPUT_DIR
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# (функция, файл, первая строка функции)
+FrameKey = tuple[str, str, int]
+
+OTHER_TASKS_FRAME: FrameKey = ("<other tasks>", "", 0)
+LOOP_IDLE = "event loop: idle / waiting on I/O"
+
+_APP_DIR = f"{BASE_DIR}{os.sep}"
+_STDLIB_DIR = f"{sysconfig.get_paths()['stdlib']}{os.sep}"
+# слой определяется по самому глубокому кадру из известного пакета
+_LAYERS = (
+    (f"{os.sep}asyncpg{os.sep}", "database driver (asyncpg)"),
+    (f"{os.sep}sqlalchemy{os.sep}", "ORM / SQLAlchemy"),
+    (f"{os.sep}pydantic{os.sep}", "validation (pydantic)"),
+    (f"{os.sep}pydantic_core{os.sep}", "validation (pydantic)"),
+    (f"{os.sep}fastapi{os.sep}", "framework (FastAPI / Starlette)"),
+    (f"{os.sep}starlette{os.sep}", "framework (FastAPI / Starlette)"),
+    (_APP_DIR, "application code"),
+)
+
+
+# switch interval — настройка всего процесса: профили могут пересекаться (в тестах,
+# в разных потоках), исходное значение возвращает последний остановленный
+_switch_lock = threading.Lock()
+_switch_users = 0
+_saved_switch_interval = 0.0
+
+
+def _shorten_switch_interval(interval: float) -> None:
+    global _switch_users, _saved_switch_interval
+    with _switch_lock:
+        if _switch_users == 0:
+            _saved_switch_interval = sys.getswitchinterval()
+        _switch_users += 1
+        sys.setswitchinterval(min(sys.getswitchinterval(), interval))
+
+
+def _restore_switch_interval() -> None:
+    global _switch_users
+    with _switch_lock:
+        _switch_users -= 1
+        if _switch_users == 0:
+            sys.setswitchinterval(_saved_switch_interval)
+
+
+@dataclass
+class Sample:
+    # стек от корня к текущему кадру
+    stack: tuple[FrameKey, ...]
+    seconds: float
+    loop_idle: bool = False
+
+
+class SamplingProfiler:
+    """
+    Profiles the task that calls start(): create and start it from inside the
+    request, stop() once the response is sent.
+    """
+
+    def __init__(self, interval: float = 0.001, short_switch_interval: bool = False):
+        self.interval = interval
+        self.short_switch_interval = short_switch_interval
+        self.samples: list[Sample] = []
+        self.wall_seconds = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        self._thread_id = threading.get_ident()
+        self._started = time.perf_counter()
+        # проснувшийся поток профайлера ждёт GIL до switch interval (5 мс), но обычно
+        # GIL достаётся ему раньше, когда цикл сам отпускает GIL на вводе-выводе: сэмплы
+        # смещаются к I/O. Короткий interval на время профиля делает момент сэмпла почти
+        # случайным, но действует на все потоки процесса — поэтому только по явному запросу
+        if self.short_switch_interval:
+            _shorten_switch_interval(self.interval / 10)
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            if self.short_switch_interval:
+                _restore_switch_interval()
+        self.wall_seconds = time.perf_counter() - self._started
+
+    def _run(self) -> None:
+        last = self._started
+        while not self._stop.wait(self.interval):
+            # вес сэмпла — фактически прошедшее время: ожидание GIL удлиняет интервал
+            now = time.perf_counter()
+            sample = self._sample()
+            if sample is not None:
+                sample.seconds = now - last
+                self.samples.append(sample)
+            last = now
+
+    def _sample(self) -> Sample | None:
+        frame = sys._current_frames().get(self._thread_id)
+        if frame is None:
+            return None
+        running = asyncio.current_task(self._loop)
+        if running is not None and running is not self._task:
+            return Sample((OTHER_TASKS_FRAME,), 0.0)
+        stack: list[FrameKey] = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_qualname, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        stack.reverse()
+        return Sample(tuple(stack), 0.0, loop_idle=running is None)
+
+
+def frame_layer(sample: Sample) -> str:
+    if sample.stack == (OTHER_TASKS_FRAME,):
+        return "other tasks on the event loop"
+    if sample.loop_idle:
+        return LOOP_IDLE
+    for _, filename, _ in reversed(sample.stack):
+        for marker, layer in _LAYERS:
+            if marker in filename:
+                return layer
+    return "other (stdlib, uvicorn)"
+
+
+def short_path(filename: str) -> str:
+    _, sep, tail = filename.rpartition(f"site-packages{os.sep}")
+    if sep:
+        return tail
+    if filename.startswith(_APP_DIR):
+        return os.path.relpath(filename, BASE_DIR.parent)
+    if filename.startswith(_STDLIB_DIR):
+        return filename.removeprefix(_STDLIB_DIR)
+    return filename
+
+
+def _frame_label(frame: FrameKey) -> str:
+    name, filename, line = frame
+    return f"{name}  {short_path(filename)}:{line}" if filename else name
+
+
+def speedscope_document(profiler: SamplingProfiler, name: str) -> dict:
+    """Sampled profile in the speedscope file format, weights in milliseconds."""
+    index: dict[FrameKey, int] = {}
+    frames: list[dict] = []
+    samples: list[list[int]] = []
+    for sample in profiler.samples:
+        stack = []
+        for frame in sample.stack:
+            if frame not in index:
+                index[frame] = len(frames)
+                func, filename, line = frame
+                entry: dict = {"name": func}
+                if filename:
+                    entry |= {"file": short_path(filename), "line": line}
+                frames.append(entry)
+            stack.append(index[frame])
+        samples.append(stack)
+    weights = [sample.seconds * 1000 for sample in profiler.samples]
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "reviewer-service",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }
+        ],
+    }
+
+
+def summarize(profiler: SamplingProfiler, title: str, extra: list[str], top: int = 15) -> str:
+    """Time by layer and the hottest functions, by self and by total time."""
+    sampled = sum(sample.seconds for sample in profiler.samples) or 1e-9
+    layers: defaultdict[str, float] = defaultdict(float)
+    self_time: defaultdict[FrameKey, float] = defaultdict(float)
+    total_time: defaultdict[FrameKey, float] = defaultdict(float)
+    in_samples: Counter[FrameKey] = Counter()
+    for sample in profiler.samples:
+        layers[frame_layer(sample)] += sample.seconds
+        self_time[sample.stack[-1]] += sample.seconds
+        # рекурсивная функция учитывается в сэмпле один раз
+        for frame in set(sample.stack):
+            total_time[frame] += sample.seconds
+            in_samples[frame] += 1
+    # кадры из каждого сэмпла (запуск сервера, цикл событий) в топе по общему времени бесполезны
+    for frame, count in in_samples.items():
+        if count == len(profiler.samples):
+            del total_time[frame]
+
+    def rows(seconds_by_key: dict) -> list[str]:
+        hottest = sorted(seconds_by_key.items(), key=lambda item: item[1], reverse=True)
+        return [
+            f"  {seconds / sampled:6.1%} {seconds * 1000:9.1f} ms  "
+            f"{key if isinstance(key, str) else _frame_label(key)}"
+            for key, seconds in hottest[:top]
+        ]
+
+    lines = [
+        title,
+        f"wall {profiler.wall_seconds * 1000:.1f} ms, {len(profiler.samples)} samples "
+        f"every {profiler.interval * 1000:g} ms",
+        *extra,
+        "",
+        "time by layer (deepest frame of a known package):",
+        *rows(layers),
+        "",
+        "top functions by self time:",
+        *rows(self_time),
+        "",
+        "top functions by total time:",
+        *rows(total_time),
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def write_profile(
+    output_dir: str, profile_id: str, profiler: SamplingProfiler, title: str, extra: list[str]
+) -> Path:
+    """Writes <id>.speedscope.json and <id>.txt, returns the summary path."""
+    directory = Path(output_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{profile_id}.speedscope.json").write_bytes(
+        orjson.dumps(speedscope_document(profiler, title))
+    )
+    summary = directory / f"{profile_id}.txt"
+    summary.write_text(summarize(profiler, title, extra))
+    return summary
@@ -0,0 +1,129 @@
+import logging
+import re
+from collections import Counter
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER_RE = re.compile(r"\$\d+(?:::[\w\[\]]+(?:\(\d+\))?)?|%\(\w+\)s|\?")
+_PLACEHOLDER_LIST_RE = re.compile(r"\?(?:\s*,\s*\?)+")
+_ROW_LIST_RE = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class QueryBudgetExceededError(RuntimeError):
+    pass
+
+
+def statement_shape(statement: str) -> str:
+    """
+    SQL with parameters collapsed: IN-lists and multi-row VALUES of any length
+    give the same shape, so a loop over rows shows up as one repeated shape.
+    """
+    shape = _PLACEHOLDER_RE.sub("?", statement)
+    shape = _PLACEHOLDER_LIST_RE.sub("?", shape)
+    shape = _ROW_LIST_RE.sub("(?)", shape)
+    return _WHITESPACE_RE.sub(" ", shape).strip()
+
+
+@dataclass
+class QueryRecorder:
+    """
+    Statements executed within one scope (a request, a test block). Nested
+    recorders pass their statements on to the enclosing one.
+    """
+
+    # лимит на число запросов: None — без лимита; raise_on_exceed — ошибка на превышающем запросе
+    budget: int | None = None
+    raise_on_exceed: bool = False
+    label: str = ""
+    parent: "QueryRecorder | None" = None
+    queries: int = 0
+    seconds: float = 0.0
+    shapes: Counter[str] = field(default_factory=Counter)
+
+    def record(self, statement: str, seconds: float) -> None:
+        shape = statement_shape(statement)
+        chain: list[QueryRecorder] = []
+        recorder: QueryRecorder | None = self
+        while recorder is not None:
+            recorder.queries += 1
+            recorder.seconds += seconds
+            recorder.shapes[shape] += 1
+            chain.append(recorder)
+            recorder = recorder.parent
+        # проверяем после учёта во всех уровнях: внешние видят и запрос, вызвавший ошибку
+        for recorder in chain:
+            if recorder.raise_on_exceed and recorder.exceeded:
+                raise QueryBudgetExceededError(recorder.describe())
+
+    @property
+    def exceeded(self) -> bool:
+        return self.budget is not None and self.queries > self.budget
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Shapes executed more than threshold times: likely a query in a loop (N+1)."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+    def describe(self, top: int = 3) -> str:
+        budget = "" if self.budget is None else f" (budget {self.budget})"
+        lines = [f"{self.label or 'scope'}: {self.queries} queries{budget}"]
+        lines += [f"  {count} x {shape[:200]}" for shape, count in self.shapes.most_common(top)]
+        return "\n".join(lines)
+
+
+current_query_recorder: ContextVar[QueryRecorder | None] = ContextVar(
+    "current_query_recorder", default=None
+)
+
+
+@dataclass
+class RequestQueryRecorder(QueryRecorder):
+    """
+    Recorder of one HTTP request. It is created before routing, so the route (and
+    with it the label and the budget) comes from route_of() when the first
+    statement runs: statements run in dependencies and endpoints, after routing.
+    """
+
+    method: str = ""
+    route_of: Callable[[], str] | None = None
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.resolve_route()
+        super().record(statement, seconds)
+
+    def resolve_route(self) -> None:
+        if self.route_of is None:
+            return
+        self.label = f"{self.method} {self.route_of()}"
+        self.route_of = None
+        mode = settings.QUERY_BUDGET_MODE
+        self.budget = (
+            None
+            if mode == "off"
+            else settings.QUERY_BUDGET_ROUTES.get(self.label, settings.QUERY_BUDGET_PER_REQUEST)
+        )
+        self.raise_on_exceed = mode == "raise"
+
+
+def request_query_recorder(method: str, route_of: Callable[[], str]) -> RequestQueryRecorder:
+    """Recorder of one HTTP request with the budget configured for its route."""
+    return RequestQueryRecorder(
+        method=method, route_of=route_of, parent=current_query_recorder.get()
+    )
+
+
+def report_request(recorder: QueryRecorder) -> None:
+    """Log budget overruns and repeated statement shapes of a finished request."""
+    if settings.QUERY_BUDGET_MODE == "off":
+        return
+    if recorder.exceeded:
+        logger.warning("Query budget exceeded\n%s", recorder.describe())
+    for shape, count in recorder.repeated(settings.QUERY_REPEAT_THRESHOLD):
+        logger.warning(
+            "Possible N+1 in %s: %d executions of %s", recorder.label, count, shape[:200]
+        )
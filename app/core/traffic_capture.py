@@ -0,0 +1,106 @@
+"""
+Capture of sampled production requests for replay (benchmarks/replay_traffic.py).
+
+Every captured request is one JSON line: start time, method, path, query,
+replay-relevant headers, body (base64 when it is not UTF-8, dropped and marked
+truncated above TRAFFIC_CAPTURE_MAX_BODY_BYTES), route template, status and
+duration. Each worker writes its own capture-<pid>.jsonl, rotated by size
+(RotatingFileHandler): captures of all workers are merged by the replayer.
+"""
+
+import base64
+import logging
+import os
+from dataclasses import dataclass, field
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+import orjson
+
+# заголовки, которые нужны для воспроизведения; авторизация и токены не сохраняются
+CAPTURED_HEADERS = frozenset({"content-type", "if-none-match", "x-read-your-writes"})
+
+
+@dataclass
+class CapturedRequest:
+    started_at: float
+    method: str
+    path: str
+    query: str
+    route: str
+    headers: dict[str, str]
+    body: bytearray = field(default_factory=bytearray)
+    body_truncated: bool = False
+    status: int = 0
+    duration_ms: float = 0.0
+
+    def add_body(self, chunk: bytes, max_bytes: int) -> None:
+        if self.body_truncated:
+            return
+        if len(self.body) + len(chunk) > max_bytes:
+            self.body_truncated = True
+            self.body.clear()
+            return
+        self.body += chunk
+
+    def to_json(self) -> bytes:
+        record: dict = {
+            "ts": self.started_at,
+            "method": self.method,
+            "path": self.path,
+            "query": self.query,
+            "route": self.route,
+            "headers": self.headers,
+            "status": self.status,
+            "duration_ms": round(self.duration_ms, 3),
+        }
+        if self.body_truncated:
+            record["body_truncated"] = True
+        elif self.body:
+            try:
+                record["body"] = self.body.decode()
+            except UnicodeDecodeError:
+                record["body_b64"] = base64.b64encode(self.body).decode()
+        return orjson.dumps(record)
+
+
+def captured_headers(raw_headers: list[tuple[bytes, bytes]]) -> dict[str, str]:
+    return {
+        name.decode("latin-1"): value.decode("latin-1")
+        for name, value in raw_headers
+        if name.decode("latin-1") in CAPTURED_HEADERS
+    }
+
+
+def request_body(record: dict) -> bytes | None:
+    """Body of a captured record as sent by the client (None if it was not kept)."""
+    if "body_b64" in record:
+        return base64.b64decode(record["body_b64"])
+    if "body" in record:
+        body: str = record["body"]
+        return body.encode()
+    return None
+
+
+class CaptureWriter:
+    """Appends captured requests to capture-<pid>.jsonl, keeping max_files rotated files."""
+
+    def __init__(self, directory: str, max_file_bytes: int, max_files: int):
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        self.path = Path(directory) / f"capture-{os.getpid()}.jsonl"
+        self._handler = RotatingFileHandler(
+            self.path, maxBytes=max_file_bytes, backupCount=max(max_files - 1, 0), delay=True
+        )
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+
+    def write(self, captured: CapturedRequest) -> None:
+        # блокирующий вызов (из потока, не из цикла событий); ротация — внутри handler,
+        # под блокировкой самого handler, так что писать можно из нескольких потоков
+        self._handler.handle(
+            logging.LogRecord(
+                "traffic_capture", logging.INFO, "", 0, captured.to_json().decode(), None, None
+            )
+        )
+
+    def close(self) -> None:
+        self._handler.close()
@@ -1,16 +1,44 @@
 import logging
+import os
+from contextlib import asynccontextmanager
 from logging.config import dictConfig as loggerDictConfig
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.openapi.utils import get_openapi
 from fastapi.responses import ORJSONResponse
 from starlette.middleware.cors import CORSMiddleware
 
+from app.api.middleware import (
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    ReadYourWritesMiddleware,
+    TrafficCaptureMiddleware,
+)
 from app.api.v1.api import api_router
 from app.core.config import logging_conf, settings
+from app.core.db import AsyncSessionLocal
+from app.core.db_routing import READ_YOUR_WRITES_HEADER
+from app.core.metrics import mark_process_dead, render_latest
+from app.core.profiling import PROFILE_ID_HEADER
+from app.services.job_runner import job_runner
+from app.services.team_service import TeamService
 
 loggerDictConfig(logging_conf)
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    if settings.DEACTIVATION_JOBS_RESUME_ON_STARTUP:
+        job_runner.spawn(
+            "resume-deactivation-jobs",
+            TeamService().resume_deactivation_jobs(AsyncSessionLocal),
+        )
+    yield
+    # незавершённые задачи продолжатся после рестарта от последнего чекпоинта
+    await job_runner.shutdown()
+    mark_process_dead(os.getpid())
+
+
 openapi_url = f"{settings.API_V1_PATH}/openapi.json"
 app = FastAPI(
     title=settings.TITLE,
@@ -20,9 +48,11 @@ app = FastAPI(
     redoc_url="/api/redoc",
     version=settings.VERSION,
     default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 app.include_router(api_router, prefix=settings.API_V1_PATH)
+app.add_middleware(ReadYourWritesMiddleware)
 
 if settings.CORS_ORIGINS:
     app.add_middleware(
@@ -31,12 +61,34 @@ if settings.CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[READ_YOUR_WRITES_HEADER, PROFILE_ID_HEADER],
     )
 
+# снаружи прикладных middleware: учитывает и их время. Профайлер и запись трафика ниже
+# встают ещё снаружи: recorder профайлера — родитель recorder запроса, запись трафика
+# меряет время всех слоёв
+app.add_middleware(MetricsMiddleware)
+
+# без токена и доли сэмплирования профайлер не стоит в цепочке и ничего не стоит запросам
+if settings.PROFILING_TOKEN or settings.PROFILING_SAMPLE_RATE > 0:
+    app.add_middleware(ProfilingMiddleware)
+
+# запись трафика для воспроизведения: время запроса меряется снаружи всех слоёв
+if settings.TRAFFIC_CAPTURE_SAMPLE_RATE > 0:
+    app.add_middleware(TrafficCaptureMiddleware)
+
 if settings.DEBUG:
     logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    # синхронный обработчик FastAPI выполняет в пуле потоков: в multiprocess-режиме
+    # сборка читает файлы всех воркеров
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
+
+
 def custom_openapi():
     if app.openapi_schema:
         return app.openapi_schema
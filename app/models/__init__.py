@@ -1,12 +1,27 @@
+from app.models.deactivation_job import DeactivationJob
 from app.models.pull_request import PRReviewer, PRStatus, PullRequest
-from app.models.team import Team, TeamMember
+from app.models.stats import (
+    AuthorPrCounter,
+    DailyMergeTimeHistogram,
+    DailyUserStats,
+    PrStatusCounter,
+    ReviewerAssignmentCounter,
+)
+from app.models.team import Team, TeamMember, TeamMemberChange
 from app.models.user import User
 
 __all__ = [
+    "AuthorPrCounter",
+    "DailyMergeTimeHistogram",
+    "DailyUserStats",
+    "DeactivationJob",
     "PRReviewer",
     "PRStatus",
+    "PrStatusCounter",
     "PullRequest",
+    "ReviewerAssignmentCounter",
     "Team",
     "TeamMember",
+    "TeamMemberChange",
     "User",
 ]
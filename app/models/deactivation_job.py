@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+from sqlalchemy import ARRAY, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+from app.schemas.schema_enums.team_enums import DeactivationJobStatus
+
+
+class DeactivationJob(Base):
+    """
+    Checkpoint of a background /team/deactivateUsers run: user_ids[:processed_users]
+    are already deactivated and their open PRs reassigned.
+    """
+
+    __tablename__ = "deactivation_jobs"
+
+    job_id: Mapped[str] = mapped_column(String, primary_key=True)
+    team_name: Mapped[str] = mapped_column(
+        String, ForeignKey("teams.team_name", ondelete="CASCADE"), nullable=False
+    )
+    user_ids: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False)
+
+    status: Mapped[DeactivationJobStatus] = mapped_column(
+        Enum(DeactivationJobStatus, name="deactivation_job_status"),
+        default=DeactivationJobStatus.PENDING,
+        nullable=False,
+    )
+    processed_users: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    reassigned_prs: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    error: Mapped[str | None] = mapped_column(String, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(UTC), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(UTC), nullable=False
+    )
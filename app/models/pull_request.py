@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, Enum, ForeignKey, String, UniqueConstraint
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, String, UniqueConstraint, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base, int_pk
@@ -15,6 +15,18 @@ if TYPE_CHECKING:
 
 class PullRequest(Base):
     __tablename__ = "pull_requests"
+    __table_args__ = (
+        # выгрузка PR по диапазону created_at: ORDER BY (created_at, pull_request_id)
+        Index("ix_pull_requests_created_at_id", "created_at", "pull_request_id"),
+        Index("ix_pull_requests_author_id_status", "author_id", "status"),
+        # открытых PR обычно на порядки меньше, чем всех
+        Index(
+            "ix_pull_requests_open_created_at_id",
+            "created_at",
+            "pull_request_id",
+            postgresql_where=text("status = 'OPEN'"),
+        ),
+    )
 
     pull_request_id: Mapped[str] = mapped_column(String, primary_key=True)
     pull_request_name: Mapped[str] = mapped_column(String, nullable=False)
@@ -41,7 +53,18 @@ class PullRequest(Base):
 
 class PRReviewer(Base):
     __tablename__ = "pr_reviewers"
-    __table_args__ = (UniqueConstraint("pull_request_id", "reviewer_id", name="uq_pr_reviewer"),)
+    __table_args__ = (
+        UniqueConstraint("pull_request_id", "reviewer_id", name="uq_pr_reviewer"),
+        # PR ревьюера в порядке keyset-пагинации /users/getReview:
+        # ORDER BY (pr_created_at, pull_request_id) без сортировки; pull_request_id в индексе
+        # нужен и для index-only join
+        Index(
+            "ix_pr_reviewers_reviewer_created_at",
+            "reviewer_id",
+            "pr_created_at",
+            "pull_request_id",
+        ),
+    )
 
     id: Mapped[int_pk]
     pull_request_id: Mapped[str] = mapped_column(
@@ -54,5 +77,8 @@ class PRReviewer(Base):
         ForeignKey("users.user_id", ondelete="CASCADE"),
         nullable=False,
     )
+    # копия pull_requests.created_at (не меняется после создания PR): ключ сортировки
+    # должен лежать в той же таблице, что и reviewer_id, иначе индекс не отдаёт порядок
+    pr_created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
 
     pull_request: Mapped[PullRequest] = relationship("PullRequest", back_populates="reviewers")
@@ -0,0 +1,56 @@
+from datetime import date
+
+from sqlalchemy import BigInteger, Date, Enum, SmallInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+from app.schemas.schema_enums.pull_request_enums import PRStatus
+
+
+class ReviewerAssignmentCounter(Base):
+    """Current number of pr_reviewers rows per reviewer."""
+
+    __tablename__ = "stats_reviewer_assignments"
+
+    reviewer_id: Mapped[str] = mapped_column(String, primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+
+class AuthorPrCounter(Base):
+    __tablename__ = "stats_author_prs"
+
+    author_id: Mapped[str] = mapped_column(String, primary_key=True)
+    status: Mapped[PRStatus] = mapped_column(Enum(PRStatus, name="pr_status"), primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+
+class PrStatusCounter(Base):
+    __tablename__ = "stats_pr_status"
+
+    status: Mapped[PRStatus] = mapped_column(Enum(PRStatus, name="pr_status"), primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+
+class DailyUserStats(Base):
+    """
+    Per-day, per-user event counts (UTC days): PRs opened (by created_at),
+    PRs merged (by merged_at), reviewer assignments made that day.
+    """
+
+    __tablename__ = "stats_daily_users"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    user_id: Mapped[str] = mapped_column(String, primary_key=True)
+    prs_opened: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    prs_merged: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    assignments: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+
+class DailyMergeTimeHistogram(Base):
+    """Histogram of time-to-merge of PRs merged that day, see MERGE_TIME_BUCKET_BOUNDS."""
+
+    __tablename__ = "stats_daily_merge_time"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    bucket: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
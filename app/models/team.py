@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, String, UniqueConstraint
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
@@ -15,6 +16,8 @@ class Team(Base):
     __tablename__ = "teams"
 
     team_name: Mapped[str] = mapped_column(String, primary_key=True)
+    # растёт при любом изменении состава или участников команды (ETag для /team/get)
+    version: Mapped[int] = mapped_column(BigInteger, default=1, server_default="1", nullable=False)
 
     members: Mapped[list[TeamMember]] = relationship(
         "TeamMember", back_populates="team", cascade="all, delete-orphan"
@@ -23,7 +26,11 @@ class Team(Base):
 
 class TeamMember(Base):
     __tablename__ = "team_members"
-    __table_args__ = (UniqueConstraint("team_name", "user_id", name="uq_team_member"),)
+    __table_args__ = (
+        UniqueConstraint("team_name", "user_id", name="uq_team_member"),
+        # поиск команд пользователя: PK (team_name, user_id) для него бесполезен
+        Index("ix_team_members_user_id", "user_id"),
+    )
 
     team_name: Mapped[str] = mapped_column(
         String, ForeignKey("teams.team_name", ondelete="CASCADE"), primary_key=True
@@ -35,3 +42,23 @@ class TeamMember(Base):
 
     user: Mapped[User] = relationship("User", back_populates="teams")
     team: Mapped[Team] = relationship("Team", back_populates="members")
+
+
+class TeamMemberChange(Base):
+    """
+    Change log behind /team/get?since=: user_id was added, removed or changed
+    (username, is_active) in the team at the given version. Trimmed by age.
+    """
+
+    __tablename__ = "team_member_changes"
+    __table_args__ = (Index("ix_team_member_changes_changed_at", "changed_at"),)
+
+    team_name: Mapped[str] = mapped_column(
+        String, ForeignKey("teams.team_name", ondelete="CASCADE"), primary_key=True
+    )
+    version: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    # без FK: запись про удаление должна пережить пользователя
+    user_id: Mapped[str] = mapped_column(String, primary_key=True)
+    changed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(UTC), nullable=False
+    )
@@ -0,0 +1,45 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.deactivation_job import DeactivationJob
+from app.schemas.schema_enums.team_enums import DeactivationJobStatus
+
+
+class DeactivationJobRepository:
+    def __init__(self, db_session: AsyncSession):
+        self._db_session = db_session
+
+    async def create(self, job: DeactivationJob) -> DeactivationJob:
+        self._db_session.add(job)
+        return job
+
+    async def get_by_id(self, job_id: str) -> DeactivationJob | None:
+        stmt = select(DeactivationJob).where(DeactivationJob.job_id == job_id)
+        result = await self._db_session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def lock_for_processing(self, job_id: str) -> DeactivationJob | None:
+        """
+        Row lock for one chunk. None if job is missing or another worker is
+        processing it right now (SKIP LOCKED).
+        """
+        stmt = (
+            select(DeactivationJob)
+            .where(DeactivationJob.job_id == job_id)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self._db_session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def get_unfinished_ids(self) -> list[str]:
+        stmt = (
+            select(DeactivationJob.job_id)
+            .where(
+                DeactivationJob.status.in_(
+                    [DeactivationJobStatus.PENDING, DeactivationJobStatus.RUNNING]
+                )
+            )
+            .order_by(DeactivationJob.created_at)
+        )
+        result = await self._db_session.execute(stmt)
+        return list(result.scalars())
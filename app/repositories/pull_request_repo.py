@@ -1,10 +1,34 @@
-from sqlalchemy import delete, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import cast
+
+from sqlalchemy import (
+    ARRAY,
+    DateTime,
+    Row,
+    String,
+    Table,
+    bindparam,
+    delete,
+    exists,
+    func,
+    literal,
+    select,
+    true,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.pull_request import PRReviewer, PullRequest
+from app.models.user import User
 from app.schemas.schema_enums.pull_request_enums import PRStatus
 
+# __table__ в аннотациях моделей — FromClause; insert/update ожидают Table
+PR_TABLE = cast(Table, PullRequest.__table__)
+PR_REVIEWER_TABLE = cast(Table, PRReviewer.__table__)
+
 
 class PullRequestRepository:
     def __init__(self, db_session: AsyncSession):
@@ -21,24 +45,214 @@ class PullRequestRepository:
         result = await self._db_session.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def create(self, pr: PullRequest) -> PullRequest:
-        self._db_session.add(pr)
-        return pr
-
-    async def assign_reviewers(self, pr: PullRequest, reviewer_ids: list[str]) -> None:
-        existing = {reviewer.reviewer_id for reviewer in pr.reviewers}
-        new_reviewers = [
-            PRReviewer(pull_request_id=pr.pull_request_id, reviewer_id=reviewer_id)
-            for reviewer_id in reviewer_ids
-            if reviewer_id not in existing
-        ]
-        self._db_session.add_all(new_reviewers)
-
-    async def get_review_assignments(self, user_id: str) -> list[PullRequest]:
-        stmt = select(PullRequest).join(PRReviewer).where(PRReviewer.reviewer_id == user_id)
+    async def exists(self, pull_request_id: str) -> bool:
+        stmt = select(exists().where(PullRequest.pull_request_id == pull_request_id))
+        result = await self._db_session.execute(stmt)
+        return bool(result.scalar())
+
+    async def create_with_reviewers(
+        self,
+        pull_request_id: str,
+        pull_request_name: str,
+        author_id: str,
+        reviewer_ids: list[str],
+        created_at: datetime,
+    ) -> tuple[Row, list[str]] | None:
+        """
+        Insert PR and its reviewers in one statement.
+        None if PR id is taken (ON CONFLICT) or author does not exist.
+        """
+        pr_table = PR_TABLE
+        ins_pr = (
+            pg_insert(pr_table)
+            .from_select(
+                ["pull_request_id", "pull_request_name", "author_id", "status", "created_at"],
+                select(
+                    literal(pull_request_id, String),
+                    literal(pull_request_name, String),
+                    User.user_id,
+                    literal(PRStatus.OPEN, pr_table.c.status.type),
+                    literal(created_at, DateTime(timezone=True)),
+                ).where(User.user_id == author_id),
+            )
+            .on_conflict_do_nothing(index_elements=["pull_request_id"])
+            .returning(
+                *pr_table.c[
+                    "pull_request_id",
+                    "pull_request_name",
+                    "author_id",
+                    "status",
+                    "created_at",
+                    "merged_at",
+                ]
+            )
+            .cte("ins_pr")
+        )
+        picked = (
+            func.unnest(bindparam("reviewer_ids", reviewer_ids, type_=ARRAY(String)))
+            .table_valued("reviewer_id")
+            .render_derived(name="picked")
+        )
+        ins_reviewers = (
+            pg_insert(PR_REVIEWER_TABLE)
+            .from_select(
+                ["pull_request_id", "reviewer_id", "pr_created_at"],
+                select(
+                    ins_pr.c.pull_request_id, picked.c.reviewer_id, ins_pr.c.created_at
+                ).select_from(ins_pr.join(picked, true())),
+            )
+            .returning(PRReviewer.reviewer_id)
+            .cte("ins_reviewers")
+        )
+        stmt = select(
+            ins_pr,
+            select(func.array_agg(ins_reviewers.c.reviewer_id))
+            .scalar_subquery()
+            .label("reviewers"),
+        )
+        result = await self._db_session.execute(stmt)
+        row = result.one_or_none()
+        if row is None:
+            return None
+        inserted = set(row.reviewers or ())
+        return row, [reviewer_id for reviewer_id in reviewer_ids if reviewer_id in inserted]
+
+    async def get_existing_ids(self, pull_request_ids: list[str]) -> set[str]:
+        if not pull_request_ids:
+            return set()
+        stmt = select(PullRequest.pull_request_id).where(
+            PullRequest.pull_request_id.in_(pull_request_ids)
+        )
+        result = await self._db_session.execute(stmt)
+        return set(result.scalars())
+
+    async def create_many(self, rows: list[dict]) -> set[str]:
+        """
+        Bulk insert (executemany) of pull_requests rows. Returns ids actually inserted:
+        ids taken concurrently are skipped by ON CONFLICT DO NOTHING.
+        """
+        if not rows:
+            return set()
+        stmt = (
+            pg_insert(PR_TABLE)
+            .on_conflict_do_nothing(index_elements=["pull_request_id"])
+            .returning(PR_TABLE.c.pull_request_id)
+        )
+        result = await self._db_session.execute(stmt, rows)
+        return set(result.scalars())
+
+    async def assign_reviewers_bulk(self, assignments: list[tuple[str, str]]) -> list[str]:
+        """
+        Bulk insert of (pull_request_id, reviewer_id) pairs, duplicates skipped.
+        pr_created_at is copied from pull_requests in the same statement.
+        Returns reviewer ids of rows actually inserted.
+        """
+        if not assignments:
+            return []
+        pull_request_ids, reviewer_ids = zip(*assignments, strict=True)
+        pairs = (
+            func.unnest(
+                bindparam("pull_request_ids", list(pull_request_ids), type_=ARRAY(String)),
+                bindparam("reviewer_ids", list(reviewer_ids), type_=ARRAY(String)),
+            )
+            .table_valued("pull_request_id", "reviewer_id", with_ordinality="ord")
+            .render_derived(name="pairs")
+        )
+        stmt = (
+            pg_insert(PR_REVIEWER_TABLE)
+            .from_select(
+                ["pull_request_id", "reviewer_id", "pr_created_at"],
+                select(pairs.c.pull_request_id, pairs.c.reviewer_id, PR_TABLE.c.created_at)
+                .join_from(pairs, PR_TABLE, PR_TABLE.c.pull_request_id == pairs.c.pull_request_id)
+                .order_by(pairs.c.ord),
+            )
+            .on_conflict_do_nothing(constraint="uq_pr_reviewer")
+            .returning(PR_REVIEWER_TABLE.c.reviewer_id)
+        )
         result = await self._db_session.execute(stmt)
         return list(result.scalars())
 
+    async def get_review_assignments_page(
+        self,
+        user_id: str,
+        limit: int,
+        status: PRStatus | None = None,
+        before: tuple[datetime, str] | None = None,
+    ) -> list[Row]:
+        """
+        Reviewer's PRs, newest first by (created_at, pull_request_id), strictly
+        before the given key. Plain rows: the columns of PullRequestShortDTO and
+        pr_created_at, the sort key the next cursor is built from.
+        """
+        stmt = (
+            select(
+                PullRequest.pull_request_id,
+                PullRequest.pull_request_name,
+                PullRequest.author_id,
+                PullRequest.status,
+                PRReviewer.pr_created_at,
+            )
+            .join(PRReviewer, PRReviewer.pull_request_id == PullRequest.pull_request_id)
+            .where(PRReviewer.reviewer_id == user_id)
+            # ключ из pr_reviewers: порядок отдаёт индекс (reviewer_id, pr_created_at, id)
+            .order_by(PRReviewer.pr_created_at.desc(), PRReviewer.pull_request_id.desc())
+            .limit(limit)
+        )
+        if status is not None:
+            stmt = stmt.where(PullRequest.status == status)
+        if before is not None:
+            before_created_at, before_id = before
+            stmt = stmt.where(
+                tuple_(PRReviewer.pr_created_at, PRReviewer.pull_request_id)
+                < tuple_(
+                    literal(before_created_at, DateTime(timezone=True)),
+                    literal(before_id, String),
+                )
+            )
+        result = await self._db_session.execute(stmt)
+        return list(result.all())
+
+    async def stream_for_export(
+        self,
+        batch_size: int,
+        status: PRStatus | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+    ) -> AsyncResult:
+        """
+        PRs with created_at in [created_from, created_to), ordered by
+        (created_at, pull_request_id), each with an ordered array of reviewer ids
+        (NULL if none). Rows come from a server-side cursor batch_size at a time:
+        iterate result.partitions() while the session's transaction is open.
+        """
+        reviewer_ids = (
+            select(
+                func.array_agg(aggregate_order_by(PRReviewer.reviewer_id, PRReviewer.reviewer_id))
+            )
+            .where(PRReviewer.pull_request_id == PullRequest.pull_request_id)
+            .scalar_subquery()
+        )
+        stmt = (
+            select(
+                PullRequest.pull_request_id,
+                PullRequest.pull_request_name,
+                PullRequest.author_id,
+                PullRequest.status,
+                PullRequest.created_at,
+                PullRequest.merged_at,
+                reviewer_ids.label("reviewer_ids"),
+            )
+            .order_by(PullRequest.created_at, PullRequest.pull_request_id)
+            .execution_options(yield_per=batch_size)
+        )
+        if status is not None:
+            stmt = stmt.where(PullRequest.status == status)
+        if created_from is not None:
+            stmt = stmt.where(PullRequest.created_at >= created_from)
+        if created_to is not None:
+            stmt = stmt.where(PullRequest.created_at < created_to)
+        return await self._db_session.stream(stmt)
+
     async def get_for_update(self, pull_request_id: str) -> PullRequest | None:
         stmt = (
             select(PullRequest)
@@ -49,6 +263,39 @@ class PullRequestRepository:
         result = await self._db_session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def merge_many(self, pull_request_ids: list[str], merged_at: datetime) -> list[Row]:
+        """
+        Set-based merge: only OPEN PRs are touched, so repeated calls are no-ops.
+        """
+        if not pull_request_ids:
+            return []
+        pr_table = PR_TABLE
+        stmt = (
+            update(pr_table)
+            .where(
+                pr_table.c.pull_request_id.in_(pull_request_ids),
+                pr_table.c.status == PRStatus.OPEN,
+            )
+            .values(status=PRStatus.MERGED, merged_at=merged_at)
+            .returning(*pr_table.c)
+        )
+        result = await self._db_session.execute(stmt)
+        return list(result.all())
+
+    async def get_reviewer_ids_by_pr(self, pull_request_ids: list[str]) -> dict[str, list[str]]:
+        if not pull_request_ids:
+            return {}
+        stmt = (
+            select(PRReviewer.pull_request_id, PRReviewer.reviewer_id)
+            .where(PRReviewer.pull_request_id.in_(pull_request_ids))
+            .order_by(PRReviewer.id)
+        )
+        result = await self._db_session.execute(stmt)
+        reviewers: dict[str, list[str]] = {}
+        for pull_request_id, reviewer_id in result.all():
+            reviewers.setdefault(pull_request_id, []).append(reviewer_id)
+        return reviewers
+
     async def replace_reviewer(
         self, pr: PullRequest, old_reviewer_id: str, new_user_id: str
     ) -> None:
@@ -61,27 +308,50 @@ class PullRequestRepository:
         new_reviewer = PRReviewer(
             pull_request_id=pr.pull_request_id,
             reviewer_id=new_user_id,
+            pr_created_at=pr.created_at,
         )
         self._db_session.add(new_reviewer)
 
-    async def get_open_prs_with_reviewers(self, reviewer_ids: list[str]) -> list[PullRequest]:
+    async def get_open_pr_reviewer_rows(
+        self, reviewer_ids: list[str]
+    ) -> list[tuple[str, str, str]]:
+        """
+        (pull_request_id, author_id, reviewer_id) for all reviewers of open PRs
+        where at least one of reviewer_ids is assigned. Ordered by assignment.
+        """
         if not reviewer_ids:
             return []
+        affected = (
+            select(PRReviewer.pull_request_id)
+            .where(PRReviewer.reviewer_id.in_(reviewer_ids))
+            .scalar_subquery()
+        )
         stmt = (
-            select(PullRequest)
-            .join(PRReviewer)
+            select(PullRequest.pull_request_id, PullRequest.author_id, PRReviewer.reviewer_id)
+            .join(PRReviewer, PRReviewer.pull_request_id == PullRequest.pull_request_id)
             .where(
                 PullRequest.status == PRStatus.OPEN,
-                PRReviewer.reviewer_id.in_(reviewer_ids),
+                PullRequest.pull_request_id.in_(affected),
             )
-            .options(selectinload(PullRequest.reviewers))
+            .order_by(PRReviewer.id)
         )
-        res = await self._db_session.execute(stmt)
-        return list(res.scalars().unique().all())
+        result = await self._db_session.execute(stmt)
+        return [(row[0], row[1], row[2]) for row in result.all()]
 
-    async def remove_reviewer(self, pull_request_id: str, reviewer_id: str) -> None:
-        stmt = delete(PRReviewer).where(
-            PRReviewer.pull_request_id == pull_request_id,
-            PRReviewer.reviewer_id == reviewer_id,
+    async def remove_reviewers_from_open_prs(self, reviewer_ids: list[str]) -> list[str]:
+        """
+        Returns reviewer id of every removed row.
+        """
+        if not reviewer_ids:
+            return []
+        stmt = (
+            delete(PRReviewer)
+            .where(
+                PRReviewer.reviewer_id.in_(reviewer_ids),
+                PRReviewer.pull_request_id == PullRequest.pull_request_id,
+                PullRequest.status == PRStatus.OPEN,
+            )
+            .returning(PRReviewer.reviewer_id)
         )
-        await self._db_session.execute(stmt)
+        result = await self._db_session.execute(stmt)
+        return list(result.scalars())
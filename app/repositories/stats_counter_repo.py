@@ -0,0 +1,250 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime
+
+from sqlalchemy import delete, func, literal, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.pull_request import PRReviewer, PullRequest
+from app.models.stats import (
+    AuthorPrCounter,
+    DailyMergeTimeHistogram,
+    DailyUserStats,
+    PrStatusCounter,
+    ReviewerAssignmentCounter,
+)
+from app.schemas.schema_enums.pull_request_enums import PRStatus
+from app.utils.histogram import merge_time_bucket
+
+
+@dataclass
+class StatsDelta:
+    """Changes of stats counters collected during one write transaction."""
+
+    reviewer_assignments: Counter[str] = field(default_factory=Counter)
+    author_prs: Counter[tuple[str, PRStatus]] = field(default_factory=Counter)
+    pr_status: Counter[PRStatus] = field(default_factory=Counter)
+
+    # дневные агрегаты: события за UTC-день
+    daily_opened: Counter[tuple[date, str]] = field(default_factory=Counter)
+    daily_merged: Counter[tuple[date, str]] = field(default_factory=Counter)
+    daily_assigned: Counter[tuple[date, str]] = field(default_factory=Counter)
+    daily_merge_time: Counter[tuple[date, int]] = field(default_factory=Counter)
+
+    def pr_created(self, author_id: str, reviewer_ids: list[str], created_at: datetime) -> None:
+        self.author_prs[(author_id, PRStatus.OPEN)] += 1
+        self.pr_status[PRStatus.OPEN] += 1
+        self.daily_opened[(_utc_day(created_at), author_id)] += 1
+        self.reviewers_assigned(reviewer_ids, created_at)
+
+    def pr_merged(self, author_id: str, created_at: datetime, merged_at: datetime) -> None:
+        self.author_prs[(author_id, PRStatus.OPEN)] -= 1
+        self.author_prs[(author_id, PRStatus.MERGED)] += 1
+        self.pr_status[PRStatus.OPEN] -= 1
+        self.pr_status[PRStatus.MERGED] += 1
+        day = _utc_day(merged_at)
+        self.daily_merged[(day, author_id)] += 1
+        bucket = merge_time_bucket((_as_utc(merged_at) - _as_utc(created_at)).total_seconds())
+        self.daily_merge_time[(day, bucket)] += 1
+
+    def reviewers_assigned(self, reviewer_ids: list[str], assigned_at: datetime) -> None:
+        self.reviewer_assignments.update(reviewer_ids)
+        day = _utc_day(assigned_at)
+        self.daily_assigned.update((day, reviewer_id) for reviewer_id in reviewer_ids)
+
+    def reviewers_removed(self, reviewer_ids: list[str]) -> None:
+        # дневные агрегаты считают назначения как события, снятие их не отменяет
+        self.reviewer_assignments.subtract(reviewer_ids)
+
+
+@dataclass
+class StatsSnapshot:
+    reviewer_assignments: dict[str, int]
+    author_prs: dict[tuple[str, PRStatus], int]
+    pr_status: dict[PRStatus, int]
+
+    def diff(self, actual: "StatsSnapshot") -> list[tuple[str, object, int, int]]:
+        """(counter, key, stored, actual) for every key whose count differs."""
+        drift: list[tuple[str, object, int, int]] = []
+        for name in ("reviewer_assignments", "author_prs", "pr_status"):
+            stored_counts: dict = getattr(self, name)
+            actual_counts: dict = getattr(actual, name)
+            for key in stored_counts.keys() | actual_counts.keys():
+                stored, real = stored_counts.get(key, 0), actual_counts.get(key, 0)
+                if stored != real:
+                    drift.append((name, key, stored, real))
+        return drift
+
+
+class StatsCounterRepository:
+    """
+    Counter tables behind /stats. Updated in the same transaction as the writes
+    that change pull_requests / pr_reviewers.
+    """
+
+    def __init__(self, db_session: AsyncSession):
+        self._db_session = db_session
+
+    async def apply(self, delta: StatsDelta) -> None:
+        """All non-zero deltas as one statement (one upsert CTE per table)."""
+        ctes = []
+
+        reviewer_rows = _non_zero(delta.reviewer_assignments)
+        if reviewer_rows:
+            stmt = pg_insert(ReviewerAssignmentCounter).values(
+                [{"reviewer_id": key, "count": value} for key, value in reviewer_rows]
+            )
+            ctes.append(
+                stmt.on_conflict_do_update(
+                    index_elements=["reviewer_id"],
+                    set_={"count": ReviewerAssignmentCounter.count + stmt.excluded["count"]},
+                ).cte("upd_reviewer_assignments")
+            )
+
+        author_rows = _non_zero(delta.author_prs)
+        if author_rows:
+            stmt = pg_insert(AuthorPrCounter).values(
+                [
+                    {"author_id": author_id, "status": status, "count": value}
+                    for (author_id, status), value in author_rows
+                ]
+            )
+            ctes.append(
+                stmt.on_conflict_do_update(
+                    index_elements=["author_id", "status"],
+                    set_={"count": AuthorPrCounter.count + stmt.excluded["count"]},
+                ).cte("upd_author_prs")
+            )
+
+        status_rows = _non_zero(delta.pr_status)
+        if status_rows:
+            stmt = pg_insert(PrStatusCounter).values(
+                [{"status": status, "count": value} for status, value in status_rows]
+            )
+            ctes.append(
+                stmt.on_conflict_do_update(
+                    index_elements=["status"],
+                    set_={"count": PrStatusCounter.count + stmt.excluded["count"]},
+                ).cte("upd_pr_status")
+            )
+
+        daily_keys = sorted(
+            {
+                key
+                for counter in (delta.daily_opened, delta.daily_merged, delta.daily_assigned)
+                for key, value in counter.items()
+                if value
+            }
+        )
+        if daily_keys:
+            stmt = pg_insert(DailyUserStats).values(
+                [
+                    {
+                        "day": day,
+                        "user_id": user_id,
+                        "prs_opened": delta.daily_opened[(day, user_id)],
+                        "prs_merged": delta.daily_merged[(day, user_id)],
+                        "assignments": delta.daily_assigned[(day, user_id)],
+                    }
+                    for day, user_id in daily_keys
+                ]
+            )
+            ctes.append(
+                stmt.on_conflict_do_update(
+                    index_elements=["day", "user_id"],
+                    set_={
+                        column: getattr(DailyUserStats, column) + stmt.excluded[column]
+                        for column in ("prs_opened", "prs_merged", "assignments")
+                    },
+                ).cte("upd_daily_users")
+            )
+
+        merge_time_rows = _non_zero(delta.daily_merge_time)
+        if merge_time_rows:
+            stmt = pg_insert(DailyMergeTimeHistogram).values(
+                [
+                    {"day": day, "bucket": bucket, "count": value}
+                    for (day, bucket), value in merge_time_rows
+                ]
+            )
+            ctes.append(
+                stmt.on_conflict_do_update(
+                    index_elements=["day", "bucket"],
+                    set_={"count": DailyMergeTimeHistogram.count + stmt.excluded["count"]},
+                ).cte("upd_daily_merge_time")
+            )
+
+        if ctes:
+            await self._db_session.execute(select(literal(1)).add_cte(*ctes))
+
+    async def compute_from_source(self) -> StatsSnapshot:
+        """Exact full-scan aggregation over pull_requests / pr_reviewers."""
+        reviewer_rows = await self._db_session.execute(
+            select(PRReviewer.reviewer_id, func.count()).group_by(PRReviewer.reviewer_id)
+        )
+        author_rows = await self._db_session.execute(
+            select(PullRequest.author_id, PullRequest.status, func.count()).group_by(
+                PullRequest.author_id, PullRequest.status
+            )
+        )
+        status_rows = await self._db_session.execute(
+            select(PullRequest.status, func.count()).group_by(PullRequest.status)
+        )
+        return StatsSnapshot(
+            reviewer_assignments={row[0]: row[1] for row in reviewer_rows.all()},
+            author_prs={(row[0], row[1]): row[2] for row in author_rows.all()},
+            pr_status={row[0]: row[1] for row in status_rows.all()},
+        )
+
+    async def lock(self) -> None:
+        """Block concurrent counter updates until the end of the transaction."""
+        tables = ", ".join(
+            model.__tablename__
+            for model in (ReviewerAssignmentCounter, AuthorPrCounter, PrStatusCounter)
+        )
+        await self._db_session.execute(text(f"LOCK TABLE {tables} IN EXCLUSIVE MODE"))
+
+    async def replace(self, snapshot: StatsSnapshot) -> None:
+        for model in (ReviewerAssignmentCounter, AuthorPrCounter, PrStatusCounter):
+            await self._db_session.execute(delete(model))
+        if snapshot.reviewer_assignments:
+            await self._db_session.execute(
+                pg_insert(ReviewerAssignmentCounter),
+                [
+                    {"reviewer_id": key, "count": value}
+                    for key, value in snapshot.reviewer_assignments.items()
+                ],
+            )
+        if snapshot.author_prs:
+            await self._db_session.execute(
+                pg_insert(AuthorPrCounter),
+                [
+                    {"author_id": author_id, "status": status, "count": value}
+                    for (author_id, status), value in snapshot.author_prs.items()
+                ],
+            )
+        if snapshot.pr_status:
+            await self._db_session.execute(
+                pg_insert(PrStatusCounter),
+                [
+                    {"status": status, "count": value}
+                    for status, value in snapshot.pr_status.items()
+                ],
+            )
+
+
+def _as_utc(moment: datetime) -> datetime:
+    # колонки в БД из начальной миграции — timestamp without time zone, значения в UTC
+    return moment.replace(tzinfo=UTC) if moment.tzinfo is None else moment
+
+
+def _utc_day(moment: datetime) -> date:
+    return _as_utc(moment).astimezone(UTC).date()
+
+
+def _non_zero[K](counter: Counter[K]) -> list[tuple[K, int]]:
+    # сортировка — чтобы параллельные транзакции брали блокировки строк в одном порядке
+    return sorted(
+        ((key, value) for key, value in counter.items() if value), key=lambda kv: str(kv[0])
+    )
@@ -0,0 +1,131 @@
+from datetime import date
+
+from sqlalchemy import ARRAY, Date, Float, cast, delete, func, literal, select, text, union_all
+from sqlalchemy.dialects.postgresql import array, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.pull_request import PRReviewer, PullRequest
+from app.models.stats import DailyMergeTimeHistogram, DailyUserStats
+from app.utils.histogram import MERGE_TIME_BUCKET_BOUNDS
+
+
+def _utc_day(column):
+    return cast(func.timezone("UTC", column), Date)
+
+
+class StatsDailyRepository:
+    """
+    Daily rollups behind /stats/window. Incremental updates go through
+    StatsCounterRepository.apply; this repository reads ranges and rebuilds days.
+    """
+
+    def __init__(self, db_session: AsyncSession):
+        self._db_session = db_session
+
+    async def get_user_totals(
+        self, day_from: date, day_to: date
+    ) -> list[tuple[str, int, int, int]]:
+        """(user_id, prs_opened, prs_merged, assignments) summed over [day_from, day_to]."""
+        stmt = (
+            select(
+                DailyUserStats.user_id,
+                func.sum(DailyUserStats.prs_opened),
+                func.sum(DailyUserStats.prs_merged),
+                func.sum(DailyUserStats.assignments),
+            )
+            .where(DailyUserStats.day.between(day_from, day_to))
+            .group_by(DailyUserStats.user_id)
+            .order_by(DailyUserStats.user_id)
+        )
+        result = await self._db_session.execute(stmt)
+        return [(row[0], int(row[1]), int(row[2]), int(row[3])) for row in result.all()]
+
+    async def get_merge_time_histogram(self, day_from: date, day_to: date) -> dict[int, int]:
+        stmt = (
+            select(DailyMergeTimeHistogram.bucket, func.sum(DailyMergeTimeHistogram.count))
+            .where(DailyMergeTimeHistogram.day.between(day_from, day_to))
+            .group_by(DailyMergeTimeHistogram.bucket)
+        )
+        result = await self._db_session.execute(stmt)
+        return {row[0]: int(row[1]) for row in result.all()}
+
+    async def lock(self) -> None:
+        """Block concurrent rollup updates until the end of the transaction."""
+        tables = ", ".join(
+            model.__tablename__ for model in (DailyUserStats, DailyMergeTimeHistogram)
+        )
+        await self._db_session.execute(text(f"LOCK TABLE {tables} IN EXCLUSIVE MODE"))
+
+    async def rebuild(self, day_from: date, day_to: date) -> tuple[int, int]:
+        """
+        Recomputes the rollups of [day_from, day_to] from pull_requests / pr_reviewers,
+        server-side. Assignments of existing PRs are attributed to the PR's creation
+        day: pr_reviewers keeps no assignment time. Returns rows written per table.
+        """
+        for model in (DailyUserStats, DailyMergeTimeHistogram):
+            await self._db_session.execute(delete(model).where(model.day.between(day_from, day_to)))
+
+        zero, one = literal(0), literal(1)
+        events = union_all(
+            select(
+                _utc_day(PullRequest.created_at).label("day"),
+                PullRequest.author_id.label("user_id"),
+                one.label("prs_opened"),
+                zero.label("prs_merged"),
+                zero.label("assignments"),
+            ),
+            select(_utc_day(PullRequest.merged_at), PullRequest.author_id, zero, one, zero).where(
+                PullRequest.merged_at.is_not(None)
+            ),
+            select(_utc_day(PullRequest.created_at), PRReviewer.reviewer_id, zero, zero, one).join(
+                PullRequest, PullRequest.pull_request_id == PRReviewer.pull_request_id
+            ),
+        ).subquery("events")
+        users_rows = await self._db_session.execute(
+            pg_insert(DailyUserStats).from_select(
+                ["day", "user_id", "prs_opened", "prs_merged", "assignments"],
+                select(
+                    events.c.day,
+                    events.c.user_id,
+                    func.sum(events.c.prs_opened),
+                    func.sum(events.c.prs_merged),
+                    func.sum(events.c.assignments),
+                )
+                .where(events.c.day.between(day_from, day_to))
+                .group_by(events.c.day, events.c.user_id),
+            )
+        )
+
+        merged_day = _utc_day(PullRequest.merged_at)
+        bucket = func.width_bucket(
+            cast(func.extract("epoch", PullRequest.merged_at - PullRequest.created_at), Float),
+            cast(array([float(bound) for bound in MERGE_TIME_BUCKET_BOUNDS]), ARRAY(Float)),
+        )
+        merge_time_rows = await self._db_session.execute(
+            pg_insert(DailyMergeTimeHistogram).from_select(
+                ["day", "bucket", "count"],
+                select(merged_day, bucket, func.count())
+                .where(
+                    PullRequest.merged_at.is_not(None),
+                    merged_day.between(day_from, day_to),
+                )
+                .group_by(merged_day, bucket),
+            )
+        )
+        return (
+            users_rows.rowcount or 0,  # type: ignore[attr-defined]
+            merge_time_rows.rowcount or 0,  # type: ignore[attr-defined]
+        )
+
+    async def get_source_day_range(self) -> tuple[date, date] | None:
+        """First and last UTC day that has any PR event."""
+        stmt = select(
+            func.min(_utc_day(PullRequest.created_at)),
+            func.max(
+                func.greatest(_utc_day(PullRequest.created_at), _utc_day(PullRequest.merged_at))
+            ),
+        )
+        row = (await self._db_session.execute(stmt)).one()
+        if row[0] is None:
+            return None
+        return row[0], row[1]
@@ -1,39 +1,54 @@
-from sqlalchemy import func, select
+from sqlalchemy import String, literal, select, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.pull_request import PRReviewer, PullRequest
+from app.models.stats import AuthorPrCounter, PrStatusCounter, ReviewerAssignmentCounter
+from app.repositories.stats_counter_repo import StatsSnapshot
 from app.schemas.schema_enums.pull_request_enums import PRStatus
 
 
 class StatsRepository:
+    """
+    Reads of the counter tables maintained by StatsCounterRepository:
+    cost is proportional to the result, not to PR history.
+    """
+
     def __init__(self, db_session: AsyncSession):
         self._db_session = db_session
 
-    async def get_assignments_per_reviewer(self) -> list[tuple[str, int]]:
-        stmt = select(PRReviewer.reviewer_id, func.count()).group_by(PRReviewer.reviewer_id)
-        result = await self._db_session.execute(stmt)
-        return [(row[0], row[1]) for row in result.all()]
-
-    async def get_open_prs_per_author(self) -> list[tuple[str, int]]:
-        stmt = (
-            select(PullRequest.author_id, func.count())
-            .where(PullRequest.status == "OPEN")
-            .group_by(PullRequest.author_id)
-        )
+    async def get_snapshot(self) -> StatsSnapshot:
+        """
+        All non-zero counters in one statement, ordered so that equal data
+        always serializes to equal bytes.
+        """
+        status_type = AuthorPrCounter.status.type
+        stmt = union_all(
+            select(
+                literal("reviewer").label("kind"),
+                ReviewerAssignmentCounter.reviewer_id.label("user_id"),
+                literal(None, status_type).label("status"),
+                ReviewerAssignmentCounter.count,
+            ).where(ReviewerAssignmentCounter.count != 0),
+            select(
+                literal("author"),
+                AuthorPrCounter.author_id,
+                AuthorPrCounter.status,
+                AuthorPrCounter.count,
+            ).where(AuthorPrCounter.count != 0),
+            select(
+                literal("status"),
+                literal(None, String),
+                PrStatusCounter.status,
+                PrStatusCounter.count,
+            ).where(PrStatusCounter.count != 0),
+        ).order_by("kind", "user_id", "status")
         result = await self._db_session.execute(stmt)
-        return [(row[0], row[1]) for row in result.all()]
 
-    async def get_merged_prs_per_author(self) -> list[tuple[str, int]]:
-        stmt = (
-            select(PullRequest.author_id, func.count())
-            .where(PullRequest.status == "MERGED")
-            .group_by(PullRequest.author_id)
-        )
-        result = await self._db_session.execute(stmt)
-        return [(row[0], row[1]) for row in result.all()]
-
-    async def get_pr_count_by_status(self) -> dict[PRStatus, int]:
-        stmt = select(PullRequest.status, func.count()).group_by(PullRequest.status)
-        result = await self._db_session.execute(stmt)
-        rows = result.all()
-        return {row[0]: row[1] for row in rows}
+        snapshot = StatsSnapshot(reviewer_assignments={}, author_prs={}, pr_status={})
+        for kind, user_id, status, count in result.all():
+            if kind == "reviewer":
+                snapshot.reviewer_assignments[user_id] = count
+            elif kind == "author":
+                snapshot.author_prs[(user_id, PRStatus(status))] = count
+            else:
+                snapshot.pr_status[PRStatus(status)] = count
+        return snapshot
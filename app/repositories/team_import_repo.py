@@ -0,0 +1,96 @@
+from sqlalchemy import Boolean, Column, Integer, MetaData, String, Table, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.team import Team, TeamMember
+from app.models.user import User
+
+# временная таблица: отдельная в каждом соединении, очищается при COMMIT
+staging = Table(
+    "team_import_staging",
+    MetaData(),
+    Column("line", Integer, nullable=False),
+    Column("team_name", String, nullable=False),
+    Column("user_id", String),
+    Column("username", String),
+    Column("is_active", Boolean, nullable=False),
+)
+
+ImportRow = tuple[int, str, str | None, str | None, bool]
+
+
+class TeamImportRepository:
+    """
+    Bulk load of /team/import rows: COPY into a temp staging table, then set-based
+    merges into teams / users / team_members. Use within one transaction per batch.
+    """
+
+    def __init__(self, db_session: AsyncSession):
+        self._db_session = db_session
+
+    async def load(self, rows: list[ImportRow]) -> None:
+        """rows: (line, team_name, user_id, username, is_active)."""
+        await self._db_session.execute(
+            text(
+                "CREATE TEMP TABLE IF NOT EXISTS team_import_staging ("
+                "line integer NOT NULL, team_name varchar NOT NULL, user_id varchar, "
+                "username varchar, is_active boolean NOT NULL"
+                ") ON COMMIT DELETE ROWS"
+            )
+        )
+        connection = await self._db_session.connection()
+        raw_connection = await connection.get_raw_connection()
+        # driver_connection (asyncpg) пуст только для соединения, возвращённого в пул
+        await raw_connection.driver_connection.copy_records_to_table(  # type: ignore[union-attr]
+            staging.name, records=rows, columns=[column.name for column in staging.columns]
+        )
+
+    async def merge_teams(self) -> list[str]:
+        """Create teams that do not exist yet; returns names of the created ones."""
+        source = select(staging.c.team_name).distinct().order_by(staging.c.team_name)
+        stmt = (
+            pg_insert(Team)
+            .from_select(["team_name"], source)
+            .on_conflict_do_nothing()
+            .returning(Team.team_name)
+        )
+        result = await self._db_session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def merge_users(self) -> list[str]:
+        """
+        Upsert users of member rows (the last line wins for a repeated user_id);
+        returns ids of inserted or changed users.
+        """
+        source = (
+            select(staging.c.user_id, staging.c.username, staging.c.is_active)
+            .where(staging.c.user_id.is_not(None))
+            .distinct(staging.c.user_id)
+            .order_by(staging.c.user_id, staging.c.line.desc())
+        )
+        insert_stmt = pg_insert(User).from_select(["user_id", "username", "is_active"], source)
+        excluded = insert_stmt.excluded
+        stmt = insert_stmt.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={"username": excluded.username, "is_active": excluded.is_active},
+            where=(User.username != excluded.username) | (User.is_active != excluded.is_active),
+        ).returning(User.user_id)
+        result = await self._db_session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def merge_members(self) -> list[tuple[str, str]]:
+        """Add memberships of member rows; returns added (team_name, user_id)."""
+        source = (
+            select(staging.c.team_name, staging.c.user_id)
+            .where(staging.c.user_id.is_not(None))
+            .distinct()
+            .order_by(staging.c.team_name, staging.c.user_id)
+        )
+        stmt = (
+            pg_insert(TeamMember)
+            .from_select(["team_name", "user_id"], source)
+            .on_conflict_do_nothing()
+            .returning(TeamMember.team_name, TeamMember.user_id)
+        )
+        result = await self._db_session.execute(stmt)
+        return [(row[0], row[1]) for row in result.all()]
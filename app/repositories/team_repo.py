@@ -1,8 +1,24 @@
-from sqlalchemy import delete, select
+from datetime import UTC, datetime
+
+from sqlalchemy import (
+    ARRAY,
+    BigInteger,
+    DateTime,
+    String,
+    all_,
+    cast,
+    delete,
+    func,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models.team import Team, TeamMember
+from app.models.team import Team, TeamMember, TeamMemberChange
+from app.models.user import User
 
 
 class TeamRepository:
@@ -16,42 +32,150 @@ class TeamRepository:
         result = await self._db_session.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def create_team(self, team_name: str) -> Team:
-        team = Team(team_name=team_name)
-        self._db_session.add(team)
-        return team
+    async def get_version(self, team_name: str) -> int | None:
+        stmt = select(Team.version).where(Team.team_name == team_name)
+        result = await self._db_session.execute(stmt)
+        return result.scalar_one_or_none()
 
-    async def add_member(self, team_name: str, user_id: str) -> TeamMember | None:
-        stmt = select(TeamMember).where(
-            TeamMember.team_name == team_name, TeamMember.user_id == user_id
+    async def get_member_rows(
+        self, team_name: str, user_ids: list[str] | None = None
+    ) -> list[tuple[str, str, bool]]:
+        """
+        (user_id, username, is_active) of team members ordered by user_id, without ORM
+        hydration. user_ids limits the result to these users.
+        """
+        stmt = (
+            select(TeamMember.user_id, User.username, User.is_active)
+            .join(User, TeamMember.user_id == User.user_id)
+            .where(TeamMember.team_name == team_name)
+            .order_by(TeamMember.user_id)
         )
-        exists = await self._db_session.execute(stmt)
-        if exists.scalar_one_or_none():
-            return None
-        member = TeamMember(team_name=team_name, user_id=user_id)
-        self._db_session.add(member)
-        return member
+        if user_ids is not None:
+            if not user_ids:
+                return []
+            stmt = stmt.where(TeamMember.user_id.in_(user_ids))
+        result = await self._db_session.execute(stmt)
+        return [(row[0], row[1], row[2]) for row in result.all()]
 
-    async def add_members_bulk(self, team_name: str, user_ids: list[str]) -> None:
+    async def get_teams_by_member(self, user_ids: list[str]) -> dict[str, set[str]]:
+        """team_name -> those of the given users that are its members."""
         if not user_ids:
+            return {}
+        stmt = select(TeamMember.team_name, TeamMember.user_id).where(
+            TeamMember.user_id.in_(user_ids)
+        )
+        result = await self._db_session.execute(stmt)
+        teams: dict[str, set[str]] = {}
+        for team_name, user_id in result.all():
+            teams.setdefault(team_name, set()).add(user_id)
+        return teams
+
+    async def bump_versions(self, changed_members: dict[str, set[str]]) -> None:
+        """
+        Bump version of every team in changed_members and log its changed users
+        under the new version.
+        """
+        changed_members = {name: ids for name, ids in changed_members.items() if ids}
+        if not changed_members:
             return
-        stmt = select(TeamMember.user_id).where(
-            TeamMember.team_name == team_name, TeamMember.user_id.in_(user_ids)
-        )
-        existing = await self._db_session.execute(stmt)
-        existing_ids = {row[0] for row in existing.all()}
-        new_members = [
-            TeamMember(team_name=team_name, user_id=user_id)
-            for user_id in user_ids
-            if user_id not in existing_ids
+        stmt = (
+            update(Team)
+            .where(Team.team_name.in_(sorted(changed_members)))
+            .values(version=Team.version + 1)
+            .returning(Team.team_name, Team.version)
+        )
+        result = await self._db_session.execute(stmt)
+        rows = [
+            (team_name, version, user_id)
+            for team_name, version in result.all()
+            for user_id in sorted(changed_members[team_name])
         ]
-        self._db_session.add_all(new_members)
-
-    async def remove_members_by_user_ids(self, team_name: str, user_ids: list[str]) -> None:
-        if not user_ids:
+        if not rows:
             return
-        stmt = delete(TeamMember).where(
-            TeamMember.team_name == team_name,
-            TeamMember.user_id.in_(user_ids),
+        # журнал — одной вставкой из массивов: на импорте это десятки тысяч строк
+        team_names, versions, user_ids = zip(*rows, strict=True)
+        source = (
+            func.unnest(
+                cast(list(team_names), ARRAY(String)),
+                cast(list(versions), ARRAY(BigInteger)),
+                cast(list(user_ids), ARRAY(String)),
+            )
+            .table_valued("team_name", "version", "user_id")
+            .render_derived()
+        )
+        log_stmt = pg_insert(TeamMemberChange).from_select(
+            ["team_name", "version", "user_id", "changed_at"],
+            select(
+                source.c.team_name,
+                source.c.version,
+                source.c.user_id,
+                literal(datetime.now(UTC), DateTime(timezone=True)),
+            ),
+        )
+        await self._db_session.execute(log_stmt)
+
+    async def bump_versions_for_members(self, user_ids: list[str]) -> None:
+        """bump_versions for every team that has any of the given users as a member."""
+        await self.bump_versions(await self.get_teams_by_member(user_ids))
+
+    async def get_changed_member_ids(self, team_name: str, since: int) -> list[str]:
+        """Users logged as changed in the team after version `since`."""
+        stmt = (
+            select(TeamMemberChange.user_id)
+            .where(TeamMemberChange.team_name == team_name, TeamMemberChange.version > since)
+            .distinct()
+        )
+        result = await self._db_session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_oldest_logged_version(self, team_name: str) -> int | None:
+        stmt = select(func.min(TeamMemberChange.version)).where(
+            TeamMemberChange.team_name == team_name
         )
+        result = await self._db_session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def trim_changes(self, before: datetime) -> int:
+        stmt = delete(TeamMemberChange).where(TeamMemberChange.changed_at < before)
+        result = await self._db_session.execute(stmt)
+        return result.rowcount or 0  # type: ignore[attr-defined]
+
+    async def create_team(self, team_name: str) -> Team:
+        team = Team(team_name=team_name)
+        self._db_session.add(team)
+        return team
+
+    async def ensure_team(self, team_name: str) -> None:
+        stmt = pg_insert(Team).values(team_name=team_name).on_conflict_do_nothing()
         await self._db_session.execute(stmt)
+
+    async def add_members_bulk(self, team_name: str, user_ids: list[str]) -> list[str]:
+        """Add memberships that do not exist yet; returns ids of the added users."""
+        if not user_ids:
+            return []
+        source = (
+            func.unnest(cast(sorted(set(user_ids)), ARRAY(String)))
+            .table_valued("user_id")
+            .render_derived()
+        )
+        stmt = (
+            pg_insert(TeamMember)
+            .from_select(["team_name", "user_id"], select(literal(team_name), source.c.user_id))
+            .on_conflict_do_nothing()
+            .returning(TeamMember.user_id)
+        )
+        result = await self._db_session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def remove_members_except(self, team_name: str, keep_user_ids: list[str]) -> list[str]:
+        """Anti-join DELETE of every membership not in keep_user_ids; returns removed ids."""
+        stmt = (
+            delete(TeamMember)
+            .where(
+                TeamMember.team_name == team_name,
+                TeamMember.user_id != all_(cast(list(keep_user_ids), ARRAY(String))),
+            )
+            .returning(TeamMember.user_id)
+        )
+        result = await self._db_session.execute(stmt)
+        return list(result.scalars().all())
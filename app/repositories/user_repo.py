@@ -1,7 +1,7 @@
 import logging
-from collections.abc import Iterable
 
-from sqlalchemy import select, update
+from sqlalchemy import ARRAY, Boolean, String, cast, false, func, select, true, union_all, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -20,6 +20,11 @@ class UserRepository:
         result = await self._db_session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def exists(self, user_id: str) -> bool:
+        stmt = select(User.user_id).where(User.user_id == user_id)
+        result = await self._db_session.execute(stmt)
+        return result.scalar_one_or_none() is not None
+
     async def get_with_team(self, user_id: str) -> User | None:
         stmt = (
             select(User)
@@ -29,13 +34,45 @@ class UserRepository:
         result = await self._db_session.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def get_by_ids(self, user_ids: Iterable[str]) -> list[User]:
-        ids = list(user_ids)
-        if not ids:
+    async def get_team_names(self, user_id: str) -> list[str] | None:
+        """
+        User's team names in one round trip. None if user does not exist.
+        """
+        team_names = await self.get_team_names_for_users([user_id])
+        return team_names.get(user_id)
+
+    async def get_team_names_for_users(self, user_ids: list[str]) -> dict[str, list[str]]:
+        """
+        user_id -> team names for existing users (empty list if user has no teams).
+        """
+        if not user_ids:
+            return {}
+        stmt = (
+            select(User.user_id, TeamMember.team_name)
+            .outerjoin(TeamMember, TeamMember.user_id == User.user_id)
+            .where(User.user_id.in_(user_ids))
+        )
+        result = await self._db_session.execute(stmt)
+        team_names: dict[str, list[str]] = {}
+        for user_id, team_name in result.all():
+            names = team_names.setdefault(user_id, [])
+            if team_name is not None:
+                names.append(team_name)
+        return team_names
+
+    async def get_team_roster_rows(self, team_names: list[str]) -> list[tuple[str, str, bool]]:
+        """
+        (team_name, user_id, is_active) for every member of the given teams, without ORM hydration.
+        """
+        if not team_names:
             return []
-        stmt = select(User).where(User.user_id.in_(ids))
+        stmt = (
+            select(TeamMember.team_name, TeamMember.user_id, User.is_active)
+            .join(User, TeamMember.user_id == User.user_id)
+            .where(TeamMember.team_name.in_(team_names))
+        )
         result = await self._db_session.execute(stmt)
-        return list(result.scalars())
+        return [(row[0], row[1], row[2]) for row in result.all()]
 
     async def create_many(self, users_data: list[dict]) -> list[User]:
         if not users_data:
@@ -51,28 +88,57 @@ class UserRepository:
         self._db_session.add_all(users)
         return users
 
-    async def get_active_review_candidates_for_author(self, author: User) -> set[str]:
+    async def upsert_many(
+        self, users: list[tuple[str, str, bool]]
+    ) -> tuple[list[tuple[str, str, bool]], list[str]]:
         """
-        Candidates — all active users from author's teams. If author has no teams, return empty set.
+        Insert (user_id, username, is_active) rows or update existing users in one
+        statement; the whole batch is passed as three arrays. Rows that already hold
+        these values are left untouched. Returns (user_id, username, is_active) of all
+        given users as stored after the upsert, ordered by user_id, and ids of
+        inserted or changed users.
         """
-        if not author.teams:
-            return set()
-
-        team_names = [member.team_name for member in author.teams]
-        if not team_names:
-            return set()
-
-        stmt = (
-            select(TeamMember)
-            .join(User, TeamMember.user_id == User.user_id)
-            .where(
-                TeamMember.team_name.in_(team_names),
-                User.is_active.is_(True),
+        if not users:
+            return [], []
+        user_ids, usernames, is_active = zip(*sorted(users), strict=True)
+        source = (
+            func.unnest(
+                cast(list(user_ids), ARRAY(String)),
+                cast(list(usernames), ARRAY(String)),
+                cast(list(is_active), ARRAY(Boolean)),
+            )
+            .table_valued("user_id", "username", "is_active")
+            .render_derived()
+        )
+        insert_stmt = pg_insert(User).from_select(
+            ["user_id", "username", "is_active"],
+            select(source.c.user_id, source.c.username, source.c.is_active),
+        )
+        excluded = insert_stmt.excluded
+        upserted = (
+            insert_stmt.on_conflict_do_update(
+                index_elements=["user_id"],
+                set_={"username": excluded.username, "is_active": excluded.is_active},
+                where=(User.username != excluded.username) | (User.is_active != excluded.is_active),
             )
+            .returning(User.user_id, User.username, User.is_active)
+            .cte("upserted")
         )
+        # RETURNING отдаёт только записанные строки; остальные пользователи не менялись,
+        # и снимок, который видит тот же запрос, равен их значениям после upsert
+        rows = union_all(
+            select(upserted.c.user_id, upserted.c.username, upserted.c.is_active, true()),
+            select(User.user_id, User.username, User.is_active, false()).where(
+                User.user_id.in_(user_ids), User.user_id.not_in(select(upserted.c.user_id))
+            ),
+        ).subquery()
+        stmt = select(rows).order_by(rows.c.user_id)
         result = await self._db_session.execute(stmt)
-        members = result.scalars().all()
-        return {member.user_id for member in members}
+        stored = result.all()
+        return (
+            [(row[0], row[1], row[2]) for row in stored],
+            [row[0] for row in stored if row[3]],
+        )
 
     async def get_team_member_ids(self, team_name: str) -> list[str]:
         stmt = select(TeamMember.user_id).where(TeamMember.team_name == team_name)
@@ -85,10 +151,3 @@ class UserRepository:
         stmt = update(User).where(User.user_id.in_(user_ids)).values(is_active=False)
         res = await self._db_session.execute(stmt)
         return res.rowcount or 0  # type: ignore[attr-defined]
-
-    async def get_users_with_teams(self, user_ids: list[str]) -> list[User]:
-        if not user_ids:
-            return []
-        stmt = select(User).where(User.user_id.in_(user_ids)).options(selectinload(User.teams))
-        res = await self._db_session.execute(stmt)
-        return list(res.scalars().all())
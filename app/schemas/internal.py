@@ -0,0 +1,52 @@
+from pydantic import BaseModel
+
+# ---- inner DTO ----
+
+
+class CacheStatsDTO(BaseModel):
+    name: str
+    hits: int
+    misses: int
+    hit_ratio: float
+    size: int
+    maxsize: int
+
+
+class LatencyHistogramDTO(BaseModel):
+    count: int
+    sum_ms: float
+    max_ms: float
+    p50_ms: float | None
+    p95_ms: float | None
+    p99_ms: float | None
+    # верхние границы корзин в мс; последняя корзина (counts[-1]) — без границы
+    bounds_ms: list[float]
+    counts: list[int]
+
+
+class PoolStatsDTO(BaseModel):
+    name: str
+    pid: int
+    size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    max_overflow: int
+    checkouts: int
+    timeouts: int
+    liveness: str
+    liveness_pings: int
+    liveness_failures: int
+    wait: LatencyHistogramDTO
+    checkout: LatencyHistogramDTO
+
+
+# ---- responses ----
+
+
+class CacheStatsResponse(BaseModel):
+    caches: list[CacheStatsDTO]
+
+
+class PoolStatsResponse(BaseModel):
+    pools: list[PoolStatsDTO]
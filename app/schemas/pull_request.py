@@ -1,9 +1,11 @@
 import datetime
 
-from pydantic import BaseModel, ConfigDict, field_serializer
+from pydantic import BaseModel, ConfigDict, Field, field_serializer
 
 from app.schemas.schema_enums.pull_request_enums import PRStatus
 
+PR_BATCH_MAX_ITEMS = 10_000
+
 # ---- requests ----
 
 
@@ -13,6 +15,10 @@ class PullRequestCreateRequest(BaseModel):
     author_id: str
 
 
+class PullRequestCreateBatchRequest(BaseModel):
+    items: list[PullRequestCreateRequest] = Field(min_length=1, max_length=PR_BATCH_MAX_ITEMS)
+
+
 class PullRequestReassignRequest(BaseModel):
     pull_request_id: str
     old_reviewer_id: str
@@ -22,6 +28,10 @@ class PullRequestMergeRequest(BaseModel):
     pull_request_id: str
 
 
+class PullRequestMergeBatchRequest(BaseModel):
+    pull_request_ids: list[str] = Field(min_length=1, max_length=PR_BATCH_MAX_ITEMS)
+
+
 # ---- inner DTO ----
 
 
@@ -58,6 +68,18 @@ class PullRequestDTO(BaseModel):
         return v.isoformat().replace("+00:00", "Z")
 
 
+class BatchItemErrorDTO(BaseModel):
+    code: str
+    message: str
+
+
+class PullRequestBatchItemResult(BaseModel):
+    index: int
+    pull_request_id: str
+    pr: PullRequestDTO | None = None
+    error: BatchItemErrorDTO | None = None
+
+
 # ---- responses ----
 
 
@@ -65,6 +87,12 @@ class PullRequestCreateResponse(BaseModel):
     pr: PullRequestDTO
 
 
+class PullRequestCreateBatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[PullRequestBatchItemResult]
+
+
 class PullRequestReassignResponse(BaseModel):
     pr: PullRequestDTO
     replaced_by: str
@@ -72,3 +100,9 @@ class PullRequestReassignResponse(BaseModel):
 
 class PullRequestMergeResponse(BaseModel):
     pr: PullRequestDTO
+
+
+class PullRequestMergeBatchResponse(BaseModel):
+    merged: list[PullRequestDTO]
+    already_merged: list[str]
+    not_found: list[str]
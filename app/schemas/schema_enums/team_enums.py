@@ -0,0 +1,8 @@
+from enum import Enum as PyEnum
+
+
+class DeactivationJobStatus(PyEnum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
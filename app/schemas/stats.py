@@ -1,3 +1,5 @@
+from datetime import date
+
 from pydantic import BaseModel
 
 # ---- requests ----
@@ -20,6 +22,13 @@ class PrCountByStatus(BaseModel):
     MERGED: int
 
 
+class TimeToMergeStats(BaseModel):
+    merged: int
+    p50_seconds: float | None = None
+    p90_seconds: float | None = None
+    p99_seconds: float | None = None
+
+
 # ---- responses ----
 
 
@@ -28,3 +37,12 @@ class StatsResponse(BaseModel):
     open_prs_per_author: list[AuthorPrStats]
     merged_prs_per_author: list[AuthorPrStats]
     pr_count_by_status: PrCountByStatus
+
+
+class StatsWindowResponse(BaseModel):
+    date_from: date
+    date_to: date
+    opened_prs_per_author: list[AuthorPrStats]
+    merged_prs_per_author: list[AuthorPrStats]
+    assignments_per_reviewer: list[ReviewerAssignmentStats]
+    time_to_merge: TimeToMergeStats
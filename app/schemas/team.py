@@ -1,5 +1,8 @@
-from pydantic import BaseModel, ConfigDict
+import datetime
 
+from pydantic import BaseModel, ConfigDict, model_validator
+
+from app.schemas.schema_enums.team_enums import DeactivationJobStatus
 from app.schemas.user import TeamMemberDTO
 
 # ---- requests ----
@@ -19,6 +22,21 @@ class TeamDeactivateUsersRequest(BaseModel):
     user_ids: list[str] | None = None
 
 
+class TeamImportRow(BaseModel):
+    """One NDJSON line of /team/import: a team, or a member of it when user_id is set."""
+
+    team_name: str
+    user_id: str | None = None
+    username: str | None = None
+    is_active: bool = True
+
+    @model_validator(mode="after")
+    def _member_has_username(self) -> "TeamImportRow":
+        if self.user_id is not None and self.username is None:
+            raise ValueError("username is required for a member row")
+        return self
+
+
 # ---- inner DTO ----
 
 
@@ -29,6 +47,24 @@ class TeamDTO(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class TeamDeactivationJobDTO(BaseModel):
+    job_id: str
+    team_name: str
+    status: DeactivationJobStatus
+    total_users: int
+    processed_users: int
+    deactivated: list[str]
+    reassigned_prs: int
+    error: str | None = None
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+
+
+class TeamImportLineError(BaseModel):
+    line: int
+    error: str
+
+
 # ---- responses ----
 
 
@@ -39,12 +75,38 @@ class TeamAddResponse(BaseModel):
 
 class TeamGetResponse(BaseModel):
     team: TeamDTO
+    version: int
     model_config = ConfigDict(from_attributes=True)
 
 
+class TeamDeltaResponse(BaseModel):
+    """Members added or changed after `since` (current state) and removed user ids."""
+
+    team_name: str
+    since: int
+    version: int
+    members: list[TeamMemberDTO]
+    removed: list[str]
+
+
 class TeamDeactivateUsersResponse(BaseModel):
     team_name: str
     deactivated: list[str]
     reassigned_prs: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class TeamDeactivationJobResponse(BaseModel):
+    job: TeamDeactivationJobDTO
+
+
+class TeamImportResponse(BaseModel):
+    lines: int
+    imported_rows: int
+    teams_created: int
+    users_changed: int
+    members_added: int
+    errors: list[TeamImportLineError]
+    # ошибок больше, чем помещается в ответ
+    errors_truncated: bool = False
@@ -2,6 +2,9 @@ from pydantic import BaseModel, ConfigDict
 
 from app.schemas.pull_request import PullRequestShortDTO
 
+REVIEWS_PAGE_DEFAULT_LIMIT = 100
+REVIEWS_PAGE_MAX_LIMIT = 1000
+
 # ---- requests ----
 
 
@@ -40,3 +43,5 @@ class UserSetIsActiveResponse(BaseModel):
 class UserReviewsResponse(BaseModel):
     user_id: str
     pull_requests: list[PullRequestShortDTO]
+    # передать в cursor, чтобы получить следующую страницу; None — страниц больше нет
+    next_cursor: str | None = None
@@ -0,0 +1,59 @@
+from collections.abc import AsyncIterator
+from datetime import UTC, date, datetime, time, timedelta
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.repositories.pull_request_repo import PullRequestRepository
+from app.schemas.schema_enums.pull_request_enums import PRStatus
+from app.utils.http_exceptions import http_error
+
+# naive-значения из БД — UTC (см. StatsDelta)
+_ORJSON_OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NAIVE_UTC
+
+
+class ExportService:
+    def resolve_range(
+        self, day_from: date | None, day_to: date | None
+    ) -> tuple[datetime | None, datetime | None]:
+        """Inclusive UTC days ?from=&to= as a half-open [start, end) range of instants."""
+        if day_from is not None and day_to is not None and day_from > day_to:
+            http_error(400, "BAD_RANGE", "from is after to")
+        start = datetime.combine(day_from, time(), UTC) if day_from else None
+        end = datetime.combine(day_to + timedelta(days=1), time(), UTC) if day_to else None
+        return start, end
+
+    async def stream_pull_requests(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        status: PRStatus | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        NDJSON, one PR with its reviewers per line, one chunk per EXPORT_BATCH_SIZE
+        rows. Memory does not depend on the export size: rows are fetched from a
+        server-side cursor and every batch is encoded and handed off before the next.
+        Opens its own session: the body is produced after the endpoint has returned.
+        """
+        async with session_factory() as db_session, db_session.begin():
+            result = await PullRequestRepository(db_session).stream_for_export(
+                settings.EXPORT_BATCH_SIZE, status, created_from, created_to
+            )
+            async for rows in result.partitions():
+                yield b"".join(
+                    orjson.dumps(
+                        {
+                            "pull_request_id": row.pull_request_id,
+                            "pull_request_name": row.pull_request_name,
+                            "author_id": row.author_id,
+                            "status": row.status,
+                            "created_at": row.created_at,
+                            "merged_at": row.merged_at,
+                            "assigned_reviewers": row.reviewer_ids or [],
+                        },
+                        option=_ORJSON_OPTIONS,
+                    )
+                    for row in rows
+                )
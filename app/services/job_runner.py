@@ -0,0 +1,50 @@
+import asyncio
+import contextvars
+import logging
+from collections.abc import Coroutine
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class JobRunner:
+    """
+    In-process registry of background tasks, so they are not garbage collected
+    and can be cancelled on shutdown. Jobs must be safe to re-run after cancel.
+    Tasks start in an empty contextvars context, detached from the spawning request.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def spawn(self, name: str, coro: Coroutine[Any, Any, Any]) -> None:
+        if name in self._tasks:
+            coro.close()
+            return
+        # пустой контекст: задача переживает запрос и не должна попадать в recorder запроса
+        # (бюджет, метрики) или в любое другое состояние запроса
+        self._tasks[name] = asyncio.create_task(
+            self._run(name, coro), name=name, context=contextvars.Context()
+        )
+
+    def is_running(self, name: str) -> bool:
+        return name in self._tasks
+
+    async def _run(self, name: str, coro: Coroutine[Any, Any, Any]) -> None:
+        try:
+            await coro
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Background job %s failed", name)
+        finally:
+            self._tasks.pop(name, None)
+
+    async def shutdown(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+job_runner = JobRunner()
@@ -7,9 +7,18 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.pull_request import PullRequest
 from app.repositories.pull_request_repo import PullRequestRepository
+from app.repositories.stats_counter_repo import StatsCounterRepository, StatsDelta
 from app.repositories.user_repo import UserRepository
-from app.schemas.pull_request import PullRequestDTO
+from app.schemas.pull_request import (
+    BatchItemErrorDTO,
+    PullRequestBatchItemResult,
+    PullRequestCreateBatchResponse,
+    PullRequestCreateRequest,
+    PullRequestDTO,
+    PullRequestMergeBatchResponse,
+)
 from app.schemas.schema_enums.pull_request_enums import PRStatus
+from app.services.roster_cache import roster_cache
 from app.utils.http_exceptions import http_error
 
 
@@ -25,37 +34,147 @@ class PRService:
         user_repo = UserRepository(db_session)
 
         async with db_session.begin():
-            existing = await pr_repo.get_by_id(pull_request_id, with_reviewers=True)
-            if existing:
-                http_error(409, "PR_EXISTS", "PR id already exists")
-
-            author = await user_repo.get_with_team(author_id)
-            if not author:
+            team_names = await roster_cache.get_team_names(user_repo, author_id)
+            if team_names is None:
+                await self._raise_if_pr_exists(pr_repo, pull_request_id)
                 http_error(404, "NOT_FOUND", "Author not found")
 
-            candidate_ids = await user_repo.get_active_review_candidates_for_author(author)
-            if not author.teams or not candidate_ids:
+            candidate_ids = await roster_cache.get_active_member_ids(user_repo, team_names)
+            if not team_names or not candidate_ids:
+                await self._raise_if_pr_exists(pr_repo, pull_request_id)
                 http_error(404, "NOT_FOUND", "Author team not found")
 
             reviewer_ids = self._choose_reviewers(candidate_ids, author_id)
 
-            pr = PullRequest(
+            created = await pr_repo.create_with_reviewers(
                 pull_request_id=pull_request_id,
                 pull_request_name=pull_request_name,
                 author_id=author_id,
-                status=PRStatus.OPEN,
+                reviewer_ids=reviewer_ids,
+                created_at=datetime.now(UTC),
             )
-            await pr_repo.create(pr)
-            if reviewer_ids:
-                await pr_repo.assign_reviewers(pr, reviewer_ids)
-            await db_session.flush()
-        db_session.expire_all()
+            if created is None:
+                await self._raise_if_pr_exists(pr_repo, pull_request_id)
+                http_error(404, "NOT_FOUND", "Author not found")
 
-        created_pr = await pr_repo.get_by_id(pull_request_id, with_reviewers=True)
-        if not created_pr:
-            http_error(500, "NOT_FOUND", "PR not found after creation")
+            row, assigned_reviewers = created
+            delta = StatsDelta()
+            delta.pr_created(author_id, assigned_reviewers, row.created_at)
+            await StatsCounterRepository(db_session).apply(delta)
 
-        return self._build_pr_dto(created_pr)
+        return PullRequestDTO(
+            pull_request_id=row.pull_request_id,
+            pull_request_name=row.pull_request_name,
+            author_id=row.author_id,
+            status=row.status,
+            assigned_reviewers=assigned_reviewers,
+            created_at=row.created_at,
+            merged_at=row.merged_at,
+        )
+
+    async def create_pr_batch(
+        self,
+        db_session: AsyncSession,
+        items: list[PullRequestCreateRequest],
+    ) -> PullRequestCreateBatchResponse:
+        """
+        Same rules as create_pr, but authors and rosters are resolved once per batch,
+        and rows are bulk-inserted in one transaction. Bad items don't fail the batch.
+        """
+        pr_repo = PullRequestRepository(db_session)
+        user_repo = UserRepository(db_session)
+
+        results: list[PullRequestBatchItemResult | None] = [None] * len(items)
+
+        def fail(index: int, code: str, message: str) -> None:
+            results[index] = PullRequestBatchItemResult(
+                index=index,
+                pull_request_id=items[index].pull_request_id,
+                error=BatchItemErrorDTO(code=code, message=message),
+            )
+
+        created_at = datetime.now(UTC)
+        async with db_session.begin():
+            taken_ids = await pr_repo.get_existing_ids(
+                list({item.pull_request_id for item in items})
+            )
+            team_names_by_author = await roster_cache.get_team_names_for_users(
+                user_repo, [item.author_id for item in items]
+            )
+            active_by_team = await roster_cache.get_active_member_ids_by_team(
+                user_repo, [name for names in team_names_by_author.values() for name in names]
+            )
+
+            pending: list[tuple[int, list[str]]] = []
+            for index, item in enumerate(items):
+                if item.pull_request_id in taken_ids:
+                    fail(index, "PR_EXISTS", "PR id already exists")
+                    continue
+                team_names = team_names_by_author.get(item.author_id)
+                if team_names is None:
+                    fail(index, "NOT_FOUND", "Author not found")
+                    continue
+                candidate_ids = set().union(*(active_by_team[name] for name in team_names))
+                if not team_names or not candidate_ids:
+                    fail(index, "NOT_FOUND", "Author team not found")
+                    continue
+                taken_ids.add(item.pull_request_id)
+                pending.append((index, self._choose_reviewers(candidate_ids, item.author_id)))
+
+            inserted_ids = await pr_repo.create_many(
+                [
+                    {
+                        "pull_request_id": items[index].pull_request_id,
+                        "pull_request_name": items[index].pull_request_name,
+                        "author_id": items[index].author_id,
+                        "status": PRStatus.OPEN,
+                        "created_at": created_at,
+                    }
+                    for index, _ in pending
+                ]
+            )
+            assigned_ids = await pr_repo.assign_reviewers_bulk(
+                [
+                    (items[index].pull_request_id, reviewer_id)
+                    for index, reviewer_ids in pending
+                    if items[index].pull_request_id in inserted_ids
+                    for reviewer_id in reviewer_ids
+                ]
+            )
+
+            delta = StatsDelta()
+            for index, _ in pending:
+                if items[index].pull_request_id in inserted_ids:
+                    delta.pr_created(items[index].author_id, [], created_at)
+            delta.reviewers_assigned(assigned_ids, created_at)
+            await StatsCounterRepository(db_session).apply(delta)
+
+        created = 0
+        for index, reviewer_ids in pending:
+            item = items[index]
+            if item.pull_request_id not in inserted_ids:
+                # id заняли параллельным запросом между проверкой и вставкой
+                fail(index, "PR_EXISTS", "PR id already exists")
+                continue
+            results[index] = PullRequestBatchItemResult(
+                index=index,
+                pull_request_id=item.pull_request_id,
+                pr=PullRequestDTO(
+                    pull_request_id=item.pull_request_id,
+                    pull_request_name=item.pull_request_name,
+                    author_id=item.author_id,
+                    status=PRStatus.OPEN,
+                    assigned_reviewers=reviewer_ids,
+                    created_at=created_at,
+                ),
+            )
+            created += 1
+
+        return PullRequestCreateBatchResponse(
+            created=created,
+            failed=len(items) - created,
+            results=[result for result in results if result is not None],
+        )
 
     async def merge_pr(
         self,
@@ -71,14 +190,55 @@ class PRService:
 
             if pr.status != PRStatus.MERGED:
                 pr.status = PRStatus.MERGED
-                pr.merged_at = datetime.now(UTC)
+                merged_at = datetime.now(UTC)
+                pr.merged_at = merged_at
+                delta = StatsDelta()
+                delta.pr_merged(pr.author_id, pr.created_at, merged_at)
+                await StatsCounterRepository(db_session).apply(delta)
 
-        merged_pr = await pr_repo.get_by_id(pull_request_id, with_reviewers=True)
+        async with db_session.begin():
+            merged_pr = await pr_repo.get_by_id(pull_request_id, with_reviewers=True)
         if not merged_pr:
             http_error(500, "NOT_FOUND", "PR not found after merge")
 
         return self._build_pr_dto(merged_pr)
 
+    async def merge_pr_batch(
+        self,
+        db_session: AsyncSession,
+        pull_request_ids: list[str],
+    ) -> PullRequestMergeBatchResponse:
+        pr_repo = PullRequestRepository(db_session)
+        requested_ids = list(dict.fromkeys(pull_request_ids))
+
+        async with db_session.begin():
+            merged_rows = await pr_repo.merge_many(requested_ids, merged_at=datetime.now(UTC))
+            merged_ids = {row.pull_request_id for row in merged_rows}
+            delta = StatsDelta()
+            for row in merged_rows:
+                delta.pr_merged(row.author_id, row.created_at, row.merged_at)
+            await StatsCounterRepository(db_session).apply(delta)
+            rest_ids = [pr_id for pr_id in requested_ids if pr_id not in merged_ids]
+            existing_ids = await pr_repo.get_existing_ids(rest_ids)
+            reviewers = await pr_repo.get_reviewer_ids_by_pr(list(merged_ids))
+
+        return PullRequestMergeBatchResponse(
+            merged=[
+                PullRequestDTO(
+                    pull_request_id=row.pull_request_id,
+                    pull_request_name=row.pull_request_name,
+                    author_id=row.author_id,
+                    status=row.status,
+                    assigned_reviewers=reviewers.get(row.pull_request_id, []),
+                    created_at=row.created_at,
+                    merged_at=row.merged_at,
+                )
+                for row in merged_rows
+            ],
+            already_merged=[pr_id for pr_id in rest_ids if pr_id in existing_ids],
+            not_found=[pr_id for pr_id in rest_ids if pr_id not in existing_ids],
+        )
+
     async def reassign_reviewer(
         self,
         db_session: AsyncSession,
@@ -100,11 +260,11 @@ class PRService:
             if old_reviewer_id not in current_reviewer_ids:
                 http_error(409, "NOT_ASSIGNED", "reviewer is not assigned to this PR")
 
-            old_user = await user_repo.get_with_team(old_reviewer_id)
-            if not old_user:
+            team_names = await user_repo.get_team_names(old_reviewer_id)
+            if team_names is None:
                 http_error(404, "NOT_FOUND", "Reviewer user not found")
 
-            candidate_ids = await user_repo.get_active_review_candidates_for_author(old_user)
+            candidate_ids = await roster_cache.get_active_member_ids(user_repo, team_names)
 
             other_reviewer_ids = current_reviewer_ids - {old_reviewer_id}
             forbidden_ids = {pr.author_id, old_reviewer_id} | other_reviewer_ids
@@ -118,14 +278,26 @@ class PRService:
             await pr_repo.replace_reviewer(
                 pr, old_reviewer_id=old_reviewer_id, new_user_id=new_reviewer_id
             )
+            delta = StatsDelta()
+            delta.reviewers_removed([old_reviewer_id])
+            delta.reviewers_assigned([new_reviewer_id], datetime.now(UTC))
+            await StatsCounterRepository(db_session).apply(delta)
             await db_session.flush()
         db_session.expire_all()
-        updated_pr = await pr_repo.get_by_id(pull_request_id, with_reviewers=True)
+        async with db_session.begin():
+            updated_pr = await pr_repo.get_by_id(pull_request_id, with_reviewers=True)
         if not updated_pr:
             http_error(500, "NOT_FOUND", "PR not found after reassign")
 
         return self._build_pr_dto(updated_pr), new_reviewer_id
 
+    async def _raise_if_pr_exists(
+        self, pr_repo: PullRequestRepository, pull_request_id: str
+    ) -> None:
+        # дубликат PR важнее остальных ошибок создания, как и раньше
+        if await pr_repo.exists(pull_request_id):
+            http_error(409, "PR_EXISTS", "PR id already exists")
+
     def _choose_replacement_reviewer(self, candidate_ids: set[str]) -> str:
         return random.choice(list(candidate_ids))
 
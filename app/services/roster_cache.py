@@ -0,0 +1,130 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.repositories.user_repo import UserRepository
+from app.utils.ttl_cache import CacheStats, TTLCache
+
+
+@dataclass(frozen=True, slots=True)
+class TeamRoster:
+    member_ids: frozenset[str]
+    active_ids: frozenset[str]
+
+
+class TeamRosterCache:
+    """
+    Per-worker cache of team rosters and user -> teams used for reviewer selection.
+
+    Keeps all member ids (not only active ones) so that a change of any user's
+    is_active can drop every team the user belongs to.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._rosters: TTLCache[str, TeamRoster] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._user_teams: TTLCache[str, tuple[str, ...]] = TTLCache(maxsize=maxsize, ttl=ttl)
+        # bumps on every invalidation: a value read before a concurrent write
+        # must not be stored after that write has invalidated it
+        self._generation = 0
+
+    async def get_team_names(self, user_repo: UserRepository, user_id: str) -> list[str] | None:
+        """
+        Same contract as UserRepository.get_team_names: None if user does not exist.
+        """
+        team_names = await self.get_team_names_for_users(user_repo, [user_id])
+        return team_names.get(user_id)
+
+    async def get_team_names_for_users(
+        self, user_repo: UserRepository, user_ids: Iterable[str]
+    ) -> dict[str, list[str]]:
+        """
+        user_id -> team names; users that do not exist are absent from the result.
+        """
+        team_names: dict[str, list[str]] = {}
+        missing: list[str] = []
+        for user_id in dict.fromkeys(user_ids):
+            cached = self._user_teams.get(user_id)
+            if cached is None:
+                missing.append(user_id)
+            else:
+                team_names[user_id] = list(cached)
+
+        if missing:
+            generation = self._generation
+            loaded = await user_repo.get_team_names_for_users(missing)
+            for user_id, names in loaded.items():
+                team_names[user_id] = names
+                if generation == self._generation:
+                    self._user_teams.set(user_id, tuple(names))
+        return team_names
+
+    async def get_active_member_ids(
+        self, user_repo: UserRepository, team_names: Iterable[str]
+    ) -> set[str]:
+        by_team = await self.get_active_member_ids_by_team(user_repo, team_names)
+        return set().union(*by_team.values())
+
+    async def get_active_member_ids_by_team(
+        self, user_repo: UserRepository, team_names: Iterable[str]
+    ) -> dict[str, frozenset[str]]:
+        active_ids: dict[str, frozenset[str]] = {}
+        missing: list[str] = []
+        for team_name in dict.fromkeys(team_names):
+            roster = self._rosters.get(team_name)
+            if roster is None:
+                missing.append(team_name)
+            else:
+                active_ids[team_name] = roster.active_ids
+
+        if missing:
+            generation = self._generation
+            rows = await user_repo.get_team_roster_rows(missing)
+            members: dict[str, set[str]] = {team_name: set() for team_name in missing}
+            active: dict[str, set[str]] = {team_name: set() for team_name in missing}
+            for team_name, user_id, is_active in rows:
+                members[team_name].add(user_id)
+                if is_active:
+                    active[team_name].add(user_id)
+            for team_name in missing:
+                roster = TeamRoster(
+                    member_ids=frozenset(members[team_name]),
+                    active_ids=frozenset(active[team_name]),
+                )
+                active_ids[team_name] = roster.active_ids
+                if generation == self._generation:
+                    self._rosters.set(team_name, roster)
+        return active_ids
+
+    def invalidate_teams(self, team_names: Iterable[str]) -> None:
+        names = frozenset(team_names)
+        self._generation += 1
+        for team_name in names:
+            self._rosters.invalidate(team_name)
+        self._user_teams.invalidate_where(lambda _, teams: not names.isdisjoint(teams))
+
+    def invalidate_users(self, user_ids: Iterable[str]) -> None:
+        ids = frozenset(user_ids)
+        if not ids:
+            return
+        self._generation += 1
+        self._rosters.invalidate_where(lambda _, roster: not ids.isdisjoint(roster.member_ids))
+        for user_id in ids:
+            self._user_teams.invalidate(user_id)
+
+    def clear(self) -> None:
+        self._generation += 1
+        for cache in (self._rosters, self._user_teams):
+            cache.clear()
+            cache.reset_stats()
+
+    def stats(self) -> dict[str, CacheStats]:
+        return {
+            "team_roster": self._rosters.stats(),
+            "user_teams": self._user_teams.stats(),
+        }
+
+
+roster_cache = TeamRosterCache(
+    maxsize=settings.ROSTER_CACHE_MAXSIZE,
+    ttl=settings.ROSTER_CACHE_TTL_SECONDS,
+)
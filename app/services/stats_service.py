@@ -1,5 +1,12 @@
+import re
+from datetime import UTC, date, datetime, timedelta
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.db_routing import ReadRouter
+from app.repositories.stats_counter_repo import StatsCounterRepository
+from app.repositories.stats_daily_repo import StatsDailyRepository
 from app.repositories.stats_repo import StatsRepository
 from app.schemas.schema_enums.pull_request_enums import PRStatus
 from app.schemas.stats import (
@@ -7,30 +14,158 @@ from app.schemas.stats import (
     PrCountByStatus,
     ReviewerAssignmentStats,
     StatsResponse,
+    StatsWindowResponse,
+    TimeToMergeStats,
+)
+from app.utils.histogram import histogram_percentile
+from app.utils.http_cache import JSONPayload
+from app.utils.http_exceptions import http_error
+from app.utils.swr_cache import StaleWhileRevalidate
+
+STATS_WINDOW_DEFAULT_DAYS = 7
+STATS_WINDOW_MAX_DAYS = 366
+_WINDOW_RE = re.compile(r"^(\d+)d$")
+
+stats_response_cache: StaleWhileRevalidate[JSONPayload] = StaleWhileRevalidate(
+    ttl=settings.STATS_CACHE_TTL_SECONDS,
+    stale_ttl=settings.STATS_CACHE_STALE_SECONDS,
 )
 
 
 class StatsService:
+    async def get_stats_payload(self, read_db: ReadRouter) -> JSONPayload:
+        """
+        Serialized /stats response from the per-worker cache. Refreshes run through
+        the read router with their own session since they may outlive the request
+        that triggered them. A client pinned to the primary (read-your-writes) gets
+        a fresh response: the cache may be older than its write.
+        """
+
+        async def load() -> JSONPayload:
+            return JSONPayload.from_model(await read_db.run(self.get_stats))
+
+        if read_db.pinned:
+            return await load()
+        return await stats_response_cache.get(load)
+
     async def get_stats(self, db_session: AsyncSession) -> StatsResponse:
-        repo = StatsRepository(db_session)
+        snapshot = await StatsRepository(db_session).get_snapshot()
+
+        def per_author(status: PRStatus) -> list[AuthorPrStats]:
+            return [
+                AuthorPrStats(user_id=author_id, count=count)
+                for (author_id, pr_status), count in snapshot.author_prs.items()
+                if pr_status == status and count > 0
+            ]
 
-        assignments = await repo.get_assignments_per_reviewer()
-        open_prs = await repo.get_open_prs_per_author()
-        merged_prs = await repo.get_merged_prs_per_author()
-        status_counts = await repo.get_pr_count_by_status()
         return StatsResponse(
             assignments_per_reviewer=[
                 ReviewerAssignmentStats(user_id=user_id, count=count)
-                for user_id, count in assignments
+                for user_id, count in snapshot.reviewer_assignments.items()
+                if count > 0
             ],
-            open_prs_per_author=[
-                AuthorPrStats(user_id=user_id, count=count) for user_id, count in open_prs
+            open_prs_per_author=per_author(PRStatus.OPEN),
+            merged_prs_per_author=per_author(PRStatus.MERGED),
+            pr_count_by_status=PrCountByStatus(
+                OPEN=max(snapshot.pr_status.get(PRStatus.OPEN, 0), 0),
+                MERGED=max(snapshot.pr_status.get(PRStatus.MERGED, 0), 0),
+            ),
+        )
+
+    async def reconcile_counters(
+        self, db_session: AsyncSession, dry_run: bool = False
+    ) -> list[tuple[str, object, int, int]]:
+        """
+        Recomputes stats counters from pull_requests / pr_reviewers and overwrites them.
+        Returns the drift found: (counter, key, stored, actual).
+        """
+        repo = StatsCounterRepository(db_session)
+        async with db_session.begin():
+            # пишущие транзакции ждут, пока идёт пересчёт, иначе их дельты потеряются
+            await repo.lock()
+            stored = await StatsRepository(db_session).get_snapshot()
+            actual = await repo.compute_from_source()
+            drift = stored.diff(actual)
+            if drift and not dry_run:
+                await repo.replace(actual)
+        return drift
+
+    def resolve_window(
+        self, day_from: date | None, day_to: date | None, window: str | None
+    ) -> tuple[date, date]:
+        """
+        ?from=&to= (inclusive UTC days) or ?window=Nd ending at `to` (default: today).
+        """
+        if window is not None and day_from is not None:
+            http_error(400, "BAD_WINDOW", "use either window or from")
+        day_to = day_to or datetime.now(UTC).date()
+        if window is not None:
+            match = _WINDOW_RE.match(window)
+            if not match or int(match.group(1)) < 1:
+                http_error(400, "BAD_WINDOW", "window must look like 7d")
+            day_from = day_to - timedelta(days=int(match.group(1)) - 1)
+        elif day_from is None:
+            day_from = day_to - timedelta(days=STATS_WINDOW_DEFAULT_DAYS - 1)
+
+        if day_from > day_to:
+            http_error(400, "BAD_WINDOW", "from is after to")
+        if (day_to - day_from).days + 1 > STATS_WINDOW_MAX_DAYS:
+            http_error(400, "BAD_WINDOW", f"window is longer than {STATS_WINDOW_MAX_DAYS} days")
+        return day_from, day_to
+
+    async def get_window_stats(
+        self, db_session: AsyncSession, day_from: date, day_to: date
+    ) -> StatsWindowResponse:
+        """Sums of the daily rollups of [day_from, day_to]; never touches pull_requests."""
+        repo = StatsDailyRepository(db_session)
+        async with db_session.begin():
+            totals = await repo.get_user_totals(day_from, day_to)
+            histogram = await repo.get_merge_time_histogram(day_from, day_to)
+
+        return StatsWindowResponse(
+            date_from=day_from,
+            date_to=day_to,
+            opened_prs_per_author=[
+                AuthorPrStats(user_id=user_id, count=opened)
+                for user_id, opened, _, _ in totals
+                if opened > 0
             ],
             merged_prs_per_author=[
-                AuthorPrStats(user_id=user_id, count=count) for user_id, count in merged_prs
+                AuthorPrStats(user_id=user_id, count=merged)
+                for user_id, _, merged, _ in totals
+                if merged > 0
             ],
-            pr_count_by_status=PrCountByStatus(
-                OPEN=status_counts.get(PRStatus.OPEN, 0),
-                MERGED=status_counts.get(PRStatus.MERGED, 0),
+            assignments_per_reviewer=[
+                ReviewerAssignmentStats(user_id=user_id, count=assigned)
+                for user_id, _, _, assigned in totals
+                if assigned > 0
+            ],
+            time_to_merge=TimeToMergeStats(
+                merged=sum(histogram.values()),
+                p50_seconds=histogram_percentile(histogram, 0.5),
+                p90_seconds=histogram_percentile(histogram, 0.9),
+                p99_seconds=histogram_percentile(histogram, 0.99),
             ),
         )
+
+    async def backfill_daily(
+        self,
+        db_session: AsyncSession,
+        day_from: date | None = None,
+        day_to: date | None = None,
+    ) -> tuple[date, date, int, int] | None:
+        """
+        Rebuilds daily rollups of the given days (default: all days with PR events).
+        Returns (day_from, day_to, user rows, histogram rows), None if there is nothing.
+        """
+        repo = StatsDailyRepository(db_session)
+        async with db_session.begin():
+            await repo.lock()
+            if day_from is None or day_to is None:
+                source_range = await repo.get_source_day_range()
+                if source_range is None:
+                    return None
+                day_from = day_from or source_range[0]
+                day_to = day_to or source_range[1]
+            users_rows, merge_time_rows = await repo.rebuild(day_from, day_to)
+        return day_from, day_to, users_rows, merge_time_rows
@@ -1,29 +1,55 @@
+import logging
 import random
+import uuid
+from collections.abc import AsyncIterable
+from datetime import UTC, datetime, timedelta
 
-from sqlalchemy.ext.asyncio import AsyncSession
+import orjson
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.core.config import settings
+from app.models.deactivation_job import DeactivationJob
 from app.models.team import Team
+from app.repositories.deactivation_job_repo import DeactivationJobRepository
 from app.repositories.pull_request_repo import PullRequestRepository
+from app.repositories.stats_counter_repo import StatsCounterRepository, StatsDelta
+from app.repositories.team_import_repo import ImportRow, TeamImportRepository
 from app.repositories.team_repo import TeamRepository
 from app.repositories.user_repo import UserRepository
+from app.schemas.schema_enums.team_enums import DeactivationJobStatus
 from app.schemas.team import (
     TeamAddRequest,
     TeamDeactivateUsersRequest,
     TeamDeactivateUsersResponse,
+    TeamDeactivationJobDTO,
     TeamDTO,
+    TeamImportLineError,
+    TeamImportResponse,
+    TeamImportRow,
 )
 from app.schemas.user import TeamMemberDTO
+from app.services.job_runner import job_runner
+from app.services.roster_cache import roster_cache
+from app.utils.http_cache import JSONPayload, etag_matches
 from app.utils.http_exceptions import http_error
+from app.utils.ndjson import LineTooLongError, iter_lines
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# ответы /team/get: ключ содержит версию, поэтому инвалидация не нужна
+team_response_cache: TTLCache[tuple[str, int], JSONPayload] = TTLCache(
+    maxsize=settings.TEAM_CACHE_MAXSIZE,
+    ttl=settings.TEAM_CACHE_TTL_SECONDS,
+)
 
 
 class TeamService:
-    async def create_team(
-            self, db_session: AsyncSession, request: TeamAddRequest
-    ) -> TeamDTO:
+    async def create_team(self, db_session: AsyncSession, request: TeamAddRequest) -> TeamDTO:
         team_repo = TeamRepository(db_session=db_session)
         user_repo = UserRepository(db_session=db_session)
 
-
         async with db_session.begin():
             team = await team_repo.get_by_name(request.team_name, with_relation=True)
             if team:
@@ -40,17 +66,26 @@ class TeamService:
                 for payload in request.members
             ]
             await user_repo.create_many(new_users_data)
-
-            await team_repo.add_members_bulk(request.team_name, list([member.user_id for member in request.members]))
+            # участники добавляются INSERT ... SELECT: команда и пользователи уже должны быть в БД
             await db_session.flush()
+
+            await team_repo.add_members_bulk(
+                request.team_name, list([member.user_id for member in request.members])
+            )
         db_session.expire_all()
+        roster_cache.invalidate_teams([request.team_name])
 
-        team_with_members = await team_repo.get_by_name(request.team_name, with_relation=True)
+        async with db_session.begin():
+            team_with_members = await team_repo.get_by_name(request.team_name, with_relation=True)
         return self._build_team_dto(team_with_members)
 
     async def create_or_update_team(
         self, db_session: AsyncSession, request: TeamAddRequest
     ) -> TeamDTO:
+        """
+        Set-based: one upsert of users, one upsert of memberships and one DELETE of
+        members missing from the request, without loading the team into the session.
+        """
         team_repo = TeamRepository(db_session=db_session)
         user_repo = UserRepository(db_session=db_session)
 
@@ -58,45 +93,197 @@ class TeamService:
         member_ids = set(member_by_id.keys())
 
         async with db_session.begin():
-            team = await team_repo.get_by_name(request.team_name, with_relation=True)
-            if not team:
-                team = await team_repo.create_team(request.team_name)
-            existing_member_ids = {member.user_id for member in team.members}
+            await team_repo.ensure_team(request.team_name)
+            member_rows, changed_user_ids = await user_repo.upsert_many(
+                [
+                    (payload.user_id, payload.username, payload.is_active)
+                    for payload in member_by_id.values()
+                ]
+            )
+            added_ids = await team_repo.add_members_bulk(request.team_name, list(member_ids))
+            removed_ids = await team_repo.remove_members_except(request.team_name, list(member_ids))
 
-            for member in team.members:
-                user = member.user
-                payload = member_by_id.get(member.user_id)
-                if payload:
-                    user.username = payload.username
-                    user.is_active = payload.is_active
+            # участники могут состоять и в других командах — их ответы тоже изменились
+            changed_members = await team_repo.get_teams_by_member(changed_user_ids)
+            changed_members.setdefault(request.team_name, set()).update(
+                changed_user_ids, added_ids, removed_ids
+            )
+            await team_repo.bump_versions(changed_members)
+        roster_cache.invalidate_teams([request.team_name])
+        roster_cache.invalidate_users(member_ids | set(removed_ids))
+
+        return TeamDTO(
+            team_name=request.team_name,
+            members=[
+                TeamMemberDTO(user_id=user_id, username=username, is_active=is_active)
+                for user_id, username, is_active in member_rows
+            ],
+        )
 
-            new_users_data = [
-                {
-                    "user_id": payload.user_id,
-                    "username": payload.username,
-                    "is_active": payload.is_active,
-                }
-                for user_id, payload in member_by_id.items()
-                if user_id not in existing_member_ids
-            ]
-            await user_repo.create_many(new_users_data)
+    async def import_ndjson(
+        self, db_session: AsyncSession, chunks: AsyncIterable[bytes]
+    ) -> TeamImportResponse:
+        """
+        Streaming /team/import: lines are validated one at a time and loaded in
+        batches of TEAM_IMPORT_BATCH_SIZE, each batch in its own transaction.
+        Additive: creates teams and users, updates users and adds memberships,
+        but never removes members that are missing from the upload.
+        """
+        response = TeamImportResponse(
+            lines=0, imported_rows=0, teams_created=0, users_changed=0, members_added=0, errors=[]
+        )
 
-            removed_member_ids = list(existing_member_ids - member_ids)
-            await team_repo.remove_members_by_user_ids(team.team_name, removed_member_ids)
+        def report(line_no: int, error: str) -> None:
+            if len(response.errors) < settings.TEAM_IMPORT_MAX_ERRORS:
+                response.errors.append(TeamImportLineError(line=line_no, error=error))
+            else:
+                response.errors_truncated = True
+
+        batch: list[ImportRow] = []
+        async for line_no, line in iter_lines(chunks, settings.TEAM_IMPORT_MAX_LINE_BYTES):
+            response.lines += 1
+            if isinstance(line, LineTooLongError):
+                report(line_no, str(line))
+                continue
+            try:
+                row = TeamImportRow.model_validate_json(line)
+            except ValidationError as exc:
+                report(line_no, self._format_validation_error(exc))
+                continue
+            batch.append((line_no, row.team_name, row.user_id, row.username, row.is_active))
+            if len(batch) >= settings.TEAM_IMPORT_BATCH_SIZE:
+                await self._import_batch(db_session, batch, response)
+                batch = []
+        if batch:
+            await self._import_batch(db_session, batch, response)
+        return response
+
+    async def _import_batch(
+        self, db_session: AsyncSession, batch: list[ImportRow], response: TeamImportResponse
+    ) -> None:
+        import_repo = TeamImportRepository(db_session)
+        team_repo = TeamRepository(db_session)
 
-            await team_repo.add_members_bulk(request.team_name, list(member_ids))
-            await db_session.flush()
-        db_session.expire_all()
+        async with db_session.begin():
+            await import_repo.load(batch)
+            created_teams = await import_repo.merge_teams()
+            changed_user_ids = await import_repo.merge_users()
+            added_members = await import_repo.merge_members()
+
+            changed_members = await team_repo.get_teams_by_member(changed_user_ids)
+            for team_name, user_id in added_members:
+                changed_members.setdefault(team_name, set()).add(user_id)
+            await team_repo.bump_versions(changed_members)
+        roster_cache.invalidate_teams([*created_teams, *changed_members])
+        roster_cache.invalidate_users(
+            [*changed_user_ids, *(user_id for _, user_id in added_members)]
+        )
 
-        team_with_members = await team_repo.get_by_name(request.team_name, with_relation=True)
-        return self._build_team_dto(team_with_members)
+        response.imported_rows += len(batch)
+        response.teams_created += len(created_teams)
+        response.users_changed += len(changed_user_ids)
+        response.members_added += len(added_members)
 
-    async def get_team(self, db: AsyncSession, team_name: str) -> TeamDTO:
-        team_repo = TeamRepository(db)
-        team = await team_repo.get_by_name(team_name, with_relation=True)
-        if not team:
-            http_error(404, "NOT_FOUND", "Team not found")
-        return self._build_team_dto(team)
+    @staticmethod
+    def _format_validation_error(exc: ValidationError) -> str:
+        return "; ".join(
+            f"{'.'.join(map(str, error['loc']))}: {error['msg']}" if error["loc"] else error["msg"]
+            for error in exc.errors()
+        )
+
+    async def get_team_payload(
+        self,
+        db_session: AsyncSession,
+        team_name: str,
+        if_none_match: str | None = None,
+        since: int | None = None,
+    ) -> JSONPayload:
+        """
+        Serialized TeamGetResponse with ETag derived from the team version.
+        An unchanged team costs one primary-key lookup of the version: the body
+        comes from the per-worker cache, or is not needed at all (304).
+
+        With `since` — TeamDeltaResponse with members changed after that version,
+        or the full response if the change log no longer covers it.
+        """
+        team_repo = TeamRepository(db_session)
+        delta = None
+        # соединение нужно только на время чтения: сериализация идёт уже без него
+        async with db_session.begin():
+            version = await team_repo.get_version(team_name)
+            if version is None:
+                http_error(404, "NOT_FOUND", "Team not found")
+            etag = self._team_etag(version)
+            if etag_matches(if_none_match, etag):
+                # тело не нужно: клиент получит 304
+                return JSONPayload(body=b"", etag=etag)
+
+            if since is not None and since <= version:
+                delta = await self._build_team_delta(team_repo, team_name, since, version)
+            if delta is None:
+                payload = team_response_cache.get((team_name, version))
+                if payload is not None:
+                    return payload
+                # версия растёт в той же транзакции, что и изменения участников, и прочитана
+                # раньше состава: под ключом версии может оказаться более новый состав,
+                # но не более старый
+                rows = await team_repo.get_member_rows(team_name)
+
+        if delta is not None:
+            return JSONPayload(body=orjson.dumps(delta), etag=etag)
+        body = orjson.dumps(
+            {
+                "team": {
+                    "team_name": team_name,
+                    "members": [
+                        {"user_id": user_id, "username": username, "is_active": is_active}
+                        for user_id, username, is_active in rows
+                    ],
+                },
+                "version": version,
+            }
+        )
+        payload = JSONPayload(body=body, etag=etag)
+        team_response_cache.set((team_name, version), payload)
+        return payload
+
+    async def _build_team_delta(
+        self, team_repo: TeamRepository, team_name: str, since: int, version: int
+    ) -> dict | None:
+        """None if changes after `since` are (partly) trimmed from the log."""
+        changed_ids = []
+        if since < version:
+            # без верхней границы по версии: изменения новее `version` попадут в ответ
+            # и придут ещё раз в следующей дельте, это безопасно — отдаём текущее состояние
+            changed_ids = await team_repo.get_changed_member_ids(team_name, since)
+            # журнал читаем до проверки границы: чистка между запросами даст полный снимок
+            oldest = await team_repo.get_oldest_logged_version(team_name)
+            # версии в журнале идут подряд, первая из них — oldest
+            if oldest is None or since < oldest - 1:
+                return None
+
+        rows = await team_repo.get_member_rows(team_name, changed_ids)
+        current_ids = {user_id for user_id, _, _ in rows}
+        return {
+            "team_name": team_name,
+            "since": since,
+            "version": version,
+            "members": [
+                {"user_id": user_id, "username": username, "is_active": is_active}
+                for user_id, username, is_active in rows
+            ],
+            "removed": sorted(set(changed_ids) - current_ids),
+        }
+
+    async def trim_change_log(self, db_session: AsyncSession) -> int:
+        """Delete change log entries older than the retention period."""
+        before = datetime.now(UTC) - timedelta(hours=settings.TEAM_CHANGES_RETENTION_HOURS)
+        async with db_session.begin():
+            return await TeamRepository(db_session).trim_changes(before)
+
+    @staticmethod
+    def _team_etag(version: int) -> str:
+        return f'"v{version}"'
 
     def _build_team_dto(self, team: Team | None) -> TeamDTO:
         if not team:
@@ -121,24 +308,10 @@ class TeamService:
         team_repo = TeamRepository(db_session)
         user_repo = UserRepository(db_session)
         pr_repo = PullRequestRepository(db_session)
+        stats_repo = StatsCounterRepository(db_session)
 
         async with db_session.begin():
-            team = await team_repo.get_by_name(payload.team_name, with_relation=False)
-            if not team:
-                http_error(404, "NOT_FOUND", "Team not found")
-
-            team_member_ids = await user_repo.get_team_member_ids(payload.team_name)
-            if not team_member_ids:
-                # команда есть, но пуста
-                return TeamDeactivateUsersResponse(
-                    team_name=payload.team_name,
-                    deactivated=[],
-                    reassigned_prs=0,
-                )
-
-            target_ids = set(team_member_ids if payload.user_ids is None else payload.user_ids)
-            target_ids &= set(team_member_ids)  # нельзя деактивировать не-члена команды
-
+            target_ids = await self._resolve_deactivation_targets(team_repo, user_repo, payload)
             if not target_ids:
                 return TeamDeactivateUsersResponse(
                     team_name=payload.team_name,
@@ -147,47 +320,229 @@ class TeamService:
                 )
 
             await user_repo.deactivate_users(list(target_ids))
+            await team_repo.bump_versions_for_members(list(target_ids))
+            reassigned = await self._reassign_reviews_of(user_repo, pr_repo, stats_repo, target_ids)
+        roster_cache.invalidate_users(target_ids)
 
-            prs = await pr_repo.get_open_prs_with_reviewers(list(target_ids))
+        return TeamDeactivateUsersResponse(
+            team_name=payload.team_name,
+            deactivated=list(target_ids),
+            reassigned_prs=reassigned,
+        )
 
-            inactive_users = await user_repo.get_users_with_teams(list(target_ids))
-            inactive_by_id = {u.user_id: u for u in inactive_users}
+    async def _resolve_deactivation_targets(
+        self,
+        team_repo: TeamRepository,
+        user_repo: UserRepository,
+        payload: TeamDeactivateUsersRequest,
+    ) -> set[str]:
+        team = await team_repo.get_by_name(payload.team_name, with_relation=False)
+        if not team:
+            http_error(404, "NOT_FOUND", "Team not found")
 
-            reassigned = 0
+        team_member_ids = await user_repo.get_team_member_ids(payload.team_name)
+        target_ids = set(team_member_ids if payload.user_ids is None else payload.user_ids)
+        target_ids &= set(team_member_ids)  # нельзя деактивировать не-члена команды
+        return target_ids
 
-            for pr in prs:
-                current_reviewers = {r.reviewer_id for r in pr.reviewers}
-                inactive_here = current_reviewers & target_ids
-                if not inactive_here:
+    async def _reassign_reviews_of(
+        self,
+        user_repo: UserRepository,
+        pr_repo: PullRequestRepository,
+        stats_repo: StatsCounterRepository,
+        inactive_ids: set[str],
+        excluded_ids: set[str] | None = None,
+    ) -> int:
+        """
+        Set-based replacement of (already deactivated) reviewers on open PRs:
+        candidate pools are loaded once, replacements are picked in memory and
+        applied with one DELETE and one INSERT. Returns number of replacements.
+
+        excluded_ids are never picked as replacements (users of later chunks of
+        the same background job that are still active).
+        """
+        rows = await pr_repo.get_open_pr_reviewer_rows(list(inactive_ids))
+        if not rows:
+            return 0
+
+        team_names_by_user = await user_repo.get_team_names_for_users(list(inactive_ids))
+        active_by_team: dict[str, set[str]] = {}
+        for team_name, user_id, is_active in await user_repo.get_team_roster_rows(
+            list({name for names in team_names_by_user.values() for name in names})
+        ):
+            members = active_by_team.setdefault(team_name, set())
+            if is_active:
+                members.add(user_id)
+
+        author_by_pr: dict[str, str] = {}
+        reviewers_by_pr: dict[str, list[str]] = {}
+        for pull_request_id, author_id, reviewer_id in rows:
+            author_by_pr[pull_request_id] = author_id
+            reviewers_by_pr.setdefault(pull_request_id, []).append(reviewer_id)
+
+        new_assignments: list[tuple[str, str]] = []
+        for pull_request_id, reviewer_ids in reviewers_by_pr.items():
+            current_reviewers = set(reviewer_ids)
+            for old_id in reviewer_ids:
+                if old_id not in inactive_ids:
+                    continue
+                current_reviewers.discard(old_id)
+                candidate_ids = set().union(
+                    *(active_by_team.get(name, ()) for name in team_names_by_user.get(old_id, ()))
+                )
+                candidate_ids -= {author_by_pr[pull_request_id], old_id} | current_reviewers
+                if excluded_ids:
+                    candidate_ids -= excluded_ids
+                if not candidate_ids:
                     continue
+                new_id = random.choice(list(candidate_ids))
+                current_reviewers.add(new_id)
+                new_assignments.append((pull_request_id, new_id))
+
+        delta = StatsDelta()
+        delta.reviewers_removed(await pr_repo.remove_reviewers_from_open_prs(list(inactive_ids)))
+        delta.reviewers_assigned(
+            await pr_repo.assign_reviewers_bulk(new_assignments), datetime.now(UTC)
+        )
+        await stats_repo.apply(delta)
+        return len(new_assignments)
 
-                for old_id in list(inactive_here):
-                    old_user = inactive_by_id.get(old_id)
-                    if not old_user:
-                        await pr_repo.remove_reviewer(pr.pull_request_id, old_id)
-                        current_reviewers.discard(old_id)
-                        continue
+    # ---- background deactivation ----
 
-                    candidate_ids = await user_repo.get_active_review_candidates_for_author(
-                        old_user
-                    )
+    async def start_deactivation_job(
+        self,
+        db_session: AsyncSession,
+        session_factory: async_sessionmaker[AsyncSession],
+        payload: TeamDeactivateUsersRequest,
+    ) -> TeamDeactivationJobDTO:
+        team_repo = TeamRepository(db_session)
+        user_repo = UserRepository(db_session)
+        job_repo = DeactivationJobRepository(db_session)
 
-                    forbidden = {pr.author_id, old_id} | (current_reviewers - {old_id})
-                    candidate_ids = {cid for cid in candidate_ids if cid not in forbidden}
+        async with db_session.begin():
+            target_ids = await self._resolve_deactivation_targets(team_repo, user_repo, payload)
+            now = datetime.now(UTC)
+            job = await job_repo.create(
+                DeactivationJob(
+                    job_id=uuid.uuid4().hex,
+                    team_name=payload.team_name,
+                    user_ids=sorted(target_ids),
+                    status=(
+                        DeactivationJobStatus.PENDING if target_ids else DeactivationJobStatus.DONE
+                    ),
+                    processed_users=0,
+                    reassigned_prs=0,
+                    created_at=now,
+                    updated_at=now,
+                )
+            )
 
-                    if not candidate_ids:
-                        await pr_repo.remove_reviewer(pr.pull_request_id, old_id)
-                        current_reviewers.discard(old_id)
-                        continue
+        if job.status == DeactivationJobStatus.PENDING:
+            self._spawn_deactivation_job(session_factory, job.job_id)
+        return self._build_deactivation_job_dto(job)
 
-                    new_id = random.choice(list(candidate_ids))
-                    await pr_repo.replace_reviewer(pr, old_id, new_id)
-                    current_reviewers.discard(old_id)
-                    current_reviewers.add(new_id)
-                    reassigned += 1
+    async def get_deactivation_job(
+        self, db_session: AsyncSession, job_id: str
+    ) -> TeamDeactivationJobDTO:
+        async with db_session.begin():
+            job = await DeactivationJobRepository(db_session).get_by_id(job_id)
+        if not job:
+            http_error(404, "NOT_FOUND", "Job not found")
+        return self._build_deactivation_job_dto(job)
+
+    async def resume_deactivation_jobs(
+        self, session_factory: async_sessionmaker[AsyncSession]
+    ) -> None:
+        async with session_factory() as db_session, db_session.begin():
+            job_ids = await DeactivationJobRepository(db_session).get_unfinished_ids()
+        for job_id in job_ids:
+            logger.info("Resuming deactivation job %s", job_id)
+            self._spawn_deactivation_job(session_factory, job_id)
+
+    async def run_deactivation_job(
+        self, session_factory: async_sessionmaker[AsyncSession], job_id: str
+    ) -> None:
+        has_more = True
+        while has_more:
+            has_more = await self._process_deactivation_chunk(session_factory, job_id)
+
+    def _spawn_deactivation_job(
+        self, session_factory: async_sessionmaker[AsyncSession], job_id: str
+    ) -> None:
+        job_runner.spawn(
+            f"deactivation:{job_id}", self.run_deactivation_job(session_factory, job_id)
+        )
 
-        return TeamDeactivateUsersResponse(
-            team_name=payload.team_name,
-            deactivated=list(target_ids),
-            reassigned_prs=reassigned,
+    async def _process_deactivation_chunk(
+        self, session_factory: async_sessionmaker[AsyncSession], job_id: str
+    ) -> bool:
+        """
+        One chunk in its own transaction, together with the checkpoint.
+        Returns True while there is work left for this runner.
+        """
+        async with session_factory() as db_session:
+            team_repo = TeamRepository(db_session)
+            user_repo = UserRepository(db_session)
+            pr_repo = PullRequestRepository(db_session)
+            stats_repo = StatsCounterRepository(db_session)
+            job_repo = DeactivationJobRepository(db_session)
+            try:
+                async with db_session.begin():
+                    job = await job_repo.lock_for_processing(job_id)
+                    if not job or job.status in (
+                        DeactivationJobStatus.DONE,
+                        DeactivationJobStatus.FAILED,
+                    ):
+                        # нет такой задачи, или её прямо сейчас обрабатывает другой воркер
+                        return False
+
+                    start = job.processed_users
+                    chunk = job.user_ids[start : start + settings.DEACTIVATION_JOB_CHUNK_SIZE]
+                    if chunk:
+                        await user_repo.deactivate_users(chunk)
+                        await team_repo.bump_versions_for_members(chunk)
+                        job.reassigned_prs += await self._reassign_reviews_of(
+                            user_repo,
+                            pr_repo,
+                            stats_repo,
+                            set(chunk),
+                            excluded_ids=set(job.user_ids),
+                        )
+                        job.processed_users += len(chunk)
+                    done = job.processed_users >= len(job.user_ids)
+                    job.status = (
+                        DeactivationJobStatus.DONE if done else DeactivationJobStatus.RUNNING
+                    )
+                    job.updated_at = datetime.now(UTC)
+            except Exception as exc:
+                await self._fail_deactivation_job(session_factory, job_id, exc)
+                raise
+        roster_cache.invalidate_users(chunk)
+        return not done
+
+    async def _fail_deactivation_job(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        job_id: str,
+        exc: Exception,
+    ) -> None:
+        async with session_factory() as db_session, db_session.begin():
+            job = await DeactivationJobRepository(db_session).get_by_id(job_id)
+            if job:
+                job.status = DeactivationJobStatus.FAILED
+                job.error = f"{type(exc).__name__}: {exc}"
+                job.updated_at = datetime.now(UTC)
+
+    def _build_deactivation_job_dto(self, job: DeactivationJob) -> TeamDeactivationJobDTO:
+        return TeamDeactivationJobDTO(
+            job_id=job.job_id,
+            team_name=job.team_name,
+            status=job.status,
+            total_users=len(job.user_ids),
+            processed_users=job.processed_users,
+            deactivated=job.user_ids[: job.processed_users],
+            reassigned_prs=job.reassigned_prs,
+            error=job.error,
+            created_at=job.created_at,
+            updated_at=job.updated_at,
         )
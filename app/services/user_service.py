@@ -1,14 +1,19 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repositories.pull_request_repo import PullRequestRepository
+from app.repositories.team_repo import TeamRepository
 from app.repositories.user_repo import UserRepository
 from app.schemas.pull_request import PullRequestShortDTO
+from app.schemas.schema_enums.pull_request_enums import PRStatus
 from app.schemas.user import (
+    REVIEWS_PAGE_DEFAULT_LIMIT,
     UserDTO,
     UserReviewsResponse,
     UserSetIsActiveRequest,
     UserSetIsActiveResponse,
 )
+from app.services.roster_cache import roster_cache
+from app.utils.cursor import decode_cursor, encode_cursor
 from app.utils.http_exceptions import http_error
 
 
@@ -21,20 +26,47 @@ class UserService:
             user = await repo.get_with_team(payload.user_id)
             if not user:
                 http_error(404, "NOT_FOUND", "User not found")
-            user.is_active = payload.is_active
+            if user.is_active != payload.is_active:
+                user.is_active = payload.is_active
+                await TeamRepository(db_session).bump_versions_for_members([payload.user_id])
+        roster_cache.invalidate_users([payload.user_id])
         response = UserSetIsActiveResponse(user=self._build_user_dto(user))
         return response
 
-    async def get_reviews(self, db_session: AsyncSession, user_id: str) -> UserReviewsResponse:
+    async def get_reviews(
+        self,
+        db_session: AsyncSession,
+        user_id: str,
+        status: PRStatus | None = None,
+        limit: int = REVIEWS_PAGE_DEFAULT_LIMIT,
+        cursor: str | None = None,
+    ) -> UserReviewsResponse:
         user_repo = UserRepository(db_session)
         pr_repo = PullRequestRepository(db_session)
-        user = await user_repo.get_with_team(user_id)
-        if not user:
-            http_error(404, "NOT_FOUND", "User not found")
-        prs = await pr_repo.get_review_assignments(user_id)
+
+        before = None
+        if cursor is not None:
+            try:
+                before = decode_cursor(cursor)
+            except ValueError:
+                http_error(400, "BAD_CURSOR", "cursor is malformed")
+
+        async with db_session.begin():
+            if not await user_repo.exists(user_id):
+                http_error(404, "NOT_FOUND", "User not found")
+            # лишняя строка — признак того, что есть следующая страница
+            rows = await pr_repo.get_review_assignments_page(
+                user_id, limit=limit + 1, status=status, before=before
+            )
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            last = page[-1]
+            next_cursor = encode_cursor(last.pr_created_at, last.pull_request_id)
         return UserReviewsResponse(
             user_id=user_id,
-            pull_requests=[self._build_pull_request_short_dto(pr) for pr in prs],
+            pull_requests=[self._build_pull_request_short_dto(row) for row in page],
+            next_cursor=next_cursor,
         )
 
     def _build_user_dto(self, user) -> UserDTO:
@@ -0,0 +1,102 @@
+from bisect import bisect_right
+from collections.abc import Mapping, Sequence
+
+_MINUTE = 60
+_HOUR = 60 * _MINUTE
+_DAY = 24 * _HOUR
+
+# верхние границы корзин времени до merge, в секундах; последняя корзина — без границы
+MERGE_TIME_BUCKET_BOUNDS: tuple[int, ...] = (
+    5 * _MINUTE,
+    15 * _MINUTE,
+    30 * _MINUTE,
+    1 * _HOUR,
+    2 * _HOUR,
+    4 * _HOUR,
+    8 * _HOUR,
+    12 * _HOUR,
+    1 * _DAY,
+    2 * _DAY,
+    3 * _DAY,
+    5 * _DAY,
+    7 * _DAY,
+    14 * _DAY,
+    30 * _DAY,
+)
+
+
+# верхние границы корзин задержек, в миллисекундах
+LATENCY_BUCKET_BOUNDS_MS: tuple[float, ...] = (
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    25,
+    50,
+    100,
+    250,
+    500,
+    1000,
+    2500,
+    5000,
+    10000,
+)
+
+
+def merge_time_bucket(seconds: float) -> int:
+    """
+    Bucket index, same as Postgres width_bucket(seconds, MERGE_TIME_BUCKET_BOUNDS):
+    bucket i holds bounds[i - 1] <= seconds < bounds[i].
+    """
+    return bisect_right(MERGE_TIME_BUCKET_BOUNDS, seconds)
+
+
+def histogram_percentile(
+    counts: Mapping[int, int],
+    q: float,
+    bounds: Sequence[float] = MERGE_TIME_BUCKET_BOUNDS,
+) -> float | None:
+    """
+    q-th percentile (0 < q <= 1) of a bucketed histogram, interpolated linearly
+    inside the bucket. The open-ended last bucket reports its lower bound.
+    """
+    total = sum(counts.values())
+    if total <= 0:
+        return None
+    rank = q * total
+    seen = 0
+    for bucket in sorted(counts):
+        count = counts[bucket]
+        if count <= 0:
+            continue
+        if seen + count >= rank:
+            lower = bounds[bucket - 1] if bucket > 0 else 0
+            if bucket >= len(bounds):
+                return float(lower)
+            upper = bounds[bucket]
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+    return float(bounds[-1])
+
+
+class LatencyHistogram:
+    """Per-process bucketed durations in milliseconds (same bucketing as merge_time_bucket)."""
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKET_BOUNDS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect_right(self.bounds, ms)] += 1
+        self.count += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float | None:
+        return histogram_percentile(dict(enumerate(self.counts)), q, self.bounds)
@@ -0,0 +1,34 @@
+import hashlib
+from dataclasses import dataclass
+
+from fastapi import Response
+from pydantic import BaseModel
+
+
+@dataclass(frozen=True, slots=True)
+class JSONPayload:
+    """Serialized response body together with its strong ETag."""
+
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_model(cls, model: BaseModel) -> "JSONPayload":
+        body = model.model_dump_json().encode()
+        return cls(body=body, etag=f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"')
+
+    def to_response(self, if_none_match: str | None = None) -> Response:
+        headers = {"ETag": self.etag}
+        if etag_matches(if_none_match, self.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match uses weak comparison (RFC 9110, 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
@@ -0,0 +1,48 @@
+from collections.abc import AsyncIterable, AsyncIterator
+
+
+class LineTooLongError(ValueError):
+    pass
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], max_line_bytes: int
+) -> AsyncIterator[tuple[int, bytes | LineTooLongError]]:
+    """
+    Split a byte stream into NDJSON lines: (1-based line number, line without the
+    trailing newline). Blank lines are skipped but counted. Lines longer than
+    max_line_bytes are yielded as LineTooLongError and never buffered whole, so memory
+    is bounded by max_line_bytes plus one chunk.
+    """
+    buffer = bytearray()
+    line_no = 0
+    overflow = False  # текущая строка уже слишком длинная, пропускаем её до перевода строки
+
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end == -1:
+                if not overflow:
+                    buffer += chunk[start:]
+                    if len(buffer) > max_line_bytes:
+                        overflow = True
+                        buffer.clear()
+                break
+            line_no += 1
+            if overflow:
+                overflow = False
+                yield line_no, LineTooLongError(f"line is longer than {max_line_bytes} bytes")
+            else:
+                buffer += chunk[start:end]
+                if len(buffer) > max_line_bytes:
+                    yield line_no, LineTooLongError(f"line is longer than {max_line_bytes} bytes")
+                elif buffer.strip():
+                    yield line_no, bytes(buffer)
+            buffer.clear()
+            start = end + 1
+
+    if overflow:
+        yield line_no + 1, LineTooLongError(f"line is longer than {max_line_bytes} bytes")
+    elif buffer.strip():
+        yield line_no + 1, bytes(buffer)
@@ -0,0 +1,95 @@
+import asyncio
+import contextvars
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from app.utils.ttl_cache import CacheStats
+
+logger = logging.getLogger(__name__)
+
+
+class StaleWhileRevalidate[V]:
+    """
+    Per-process cache of a single value with stale-while-revalidate semantics:
+
+    - younger than ttl: served as is;
+    - older, but within ttl + stale_ttl: served as is while one background
+      refresh runs;
+    - missing or older than that: callers wait for one shared load.
+
+    ttl <= 0 disables caching (every get calls the loader).
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        stale_ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._value: V | None = None
+        self._loaded_at = 0.0
+        self._loading: asyncio.Task[V] | None = None
+        # clear() during a load: the loaded value is from before the clear, don't store it
+        self._generation = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    async def get(self, loader: Callable[[], Awaitable[V]]) -> V:
+        if self.ttl <= 0:
+            self.misses += 1
+            return await loader()
+
+        if self._value is not None:
+            age = self._clock() - self._loaded_at
+            if age < self.ttl:
+                self.hits += 1
+                return self._value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._load(loader)
+                return self._value
+
+        self.misses += 1
+        # shield: отмена одного ожидающего запроса не должна отменять общую загрузку
+        return await asyncio.shield(self._load(loader))
+
+    def _load(self, loader: Callable[[], Awaitable[V]]) -> asyncio.Task[V]:
+        if self._loading is None:
+            # загрузка общая для всех ожидающих: контекст (recorder запроса) не наследуется
+            self._loading = asyncio.create_task(self._run(loader), context=contextvars.Context())
+            self._loading.add_done_callback(self._on_loaded)
+        return self._loading
+
+    async def _run(self, loader: Callable[[], Awaitable[V]]) -> V:
+        generation = self._generation
+        value = await loader()
+        if generation == self._generation:
+            self._value = value
+            self._loaded_at = self._clock()
+        return value
+
+    def _on_loaded(self, task: asyncio.Task[V]) -> None:
+        if self._loading is task:
+            self._loading = None
+        if not task.cancelled() and task.exception() is not None:
+            # ожидающие (если были) получили исключение сами, устаревшее значение остаётся
+            logger.warning("Cache refresh failed", exc_info=task.exception())
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._loading = None
+        self._value = None
+        self.hits = self.stale_hits = self.misses = 0
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self.hits + self.stale_hits,
+            misses=self.misses,
+            size=0 if self._value is None else 1,
+            maxsize=1,
+        )
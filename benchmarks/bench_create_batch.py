@@ -0,0 +1,54 @@
+"""
+POST /pullRequest/create (one by one) vs POST /pullRequest/createBatch.
+
+Runs in-process through the ASGI app against the configured database
+(schema must be migrated: `alembic upgrade head`).
+
+    uv run python -m benchmarks.bench_create_batch --items 2000 --team-size 50
+"""
+
+import argparse
+import asyncio
+import time
+
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+from benchmarks.common import pr_items, seed_team, unique_prefix
+
+
+async def run(items: int, team_size: int) -> None:
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        prefix = unique_prefix()
+        author_ids = await seed_team(client, prefix, team_size)
+
+        single_items = pr_items(f"{prefix}_single", author_ids, items)
+        started = time.perf_counter()
+        for item in single_items:
+            r = await client.post("/api/v1/pullRequest/create", json=item)
+            r.raise_for_status()
+        single = time.perf_counter() - started
+
+        batch_items = pr_items(f"{prefix}_batch", author_ids, items)
+        started = time.perf_counter()
+        r = await client.post("/api/v1/pullRequest/createBatch", json={"items": batch_items})
+        r.raise_for_status()
+        batch = time.perf_counter() - started
+        assert r.json()["created"] == items, r.json()["failed"]
+
+    print(f"items={items} team_size={team_size}")
+    print(f"single: {single:8.3f}s  {items / single:10.0f} PR/s")
+    print(f"batch:  {batch:8.3f}s  {items / batch:10.0f} PR/s  (x{single / batch:.1f})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--team-size", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.team_size))
+
+
+if __name__ == "__main__":
+    main()
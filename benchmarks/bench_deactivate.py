@@ -0,0 +1,50 @@
+"""
+POST /team/deactivateUsers over a team with many open PRs.
+
+Runs in-process through the ASGI app against the configured database
+(schema must be migrated: `alembic upgrade head`).
+
+    uv run python -m benchmarks.bench_deactivate --open-prs 10000 --team-size 200
+"""
+
+import argparse
+import asyncio
+import time
+
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+from benchmarks.common import seed_open_prs, seed_team, unique_prefix
+
+
+async def run(open_prs: int, team_size: int, deactivate: int) -> None:
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        prefix = unique_prefix()
+        member_ids = await seed_team(client, prefix, team_size)
+        await seed_open_prs(client, prefix, member_ids, open_prs)
+
+        started = time.perf_counter()
+        r = await client.post(
+            "/api/v1/team/deactivateUsers",
+            json={"team_name": f"{prefix}_team", "user_ids": member_ids[:deactivate]},
+        )
+        r.raise_for_status()
+        elapsed = time.perf_counter() - started
+
+    body = r.json()
+    print(f"open_prs={open_prs} team_size={team_size} deactivated={len(body['deactivated'])}")
+    print(f"deactivateUsers: {elapsed:8.3f}s  reassigned={body['reassigned_prs']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--open-prs", type=int, default=10_000)
+    parser.add_argument("--team-size", type=int, default=200)
+    parser.add_argument("--deactivate", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(run(args.open_prs, args.team_size, args.deactivate))
+
+
+if __name__ == "__main__":
+    main()
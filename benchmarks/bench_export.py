@@ -0,0 +1,95 @@
+"""
+GET /export/pull_requests throughput and memory: the streaming export vs loading
+the same result set at once (what a paginating client effectively builds up).
+
+PRs are generated server-side (generate_series). The export generator is driven
+directly, without an HTTP transport in between, so the numbers are DB + encoding.
+Peak memory is traced with tracemalloc in a separate pass (it slows Python down).
+Seeded rows are removed at the end.
+
+    uv run python -m benchmarks.bench_export --prs 1000000
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+import orjson
+from httpx import ASGITransport, AsyncClient
+
+from app.core.db import AsyncSessionLocal
+from app.main import app
+from app.repositories.pull_request_repo import PullRequestRepository
+from app.services.export_service import ExportService
+from benchmarks.common import cleanup_seeded, seed_pr_history, seed_team, unique_prefix
+
+
+async def streaming_export() -> tuple[int, int]:
+    lines = size = 0
+    async for chunk in ExportService().stream_pull_requests(AsyncSessionLocal):
+        lines += chunk.count(b"\n")
+        size += len(chunk)
+    return lines, size
+
+
+async def buffered_export() -> tuple[int, int]:
+    async with AsyncSessionLocal() as db_session, db_session.begin():
+        result = await PullRequestRepository(db_session).stream_for_export(batch_size=10_000)
+        rows = [row async for row in result]
+    body = b"".join(
+        orjson.dumps(
+            {**row._asdict(), "reviewer_ids": row.reviewer_ids or []},
+            option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NAIVE_UTC,
+        )
+        for row in rows
+    )
+    return len(rows), len(body)
+
+
+async def measure(label: str, export) -> None:
+    started = time.perf_counter()
+    lines, size = await export()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    await export()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    print(
+        f"{label:<10} {lines:>10} rows {elapsed:7.2f}s {lines / elapsed:>10,.0f} rows/s "
+        f"{size / elapsed / 2**20:7.1f} MiB/s  peak {peak / 2**20:8.1f} MiB"
+    )
+
+
+async def run(prs: int, users: int, buffered: bool) -> None:
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        prefix = unique_prefix()
+        member_ids = await seed_team(client, prefix, users)
+    try:
+        started = time.perf_counter()
+        await seed_pr_history(prefix, len(member_ids), prs)
+        print(f"seeded prs={prs} reviewers={2 * prs}: {time.perf_counter() - started:.1f}s")
+
+        await measure("streaming", streaming_export)
+        if buffered:
+            await measure("buffered", buffered_export)
+    finally:
+        await cleanup_seeded(prefix)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--prs", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument(
+        "--no-buffered", dest="buffered", action="store_false", help="skip the in-memory baseline"
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.prs, args.users, args.buffered))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+Service-layer microbenchmarks: PRService, TeamService, UserService and
+StatsService methods called directly, one session per call as in a request.
+
+Seeds --teams teams of --team-size members with --prs-per-team PRs each
+(every third merged, two reviewers per PR) under a unique prefix, then runs
+every case --warmup + --rounds times. Per case it reports wall time
+(min / median / p95), SQL statements per call and the peak of Python memory
+allocated during a call (tracemalloc, in separate --alloc-rounds so tracing
+does not slow down the timed rounds). Seeded rows are removed at the end.
+
+Runs against the configured database (schema must be migrated:
+`alembic upgrade head`).
+
+    uv run python -m benchmarks.bench_services --output bench.json
+    uv run python -m benchmarks.bench_services --compare bench.json --threshold 0.2
+
+With --compare the run fails (exit code 1) when a case got slower or
+allocates more than the baseline by more than the threshold (relative, on
+medians), or issues more SQL statements than the baseline.
+
+The same cases run as pytest tests (test_bench_services.py, marker
+"benchmark", deselected by default): `uv run pytest -m benchmark benchmarks/`.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import AsyncSessionLocal
+from app.core.query_recorder import QueryRecorder, current_query_recorder
+from app.main import app
+from app.schemas.team import TeamAddRequest, TeamDeactivateUsersRequest
+from app.schemas.user import TeamMemberDTO
+from app.services.pr_service import PRService
+from app.services.stats_service import StatsService
+from app.services.team_service import TeamService, team_response_cache
+from app.services.user_service import UserService
+from benchmarks.common import cleanup_seeded, seed_pr_history, seed_team, unique_prefix
+
+# вызов метода сервиса, аргументы уже подготовлены
+Call = Callable[[AsyncSession], Awaitable[Any]]
+
+
+@dataclass
+class Scale:
+    prefix: str
+    teams: int
+    team_size: int
+
+    def team(self, round_no: int) -> str:
+        return f"{self.prefix}_t{round_no % self.teams}_team"
+
+    def member(self, round_no: int, index: int = 0) -> str:
+        return f"{self.prefix}_t{round_no % self.teams}_u{index % self.team_size}"
+
+
+async def _fetch_one(sql: str, **params) -> Any:
+    async with AsyncSessionLocal() as db_session:
+        return (await db_session.execute(text(sql), params)).one()
+
+
+async def _random_open_assignment(scale: Scale) -> tuple[str, str]:
+    assignment: tuple[str, str] = await _fetch_one(
+        "SELECT r.pull_request_id, r.reviewer_id FROM pr_reviewers r "
+        "JOIN pull_requests p USING (pull_request_id) "
+        "WHERE p.status = 'OPEN' AND p.pull_request_id LIKE :pattern "
+        "ORDER BY random() LIMIT 1",
+        pattern=f"{scale.prefix}_t%",
+    )
+    return assignment
+
+
+async def _random_active_member(scale: Scale, team_name: str) -> str:
+    user_id: str
+    (user_id,) = await _fetch_one(
+        "SELECT m.user_id FROM team_members m JOIN users u USING (user_id) "
+        "WHERE m.team_name = :team AND u.is_active ORDER BY random() LIMIT 1",
+        team=team_name,
+    )
+    return user_id
+
+
+# каждая подготовка выполняется вне замера и возвращает вызов для замера
+async def prepare_create_pr(scale: Scale, round_no: int) -> Call:
+    pr_id = f"{scale.prefix}_new{round_no}"
+    author_id = scale.member(round_no, round_no)
+    return lambda db_session: PRService().create_pr(db_session, pr_id, "bench", author_id)
+
+
+async def prepare_reassign_reviewer(scale: Scale, round_no: int) -> Call:
+    pr_id, reviewer_id = await _random_open_assignment(scale)
+    return lambda db_session: PRService().reassign_reviewer(db_session, pr_id, reviewer_id)
+
+
+async def prepare_merge_pr(scale: Scale, round_no: int) -> Call:
+    pr_id, _ = await _random_open_assignment(scale)
+    return lambda db_session: PRService().merge_pr(db_session, pr_id)
+
+
+async def prepare_create_or_update_team(scale: Scale, round_no: int) -> Call:
+    # тот же состав, но новые имена: upsert действительно меняет строки
+    request = TeamAddRequest(
+        team_name=scale.team(round_no),
+        members=[
+            TeamMemberDTO(
+                user_id=scale.member(round_no, index),
+                username=f"user {index} r{round_no}",
+                is_active=True,
+            )
+            for index in range(scale.team_size)
+        ],
+    )
+    return lambda db_session: TeamService().create_or_update_team(db_session, request)
+
+
+async def prepare_get_team(scale: Scale, round_no: int) -> Call:
+    # замеряем сборку ответа, не попадание в кэш
+    team_response_cache.clear()
+    team_name = scale.team(round_no)
+    return lambda db_session: TeamService().get_team_payload(db_session, team_name)
+
+
+async def prepare_deactivate_users(scale: Scale, round_no: int) -> Call:
+    team_name = scale.team(round_no)
+    payload = TeamDeactivateUsersRequest(
+        team_name=team_name, user_ids=[await _random_active_member(scale, team_name)]
+    )
+    return lambda db_session: TeamService().deactivate_users_and_reassign_prs(db_session, payload)
+
+
+async def prepare_get_reviews(scale: Scale, round_no: int) -> Call:
+    user_id = scale.member(round_no, round_no)
+    return lambda db_session: UserService().get_reviews(db_session, user_id)
+
+
+async def prepare_get_stats(scale: Scale, round_no: int) -> Call:
+    return StatsService().get_stats
+
+
+CASES: dict[str, Callable[[Scale, int], Awaitable[Call]]] = {
+    "PRService.create_pr": prepare_create_pr,
+    "PRService.reassign_reviewer": prepare_reassign_reviewer,
+    "PRService.merge_pr": prepare_merge_pr,
+    "TeamService.create_or_update_team": prepare_create_or_update_team,
+    "TeamService.get_team_payload": prepare_get_team,
+    "TeamService.deactivate_users_and_reassign_prs": prepare_deactivate_users,
+    "UserService.get_reviews": prepare_get_reviews,
+    "StatsService.get_stats": prepare_get_stats,
+}
+
+
+async def measure_call(call: Call, trace_memory: bool = False) -> tuple[float, int, int]:
+    """Wall seconds, SQL statements and (with trace_memory) peak allocated bytes of one call."""
+    gc.collect()
+    recorder = QueryRecorder()
+    token = current_query_recorder.set(recorder)
+    if trace_memory:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+    try:
+        async with AsyncSessionLocal() as db_session:
+            started = time.perf_counter()
+            await call(db_session)
+            elapsed = time.perf_counter() - started
+    finally:
+        current_query_recorder.reset(token)
+    peak = tracemalloc.get_traced_memory()[1] - base if trace_memory else 0
+    return elapsed, recorder.queries, peak
+
+
+async def run_case(
+    prepare: Callable[[Scale, int], Awaitable[Call]],
+    scale: Scale,
+    rounds: int,
+    warmup: int,
+    alloc_rounds: int,
+) -> dict:
+    round_no = 0
+
+    async def next_call() -> Call:
+        nonlocal round_no
+        round_no += 1
+        return await prepare(scale, round_no)
+
+    for _ in range(warmup):
+        await measure_call(await next_call())
+
+    times, queries = [], []
+    for _ in range(rounds):
+        elapsed, statements, _ = await measure_call(await next_call())
+        times.append(elapsed * 1000)
+        queries.append(statements)
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_rounds):
+            _, _, peak = await measure_call(await next_call(), trace_memory=True)
+            peaks.append(peak / 1024)
+    finally:
+        tracemalloc.stop()
+
+    times.sort()
+    return {
+        "rounds": rounds,
+        "min_ms": times[0],
+        "median_ms": statistics.median(times),
+        "p95_ms": times[min(len(times) - 1, int(len(times) * 0.95))],
+        "mean_ms": statistics.fmean(times),
+        "queries": statistics.median(queries),
+        "alloc_peak_kib": statistics.median(peaks) if peaks else None,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Regressions of current against baseline (both as saved by --output)."""
+    regressions = []
+    for name, result in current["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        if before is None:
+            continue
+        for key in ("median_ms", "alloc_peak_kib"):
+            old, new = before.get(key), result.get(key)
+            if old and new is not None and new > old * (1 + threshold):
+                regressions.append(f"{name}: {key} {old:.2f} -> {new:.2f} (+{new / old - 1:.0%})")
+        if result["queries"] > before["queries"]:
+            regressions.append(f"{name}: queries {before['queries']:g} -> {result['queries']:g}")
+    return regressions
+
+
+def print_results(results: dict, baseline: dict | None) -> None:
+    print(
+        f"{'case':<46} {'min ms':>8} {'median':>8} {'p95':>8} {'queries':>8} {'alloc KiB':>10}"
+        + ("  median vs baseline" if baseline else "")
+    )
+    for name, r in results["benchmarks"].items():
+        line = (
+            f"{name:<46} {r['min_ms']:8.2f} {r['median_ms']:8.2f} {r['p95_ms']:8.2f} "
+            f"{r['queries']:8g} {r['alloc_peak_kib'] or 0:10.1f}"
+        )
+        before = (baseline or {}).get("benchmarks", {}).get(name)
+        if before:
+            line += f"  {r['median_ms'] / before['median_ms'] - 1:+.1%}"
+        print(line)
+
+
+async def seed(scale: Scale, prs_per_team: int) -> None:
+    """Teams and PR history under scale.prefix; remove with cleanup_seeded."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for team_no in range(scale.teams):
+            await seed_team(client, f"{scale.prefix}_t{team_no}", scale.team_size)
+            await seed_pr_history(f"{scale.prefix}_t{team_no}", scale.team_size, prs_per_team)
+    async with AsyncSessionLocal() as db_session:
+        await StatsService().reconcile_counters(db_session)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    prefix = unique_prefix()
+    scale = Scale(prefix, args.teams, args.team_size)
+    try:
+        started = time.perf_counter()
+        await seed(scale, args.prs_per_team)
+        print(
+            f"seeded teams={args.teams} team_size={args.team_size} "
+            f"prs={args.teams * args.prs_per_team}: {time.perf_counter() - started:.1f}s"
+        )
+
+        benchmarks = {}
+        for name, prepare in CASES.items():
+            if args.only and not any(part in name for part in args.only):
+                continue
+            benchmarks[name] = await run_case(
+                prepare, scale, args.rounds, args.warmup, args.alloc_rounds
+            )
+    finally:
+        await cleanup_seeded(prefix)
+
+    return {
+        "created_at": datetime.now(UTC).isoformat(),
+        "python": platform.python_version(),
+        "scale": {
+            "teams": args.teams,
+            "team_size": args.team_size,
+            "prs_per_team": args.prs_per_team,
+        },
+        "benchmarks": benchmarks,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--teams", type=int, default=20)
+    parser.add_argument("--team-size", type=int, default=50)
+    parser.add_argument("--prs-per-team", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--alloc-rounds", type=int, default=3)
+    parser.add_argument("--only", nargs="*", help="run cases whose name contains any of these")
+    parser.add_argument("--output", help="save results as JSON")
+    parser.add_argument("--compare", help="baseline JSON saved by an earlier run with --output")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+    # деактивация выключает по участнику за раунд: активных должно хватить на все раунды
+    rounds_total = args.warmup + args.rounds + args.alloc_rounds
+    if args.teams * (args.team_size - 4) < rounds_total:
+        parser.error("not enough members for the deactivation rounds: raise --teams/--team-size")
+
+    results = asyncio.run(run(args))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline["scale"] != results["scale"]:
+            print(f"WARNING: baseline scale {baseline['scale']} differs from {results['scale']}")
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if baseline is not None:
+        regressions = compare(baseline, results, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
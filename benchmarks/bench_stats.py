@@ -0,0 +1,78 @@
+"""
+GET /stats over a large PR history: counter tables vs exact GROUP BY scans.
+
+PRs and reviewer rows are generated server-side (generate_series) and the
+counters are then rebuilt by the reconciliation, so seeding stays fast at
+millions of rows. Seeded rows are removed at the end.
+
+Runs in-process through the ASGI app against the configured database
+(schema must be migrated: `alembic upgrade head`).
+
+    uv run python -m benchmarks.bench_stats --prs 1000000 --users 1000
+"""
+
+import argparse
+import asyncio
+import time
+
+from httpx import ASGITransport, AsyncClient
+
+from app.core.db import AsyncSessionLocal
+from app.main import app
+from app.repositories.stats_counter_repo import StatsCounterRepository
+from app.services.stats_service import StatsService, stats_response_cache
+from benchmarks.common import cleanup_seeded, seed_pr_history, seed_team, unique_prefix
+
+
+async def timed(label: str, repeat: int, fn) -> None:
+    await fn()  # прогрев
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await fn()
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f"{label:<34} {elapsed * 1000:10.2f} ms")
+
+
+async def run(prs: int, users: int, repeat: int) -> None:
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        prefix = unique_prefix()
+        member_ids = await seed_team(client, prefix, users)
+        try:
+            started = time.perf_counter()
+            await seed_pr_history(prefix, len(member_ids), prs)
+            print(f"seeded prs={prs} reviewers={2 * prs}: {time.perf_counter() - started:.1f}s")
+
+            started = time.perf_counter()
+            async with AsyncSessionLocal() as db_session:
+                await StatsService().reconcile_counters(db_session)
+            print(f"reconcile_stats (one-off): {time.perf_counter() - started:.1f}s")
+
+            async def exact_scan() -> None:
+                async with AsyncSessionLocal() as db_session:
+                    await StatsCounterRepository(db_session).compute_from_source()
+
+            async def get_stats() -> None:
+                r = await client.get("/api/v1/stats")
+                r.raise_for_status()
+
+            await timed("exact GROUP BY over source tables", repeat, exact_scan)
+            stats_response_cache.ttl = 0
+            await timed("GET /stats, counters, no cache", repeat, get_stats)
+            stats_response_cache.ttl = 60
+            await timed("GET /stats, counters, cached", repeat, get_stats)
+        finally:
+            await cleanup_seeded(prefix)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--prs", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.prs, args.users, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+POST /team/add_or_update for a large team: initial load, unchanged resubmit,
+a few renamed members and a partial rotation of members.
+
+Runs in-process through the ASGI app against the configured database
+(schema must be migrated: `alembic upgrade head`). Seeded rows are removed at the end.
+
+    uv run python -m benchmarks.bench_team_upsert --members 5000
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Container
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+
+from app.core.db import AsyncSessionLocal
+from app.main import app
+from benchmarks.common import unique_prefix
+
+
+def members(prefix: str, ids: range, renamed: Container[int] = frozenset()) -> list[dict]:
+    return [
+        {
+            "user_id": f"{prefix}_u{i}",
+            "username": f"user {i}" + (" (renamed)" if i in renamed else ""),
+            "is_active": True,
+        }
+        for i in ids
+    ]
+
+
+async def cleanup(prefix: str) -> None:
+    async with AsyncSessionLocal() as db_session, db_session.begin():
+        like = {"pattern": f"{prefix}_%"}
+        await db_session.execute(text("DELETE FROM teams WHERE team_name LIKE :pattern"), like)
+        await db_session.execute(text("DELETE FROM users WHERE user_id LIKE :pattern"), like)
+
+
+async def run(size: int, repeat: int) -> None:
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        prefix = unique_prefix()
+        team_name = f"{prefix}_team"
+
+        async def add_or_update(label: str, payload: list[dict], times: int = 1) -> None:
+            timings = []
+            for _ in range(times):
+                started = time.perf_counter()
+                r = await client.post(
+                    "/api/v1/team/add_or_update",
+                    json={"team_name": team_name, "members": payload},
+                )
+                r.raise_for_status()
+                timings.append(time.perf_counter() - started)
+            print(f"{label:<38} {min(timings) * 1000:10.1f} ms")
+
+        try:
+            await add_or_update("initial load, all members new", members(prefix, range(size)))
+            # неизменённый состав можно повторять: лучший из повторов
+            await add_or_update(
+                f"unchanged resubmit (best of {repeat})", members(prefix, range(size)), repeat
+            )
+            renamed = set(range(0, size, 100))
+            await add_or_update(
+                f"{len(renamed)} members renamed", members(prefix, range(size), renamed)
+            )
+            rotated = size // 10
+            await add_or_update(
+                f"{rotated} removed + {rotated} added",
+                members(prefix, range(rotated, size + rotated)),
+            )
+        finally:
+            await cleanup(prefix)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--members", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.members, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
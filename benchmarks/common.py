@@ -0,0 +1,92 @@
+import uuid
+
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from app.core.db import AsyncSessionLocal
+from app.services.stats_service import StatsService
+
+
+def unique_prefix() -> str:
+    return f"bench_{uuid.uuid4().hex[:8]}"
+
+
+async def seed_team(client: AsyncClient, prefix: str, team_size: int) -> list[str]:
+    members: list[dict] = [
+        {"user_id": f"{prefix}_u{i}", "username": f"user {i}", "is_active": True}
+        for i in range(team_size)
+    ]
+    r = await client.post(
+        "/api/v1/team/add_or_update", json={"team_name": f"{prefix}_team", "members": members}
+    )
+    r.raise_for_status()
+    return [m["user_id"] for m in members]
+
+
+def pr_items(prefix: str, author_ids: list[str], count: int) -> list[dict]:
+    return [
+        {
+            "pull_request_id": f"{prefix}_pr{i}",
+            "pull_request_name": f"PR {i}",
+            "author_id": author_ids[i % len(author_ids)],
+        }
+        for i in range(count)
+    ]
+
+
+async def seed_open_prs(
+    client: AsyncClient, prefix: str, author_ids: list[str], count: int, chunk: int = 10_000
+) -> None:
+    items = pr_items(prefix, author_ids, count)
+    for start in range(0, count, chunk):
+        r = await client.post(
+            "/api/v1/pullRequest/createBatch", json={"items": items[start : start + chunk]}
+        )
+        r.raise_for_status()
+
+
+async def seed_pr_history(prefix: str, team_size: int, prs: int) -> None:
+    """
+    PRs (every third merged) with two reviewers each, authored by members of
+    seed_team. Generated server-side and bypassing the counters: use cleanup_seeded.
+    """
+    async with AsyncSessionLocal() as db_session, db_session.begin():
+        # id участников — как в seed_team: {prefix}_u{i}
+        params = {"prefix": prefix, "n": team_size, "prs": prs}
+        await db_session.execute(
+            text(
+                "INSERT INTO pull_requests "
+                "(pull_request_id, pull_request_name, author_id, status, created_at, merged_at) "
+                "SELECT :prefix || '_pr' || g, 'PR', :prefix || '_u' || (g % :n), "
+                "  CASE WHEN g % 3 = 0 THEN 'MERGED' ELSE 'OPEN' END::pr_status, "
+                "  now() - make_interval(hours => g % 5000), "
+                "  CASE WHEN g % 3 = 0 THEN now() END "
+                "FROM generate_series(1, :prs) AS g"
+            ),
+            params,
+        )
+        await db_session.execute(
+            text(
+                "INSERT INTO pr_reviewers (pull_request_id, reviewer_id, pr_created_at) "
+                "SELECT p.pull_request_id, :prefix || '_u' || ((g + k) % :n), p.created_at "
+                "FROM generate_series(1, :prs) AS g, generate_series(1, 2) AS k, pull_requests p "
+                "WHERE p.pull_request_id = :prefix || '_pr' || g"
+            ),
+            params,
+        )
+    async with AsyncSessionLocal() as db_session:
+        await db_session.execute(text("ANALYZE pull_requests, pr_reviewers"))
+        await db_session.commit()
+
+
+async def cleanup_seeded(prefix: str) -> None:
+    """Remove everything seeded under prefix and bring the stats counters back in sync."""
+    async with AsyncSessionLocal() as db_session, db_session.begin():
+        like = {"pattern": f"{prefix}_%"}
+        await db_session.execute(
+            text("DELETE FROM pull_requests WHERE pull_request_id LIKE :pattern"), like
+        )
+        await db_session.execute(text("DELETE FROM teams WHERE team_name LIKE :pattern"), like)
+        await db_session.execute(text("DELETE FROM users WHERE user_id LIKE :pattern"), like)
+    async with AsyncSessionLocal() as db_session:
+        await StatsService().reconcile_counters(db_session)
@@ -0,0 +1,352 @@
+"""
+Replay captured traffic (TRAFFIC_CAPTURE_SAMPLE_RATE, app/core/traffic_capture.py)
+against a running service and report latency and errors in the shape of the
+k6 summary (load_summary.json, `k6 run --summary-export`), so a replay can be
+compared with the load test baseline.
+
+Requests are sent at their captured offsets divided by --speed (2 — twice as
+fast, 0 — as fast as --concurrency allows). --reorder-window N shuffles the
+requests within consecutive windows of N (send times stay where they were),
+which exercises the same traffic in a different interleaving; --seed makes it
+repeatable. Captured requests without a body (over the capture limit) are skipped.
+
+    uv run python -m benchmarks.replay_traffic /tmp/traffic --target http://localhost:8080 \\
+        --speed 2 --concurrency 50 --summary-export replay.json \\
+        --baseline load_summary.json --threshold "http_req_duration:p(95)<300"
+
+Each route gets a check "<METHOD> <route> status as captured": replaying writes
+against a database in another state (PR already exists, already merged) gives
+other statuses, the check shows how many of them changed. Exits with code 1
+when a --threshold is crossed.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+
+from app.core.traffic_capture import request_body
+
+_THRESHOLD_RE = re.compile(
+    r"^([\w{}:]+):\s*(p\(\d+(?:\.\d+)?\)|avg|min|med|max|rate)\s*(<=|<|>=|>)\s*([\d.]+)$"
+)
+
+
+@dataclass
+class ReplayResult:
+    check: str
+    status: int
+    captured_status: int
+    duration_ms: float
+    waiting_ms: float
+    receiving_ms: float
+    sent_bytes: int
+    received_bytes: int
+    error: str | None = None
+
+    @property
+    def failed(self) -> bool:
+        # как в k6: ожидаемый ответ — статус от 200 до 399
+        return not 200 <= self.status < 400
+
+
+def load_captures(paths: list[str]) -> tuple[list[dict], int]:
+    """Records of all capture files (directories are scanned), ordered by start time."""
+    files: list[Path] = []
+    for path in map(Path, paths):
+        files += sorted(path.glob("capture-*.jsonl*")) if path.is_dir() else [path]
+    records, skipped = [], 0
+    for file in files:
+        with file.open("rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record.get("body_truncated"):
+                    skipped += 1
+                    continue
+                records.append(record)
+    records.sort(key=lambda record: record["ts"])
+    return records, skipped
+
+
+def schedule(
+    records: list[dict], speed: float, reorder_window: int, seed: int
+) -> list[tuple[float, dict]]:
+    """(send offset in seconds, record) pairs: offsets of the capture, requests reordered."""
+    if not records:
+        return []
+    first = records[0]["ts"]
+    offsets = [(record["ts"] - first) / speed if speed > 0 else 0.0 for record in records]
+    reordered = list(records)
+    if reorder_window > 1:
+        rng = random.Random(seed)
+        for start in range(0, len(reordered), reorder_window):
+            window = reordered[start : start + reorder_window]
+            rng.shuffle(window)
+            reordered[start : start + reorder_window] = window
+    return list(zip(offsets, reordered, strict=True))
+
+
+def _headers_size(headers) -> int:
+    return sum(len(name) + len(value) + 4 for name, value in headers.items())
+
+
+async def send_one(client: httpx.AsyncClient, record: dict) -> ReplayResult:
+    url = record["path"] + (f"?{record['query']}" if record["query"] else "")
+    request = client.build_request(
+        record["method"], url, content=request_body(record), headers=record["headers"]
+    )
+    check = f"{record['method']} {record['route']} status as captured"
+    sent = len(request.content) + len(url) + _headers_size(request.headers)
+    started = time.perf_counter()
+    try:
+        response = await client.send(request, stream=True)
+        headers_at = time.perf_counter()
+        body = await response.aread()
+        await response.aclose()
+    except httpx.HTTPError as error:
+        elapsed = (time.perf_counter() - started) * 1000
+        return ReplayResult(check, 0, record["status"], elapsed, elapsed, 0.0, sent, 0, repr(error))
+    finished = time.perf_counter()
+    return ReplayResult(
+        check=check,
+        status=response.status_code,
+        captured_status=record["status"],
+        duration_ms=(finished - started) * 1000,
+        waiting_ms=(headers_at - started) * 1000,
+        receiving_ms=(finished - headers_at) * 1000,
+        sent_bytes=sent,
+        received_bytes=len(body) + _headers_size(response.headers),
+    )
+
+
+async def replay(
+    client: httpx.AsyncClient, planned: list[tuple[float, dict]], concurrency: int
+) -> tuple[list[ReplayResult], float, int]:
+    """Results, wall seconds and the peak number of requests in flight."""
+    results: list[ReplayResult] = []
+    slots = asyncio.Semaphore(concurrency)
+    in_flight = peak = 0
+
+    async def run(record: dict) -> None:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            results.append(await send_one(client, record))
+        finally:
+            in_flight -= 1
+            slots.release()
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    tasks = []
+    for offset, record in planned:
+        delay = started + offset - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # все слоты заняты — запрос уходит позже записанного момента, как в k6 при нехватке VU
+        await slots.acquire()
+        tasks.append(asyncio.create_task(run(record)))
+    await asyncio.gather(*tasks)
+    return results, loop.time() - started, peak
+
+
+def trend(values: list[float]) -> dict:
+    """k6 trend summary: avg, min, med, max, p(90), p(95)."""
+    if not values:
+        return {"avg": 0, "min": 0, "med": 0, "max": 0, "p(90)": 0, "p(95)": 0}
+    ordered = sorted(values)
+
+    def percentile(q: float) -> float:
+        rank = q * (len(ordered) - 1)
+        low = int(rank)
+        high = min(low + 1, len(ordered) - 1)
+        return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+    return {
+        "avg": sum(ordered) / len(ordered),
+        "min": ordered[0],
+        "med": percentile(0.5),
+        "max": ordered[-1],
+        "p(90)": percentile(0.9),
+        "p(95)": percentile(0.95),
+    }
+
+
+def _md5(value: str) -> str:
+    return hashlib.md5(value.encode()).hexdigest()
+
+
+def summarize(
+    results: list[ReplayResult], wall_seconds: float, peak: int, concurrency: int, setup: dict
+) -> dict:
+    wall_seconds = wall_seconds or 1e-9
+    count = len(results)
+    failed = sum(result.failed for result in results)
+    checks: dict[str, dict] = {}
+    for result in results:
+        check = checks.setdefault(
+            result.check,
+            {
+                "name": result.check,
+                "path": f"::{result.check}",
+                "id": _md5(f"::{result.check}"),
+                "passes": 0,
+                "fails": 0,
+            },
+        )
+        check["passes" if result.status == result.captured_status else "fails"] += 1
+    check_passes = sum(check["passes"] for check in checks.values())
+    sent = sum(result.sent_bytes for result in results)
+    received = sum(result.received_bytes for result in results)
+    return {
+        "root_group": {"name": "", "path": "", "id": _md5(""), "groups": {}, "checks": checks},
+        "metrics": {
+            "iterations": {"count": count, "rate": count / wall_seconds},
+            "http_reqs": {"count": count, "rate": count / wall_seconds},
+            "http_req_duration": trend([result.duration_ms for result in results]),
+            "http_req_duration{expected_response:true}": trend(
+                [result.duration_ms for result in results if not result.failed]
+            ),
+            "http_req_waiting": trend([result.waiting_ms for result in results]),
+            "http_req_receiving": trend([result.receiving_ms for result in results]),
+            # Rate-метрика k6: passes — запросы, где условие истинно (запрос упал)
+            "http_req_failed": {
+                "passes": failed,
+                "fails": count - failed,
+                "value": failed / count if count else 0,
+            },
+            "checks": {
+                "passes": check_passes,
+                "fails": count - check_passes,
+                "value": check_passes / count if count else 0,
+            },
+            "data_sent": {"count": sent, "rate": sent / wall_seconds},
+            "data_received": {"count": received, "rate": received / wall_seconds},
+            "vus": {"value": 0, "min": 0, "max": peak},
+            "vus_max": {"value": concurrency, "min": concurrency, "max": concurrency},
+        },
+        "setup_data": setup,
+    }
+
+
+def apply_thresholds(summary: dict, thresholds: list[str]) -> list[str]:
+    """Marks thresholds in the summary as k6 does (true — crossed), returns the crossed ones."""
+    crossed = []
+    for threshold in thresholds:
+        match = _THRESHOLD_RE.match(threshold)
+        if not match:
+            raise ValueError(f"bad threshold {threshold!r}")
+        metric_name, aggregate, op, limit = match.groups()
+        metric = summary["metrics"][metric_name]
+        value = metric["value"] if aggregate == "rate" else metric[aggregate]
+        ok = {
+            "<": value < float(limit),
+            "<=": value <= float(limit),
+            ">": value > float(limit),
+            ">=": value >= float(limit),
+        }[op]
+        expression = f"{aggregate}{op}{limit}"
+        metric.setdefault("thresholds", {})[expression] = not ok
+        if not ok:
+            crossed.append(f"{metric_name}: {expression} (actual {value:g})")
+    return crossed
+
+
+def print_report(summary: dict, baseline: dict | None, skipped: int) -> None:
+    metrics = summary["metrics"]
+    base = (baseline or {}).get("metrics", {})
+    rows = [
+        ("http_reqs", "count"),
+        ("http_reqs", "rate"),
+        ("http_req_duration", "avg"),
+        ("http_req_duration", "med"),
+        ("http_req_duration", "p(90)"),
+        ("http_req_duration", "p(95)"),
+        ("http_req_duration", "max"),
+        ("http_req_failed", "value"),
+        ("checks", "value"),
+    ]
+    print(f"{'metric':<30} {'replay':>12}" + (f" {'baseline':>12}" if baseline else ""))
+    for metric, key in rows:
+        line = f"{metric + ' ' + key:<30} {metrics[metric][key]:12.3f}"
+        if baseline and key in base.get(metric, {}):
+            line += f" {base[metric][key]:12.3f}"
+        print(line)
+    if skipped:
+        print(f"skipped {skipped} captured requests without body (over the capture limit)")
+    for check in summary["root_group"]["checks"].values():
+        print(f"  {check['name']}: {check['passes']} same, {check['fails']} different")
+
+
+async def run(args: argparse.Namespace) -> tuple[dict, int]:
+    records, skipped = load_captures(args.captures)
+    if args.limit:
+        records = records[: args.limit]
+    planned = schedule(records, args.speed, args.reorder_window, args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.target, timeout=args.timeout, limits=limits
+    ) as client:
+        results, wall_seconds, peak = await replay(client, planned, args.concurrency)
+    setup = {
+        "captures": args.captures,
+        "target": args.target,
+        "speed": args.speed,
+        "concurrency": args.concurrency,
+        "reorder_window": args.reorder_window,
+        "seed": args.seed,
+    }
+    return summarize(results, wall_seconds, peak, args.concurrency, setup), skipped
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("captures", nargs="+", help="capture files or directories")
+    parser.add_argument("--target", default="http://localhost:8080")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--reorder-window", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--limit", type=int, help="replay only the first N requests")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--summary-export", help="save the k6-style summary as JSON")
+    parser.add_argument("--baseline", help="k6 summary to compare with, e.g. load_summary.json")
+    parser.add_argument(
+        "--threshold", action="append", default=[], help='e.g. "http_req_failed:rate<0.001"'
+    )
+    args = parser.parse_args()
+    for threshold in args.threshold:
+        if not _THRESHOLD_RE.match(threshold):
+            parser.error(f"bad threshold {threshold!r}, expected e.g. http_req_duration:p(95)<300")
+
+    summary, skipped = asyncio.run(run(args))
+    crossed = apply_thresholds(summary, args.threshold)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(summary, baseline, skipped)
+    if args.summary_export:
+        with open(args.summary_export, "w") as f:
+            json.dump(summary, f, indent=2)
+    for threshold in crossed:
+        print(f"THRESHOLD CROSSED {threshold}")
+    if crossed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+bench_services cases as pytest tests, one test per case, on a small seed:
+
+    uv run pytest -m benchmark benchmarks/ --junitxml bench.xml
+
+Marked "benchmark" and deselected by default (pytest.ini). Each case's numbers
+are printed and recorded as junit XML properties. With BENCH_BASELINE set to a
+JSON saved by `bench_services --output`, a case fails on regressions as with
+--compare (threshold BENCH_THRESHOLD, default 0.2); against a baseline of a
+different scale only SQL statement counts are compared.
+
+Runs against the configured database, like the script.
+"""
+
+import json
+import os
+
+import pytest
+import pytest_asyncio
+
+from app.core.db import async_engine
+from benchmarks.bench_services import CASES, Scale, compare, run_case, seed
+from benchmarks.common import cleanup_seeded, unique_prefix
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.asyncio(loop_scope="module")]
+
+TEAMS = 2
+TEAM_SIZE = 12
+PRS_PER_TEAM = 300
+ROUNDS = 10
+WARMUP = 2
+ALLOC_ROUNDS = 2
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def scale():
+    scale = Scale(unique_prefix(), TEAMS, TEAM_SIZE)
+    try:
+        await seed(scale, PRS_PER_TEAM)
+        yield scale
+    finally:
+        await cleanup_seeded(scale.prefix)
+        # пул соединений привязан к циклу событий модуля
+        await async_engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def baseline() -> dict | None:
+    path = os.getenv("BENCH_BASELINE")
+    if not path:
+        return None
+    with open(path) as f:
+        saved: dict = json.load(f)
+    return saved
+
+
+@pytest.mark.parametrize("name", list(CASES))
+async def test_service_case(name, scale, baseline, record_property):
+    result = await run_case(CASES[name], scale, ROUNDS, WARMUP, ALLOC_ROUNDS)
+    for key, value in result.items():
+        record_property(key, value)
+    print(f"{name}: median {result['median_ms']:.2f} ms, queries {result['queries']:g}")
+
+    if baseline is None:
+        return
+    threshold = float(os.getenv("BENCH_THRESHOLD", "0.2"))
+    current_scale = {"teams": TEAMS, "team_size": TEAM_SIZE, "prs_per_team": PRS_PER_TEAM}
+    if baseline["scale"] != current_scale:
+        # время и память на другом объёме данных не сравнимы
+        threshold = float("inf")
+    regressions = compare(baseline, {"benchmarks": {name: result}}, threshold)
+    assert not regressions, regressions
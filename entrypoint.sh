@@ -5,5 +5,11 @@ set -e
 # Применяем миграции
 uv run alembic upgrade head
 
+# Метрики воркеров (WEB_CONCURRENCY > 1) собираются через общий каталог — очищаем его от прошлого запуска
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
 # Запускаем приложение
 exec uv run uvicorn app.main:app --host 0.0.0.0 --port 8080
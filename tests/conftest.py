@@ -1,5 +1,7 @@
 import os
+from contextlib import contextmanager
 
+import pytest
 import pytest_asyncio
 from asgi_lifespan import LifespanManager
 from httpx import ASGITransport, AsyncClient
@@ -10,10 +12,21 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 
-from app.api.dependencies import get_session
+from app.api.dependencies import (
+    get_read_router,
+    get_session,
+    get_session_factory,
+    session_scope,
+)
 from app.core.config import settings
 from app.core.db import Base
+from app.core.db_routing import ReadRouter
+from app.core.metrics import instrument_engine
+from app.core.query_recorder import QueryRecorder, current_query_recorder
 from app.main import app
+from app.services.roster_cache import roster_cache
+from app.services.stats_service import stats_response_cache
+from app.services.team_service import team_response_cache
 
 DATABASE_URL = settings.postgres_async_url
 TEST_SCHEMA = os.getenv("TEST_SCHEMA", "test")
@@ -22,15 +35,36 @@ if not DATABASE_URL:
     raise RuntimeError("Set DATABASE_URL for tests")
 
 
+# задачи из основной схемы в тестах не подхватываем
+settings.DEACTIVATION_JOBS_RESUME_ON_STARTUP = False
+# запрос сверх бюджета роняет тест, в лог дело не ограничивается
+settings.QUERY_BUDGET_MODE = "raise"
+
+
+def _create_missing_indexes(conn) -> None:
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
 @pytest_asyncio.fixture
 async def engine():
-    engine = create_async_engine(DATABASE_URL, future=True)
+    # фоновые задачи открывают свои сессии — им тоже нужна тестовая схема
+    engine = create_async_engine(
+        DATABASE_URL,
+        future=True,
+        connect_args={"server_settings": {"search_path": TEST_SCHEMA}},
+    )
+    # запросы тестов попадают в метрики и в QueryRecorder, как запросы приложения
+    instrument_engine(engine, "test")
 
     async with engine.begin() as conn:
         await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{TEST_SCHEMA}"'))
         await conn.execute(text(f'SET search_path TO "{TEST_SCHEMA}"'))
 
         await conn.run_sync(Base.metadata.create_all)
+        # create_all не добавляет новые индексы к уже существующим таблицам
+        await conn.run_sync(_create_missing_indexes)
 
     yield engine
     await engine.dispose()
@@ -45,6 +79,19 @@ async def _clean_db(engine):
             await conn.execute(table.delete())
 
 
+@pytest_asyncio.fixture(autouse=True)
+async def _reset_caches():
+    roster_cache.clear()
+    stats_response_cache.clear()
+    team_response_cache.clear()
+    team_response_cache.reset_stats()
+    yield
+    roster_cache.clear()
+    stats_response_cache.clear()
+    team_response_cache.clear()
+    team_response_cache.reset_stats()
+
+
 @pytest_asyncio.fixture
 async def client(engine):
     session_local = async_sessionmaker(
@@ -55,12 +102,15 @@ async def client(engine):
     )
 
     async def _override_get_session():
-        async with session_local() as session:
-            await session.execute(text(f'SET search_path TO "{TEST_SCHEMA}"'))
-            await session.commit()
+        # search_path задан в connect_args движка: сессия, как и в приложении, ленивая
+        async with session_scope(session_local) as session:
             yield session
 
     app.dependency_overrides[get_session] = _override_get_session
+    app.dependency_overrides[get_session_factory] = lambda: session_local
+    # без реплик: всё читается из тестовой схемы на primary
+    read_router = ReadRouter(session_local)
+    app.dependency_overrides[get_read_router] = lambda: read_router
 
     async with LifespanManager(app):
         transport = ASGITransport(app=app)
@@ -68,3 +118,23 @@ async def client(engine):
             yield ac
 
     app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def max_queries():
+    """
+    with max_queries(3): await client.get(...) — fails if the block issued more
+    SQL statements than allowed; the message lists the most frequent shapes.
+    """
+
+    @contextmanager
+    def check(limit: int, label: str = ""):
+        recorder = QueryRecorder(budget=limit, label=label or f"max_queries({limit})")
+        token = current_query_recorder.set(recorder)
+        try:
+            yield recorder
+        finally:
+            current_query_recorder.reset(token)
+        assert not recorder.exceeded, recorder.describe()
+
+    return check
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+from sqlalchemy import exc, text
+
+from app.core.config import DBSettings, settings
+from app.core.db import build_async_engine
+from app.core.db_pool import engine_pool
+from app.utils.histogram import LatencyHistogram
+
+
+def _db_settings(**overrides) -> DBSettings:
+    return DBSettings(**(settings.model_dump(include=set(DBSettings.model_fields)) | overrides))
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram(bounds=(1, 10, 100))
+    for ms in (0.5, 0.5, 5, 50, 500):
+        histogram.observe(ms)
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.count == 5
+    assert histogram.max_ms == 500
+    assert histogram.percentile(0.4) == pytest.approx(1.0)
+    # открытая последняя корзина отдаёт нижнюю границу
+    assert histogram.percentile(1.0) == 100
+
+
+@pytest.mark.asyncio
+async def test_pool_settings_and_metrics():
+    engine = build_async_engine(
+        settings.postgres_async_url,
+        _db_settings(DB_POOL_SIZE=1, DB_POOL_MAX_OVERFLOW=1, DB_POOL_TIMEOUT_SECONDS=0.2),
+    )
+    try:
+        pool = engine_pool(engine)
+        assert pool.size() == 1
+
+        async with engine.connect() as first, engine.connect() as second:
+            await first.execute(text("SELECT 1"))
+            await second.execute(text("SELECT 1"))
+            assert pool.checkedout() == 2
+            assert pool.overflow() == 1
+            # пул и overflow исчерпаны: третий ждёт pool_timeout и падает
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+
+        metrics = pool.metrics
+        assert metrics.timeouts == 1
+        assert metrics.checkouts == 3
+        assert metrics.wait.count == 3
+        assert metrics.wait.max_ms >= 200
+        assert metrics.checkout.count == 3
+
+        # dispose пересоздаёт пул, накопленные метрики сохраняются
+        await engine.dispose()
+        assert engine_pool(engine).metrics is metrics
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_idle_liveness_pings_only_idle_connections(engine):
+    pool_engine = build_async_engine(
+        settings.postgres_async_url,
+        _db_settings(DB_POOL_LIVENESS="idle", DB_POOL_PING_IDLE_SECONDS=0.05),
+    )
+    try:
+        metrics = engine_pool(pool_engine).metrics
+        for _ in range(3):
+            async with pool_engine.connect() as conn:
+                backend_pid = (await conn.execute(text("SELECT pg_backend_pid()"))).scalar_one()
+        assert metrics.liveness_pings == 0
+
+        # соединение простаивает в пуле и убито на сервере: ping при выдаче это замечает,
+        # пул открывает новое вместо ошибки в запросе
+        async with engine.connect() as admin:
+            await admin.execute(text("SELECT pg_terminate_backend(:pid)"), {"pid": backend_pid})
+        await asyncio.sleep(0.1)
+        async with pool_engine.connect() as conn:
+            new_pid = (await conn.execute(text("SELECT pg_backend_pid()"))).scalar_one()
+        assert new_pid != backend_pid
+        assert metrics.liveness_pings == 1
+        assert metrics.liveness_failures == 1
+    finally:
+        await pool_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_internal_pool_endpoint(client):
+    r = await client.get("/api/v1/team/get", params={"team_name": "missing"})
+    assert r.status_code == 404
+
+    r = await client.get("/api/v1/internal/pool")
+    assert r.status_code == 200
+    (pool,) = r.json()["pools"]
+    assert pool["name"] == "primary"
+    assert pool["max_overflow"] == settings.DB_POOL_MAX_OVERFLOW
+    assert pool["overflow"] >= 0
+    assert pool["liveness"] == settings.DB_POOL_LIVENESS
+    assert len(pool["wait"]["counts"]) == len(pool["wait"]["bounds_ms"]) + 1
+    assert pool["checkout"]["count"] >= 0
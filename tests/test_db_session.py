@@ -0,0 +1,100 @@
+import logging
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.api.dependencies import get_session, session_scope
+from app.main import app
+
+TEAM_PAYLOAD = {
+    "team_name": "backend",
+    "members": [
+        {"user_id": "u1", "username": "Alice", "is_active": True},
+        {"user_id": "u2", "username": "Bob", "is_active": True},
+    ],
+}
+
+
+@pytest.fixture
+def pool_usage(engine):
+    """Checkouts during the test and connections still checked out at session teardown."""
+    usage: dict = {"checkouts": 0, "held_at_teardown": []}
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        usage["checkouts"] += 1
+
+    event.listen(engine.sync_engine, "checkout", on_checkout)
+    session_override = app.dependency_overrides[get_session]
+
+    async def _override_get_session():
+        async with asynccontextmanager(session_override)() as session:
+            try:
+                yield session
+            finally:
+                usage["held_at_teardown"].append(engine.sync_engine.pool.checkedout())
+
+    app.dependency_overrides[get_session] = _override_get_session
+    yield usage
+    app.dependency_overrides[get_session] = session_override
+    event.remove(engine.sync_engine, "checkout", on_checkout)
+
+
+@pytest.mark.asyncio
+async def test_requests_answered_without_queries_do_not_check_out(client, pool_usage):
+    # 422 до сервиса и ответ /stats из кэша
+    r = await client.post("/api/v1/pullRequest/create", json={"pull_request_id": "pr1"})
+    assert r.status_code == 422
+    r = await client.get("/api/v1/users/getReview", params={"user_id": "u1", "cursor": "???"})
+    assert r.status_code == 400
+    # сессии для 422 и 400 (getReview — через ReadRouter) создаются, но соединение не берётся
+    assert pool_usage["checkouts"] == 0
+    assert pool_usage["held_at_teardown"] == [0]
+
+    assert (await client.get("/api/v1/stats")).status_code == 200
+    checkouts = pool_usage["checkouts"]
+    assert (await client.get("/api/v1/stats")).status_code == 200
+    assert pool_usage["checkouts"] == checkouts
+
+
+@pytest.mark.asyncio
+async def test_connection_released_when_service_block_ends(client, engine, pool_usage):
+    assert (await client.post("/api/v1/team/add", json=TEAM_PAYLOAD)).status_code == 201
+    r = await client.post(
+        "/api/v1/pullRequest/create",
+        json={"pull_request_id": "pr1", "pull_request_name": "P", "author_id": "u1"},
+    )
+    assert r.status_code == 201
+    reviewer_id = r.json()["pr"]["assigned_reviewers"][0]
+    # /team/get и /users/getReview идут через ReadRouter: сессия закрывается по выходу из run()
+    read_requests = [
+        client.get("/api/v1/team/get", params={"team_name": "backend"}),
+        client.get("/api/v1/team/get", params={"team_name": "missing"}),
+        client.get("/api/v1/users/getReview", params={"user_id": reviewer_id}),
+    ]
+    for request in read_requests:
+        assert (await request).status_code in (200, 404)
+        assert engine.sync_engine.pool.checkedout() == 0
+
+    requests = [
+        client.get("/api/v1/stats/window", params={"window": "7d"}),
+        client.post("/api/v1/pullRequest/merge", json={"pull_request_id": "pr1"}),
+        client.post("/api/v1/users/setIsActive", json={"user_id": "u2", "is_active": False}),
+    ]
+    for request in requests:
+        assert (await request).status_code in (200, 404)
+
+    # к завершению сессии (ответ ещё не отдан) соединение уже вернулось в пул
+    assert pool_usage["held_at_teardown"] == [0] * (len(requests) + 2)
+
+
+@pytest.mark.asyncio
+async def test_session_scope_rolls_back_transaction_left_open(engine, caplog):
+    session_local = async_sessionmaker(bind=engine)
+    with caplog.at_level(logging.WARNING, logger="app.api.dependencies"):
+        async with session_scope(session_local) as session:
+            await session.execute(text("SELECT 1"))
+            assert engine.sync_engine.pool.checkedout() == 1
+        assert engine.sync_engine.pool.checkedout() == 0
+    assert "still in a transaction" in caplog.text
@@ -0,0 +1,68 @@
+from datetime import UTC, datetime, timedelta
+
+import orjson
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+
+TEAM_PAYLOAD = {
+    "team_name": "backend",
+    "members": [
+        {"user_id": "u1", "username": "Alice", "is_active": True},
+        {"user_id": "u2", "username": "Bob", "is_active": True},
+        {"user_id": "u3", "username": "Carol", "is_active": True},
+    ],
+}
+
+
+async def _export(client, **params) -> list[dict]:
+    r = await client.get("/api/v1/export/pull_requests", params=params)
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/x-ndjson"
+    return [orjson.loads(line) for line in r.content.splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_export_streams_prs_with_reviewers(client, engine, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+    await client.post("/api/v1/team/add", json=TEAM_PAYLOAD)
+    for i in range(5):
+        r = await client.post(
+            "/api/v1/pullRequest/create",
+            json={"pull_request_id": f"pr{i}", "pull_request_name": f"P{i}", "author_id": "u1"},
+        )
+        assert r.status_code == 201
+    await client.post("/api/v1/pullRequest/merge", json={"pull_request_id": "pr1"})
+    # pr0 — позавчерашний, без ревьюеров
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("UPDATE pull_requests SET created_at = :at WHERE pull_request_id = 'pr0'"),
+            {"at": datetime.now(UTC) - timedelta(days=2)},
+        )
+        await conn.execute(text("DELETE FROM pr_reviewers WHERE pull_request_id = 'pr0'"))
+
+    rows = await _export(client)
+    assert [row["pull_request_id"] for row in rows] == ["pr0", "pr1", "pr2", "pr3", "pr4"]
+    assert rows[0]["assigned_reviewers"] == []
+    assert rows[1]["assigned_reviewers"] == ["u2", "u3"]
+    assert rows[1]["status"] == "MERGED"
+    assert datetime.fromisoformat(rows[1]["merged_at"]).tzinfo is not None
+
+    rows = await _export(client, status="MERGED")
+    assert [row["pull_request_id"] for row in rows] == ["pr1"]
+
+    today = datetime.now(UTC).date()
+    rows = await _export(client, **{"from": today.isoformat()})
+    assert [row["pull_request_id"] for row in rows] == ["pr1", "pr2", "pr3", "pr4"]
+    rows = await _export(client, to=(today - timedelta(days=1)).isoformat())
+    assert [row["pull_request_id"] for row in rows] == ["pr0"]
+
+
+@pytest.mark.asyncio
+async def test_export_rejects_inverted_range(client):
+    r = await client.get(
+        "/api/v1/export/pull_requests", params={"from": "2026-02-01", "to": "2026-01-01"}
+    )
+    assert r.status_code == 400
+    assert r.json()["detail"]["error"]["code"] == "BAD_RANGE"
@@ -0,0 +1,126 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi import FastAPI
+from prometheus_client import REGISTRY
+
+from app.api.middleware import _expected_route_template, _route_template
+
+TEAM_PAYLOAD = {
+    "team_name": "backend",
+    "members": [{"user_id": "u1", "username": "Alice", "is_active": True}],
+}
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_route_latency_status_and_db_usage(client, engine):
+    route = "/api/v1/team/get"
+    before_ok = _sample("http_requests_total", method="GET", route=route, status="200")
+    before_404 = _sample("http_requests_total", method="GET", route=route, status="404")
+    before_latency = _sample("http_request_duration_seconds_count", method="GET", route=route)
+    before_queries = _sample("http_request_db_queries_sum", method="GET", route=route)
+    before_engine = _sample("db_queries_total", engine="test")
+
+    await client.post("/api/v1/team/add", json=TEAM_PAYLOAD)
+    assert (await client.get(route, params={"team_name": "backend"})).status_code == 200
+    assert (await client.get(route, params={"team_name": "missing"})).status_code == 404
+    await client.get("/no/such/path/42")
+
+    assert _sample("http_requests_total", method="GET", route=route, status="200") == before_ok + 1
+    assert _sample("http_requests_total", method="GET", route=route, status="404") == before_404 + 1
+    assert (
+        _sample("http_request_duration_seconds_count", method="GET", route=route)
+        == before_latency + 2
+    )
+    # версия + состав для существующей команды, одна версия для отсутствующей
+    assert _sample("http_request_db_queries_sum", method="GET", route=route) == before_queries + 3
+    assert _sample("db_queries_total", engine="test") > before_engine
+    assert _sample("http_requests_total", method="GET", route="<unmatched>", status="404") >= 1
+    assert _sample("http_requests_in_progress", method="GET", route=route) == 0
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_serves_text_format(client):
+    await client.get("/api/v1/health")
+    r = await client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    assert "# TYPE http_request_duration_seconds histogram" in r.text
+    assert 'http_requests_total{method="GET",route="/api/v1/health",status="200"}' in r.text
+
+
+_WORKER = """
+from app.core.metrics import HTTP_REQUESTS, HTTP_REQUESTS_IN_PROGRESS
+HTTP_REQUESTS.labels(method="GET", route="/x", status="200").inc({count})
+HTTP_REQUESTS_IN_PROGRESS.labels(method="GET", route="/x").inc()
+"""
+
+_SCRAPE = """
+import sys
+from app.core.metrics import mark_process_dead, render_latest
+mark_process_dead(int(sys.argv[1]))
+sys.stdout.write(render_latest()[0].decode())
+"""
+
+
+def test_multiprocess_values_are_merged(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    workers = [
+        subprocess.Popen([sys.executable, "-c", _WORKER.format(count=count)], env=env)
+        for count in (2, 3)
+    ]
+    for worker in workers:
+        assert worker.wait(timeout=60) == 0
+
+    # первый воркер «завершился»: in-flight этого воркера больше не считается, счётчики остаются
+    scrape = subprocess.run(
+        [sys.executable, "-c", _SCRAPE, str(workers[0].pid)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=60,
+    ).stdout
+    assert 'http_requests_total{method="GET",route="/x",status="200"} 5.0' in scrape
+    assert 'http_requests_in_progress{method="GET",route="/x"} 1.0' in scrape
+
+
+class _RouteWithoutPath:
+    # так выглядит вложенный роутер в новых версиях FastAPI: атрибута .path нет
+    def matches(self, scope):
+        raise AssertionError("routes without a path are not matched")
+
+
+def test_expected_route_prefers_full_match_and_skips_routes_without_path():
+    api = FastAPI()
+
+    @api.get("/items/{item_id}")
+    async def get_item(item_id: str) -> None: ...
+
+    @api.post("/items/new")
+    async def create_item() -> None: ...
+
+    api.router.routes.insert(0, _RouteWithoutPath())  # type: ignore[arg-type]
+
+    def scope(method: str, path: str) -> dict:
+        return {"type": "http", "app": api, "method": method, "path": path, "root_path": ""}
+
+    # POST /items/new совпадает по пути и в шаблоне GET /items/{item_id}, но полное совпадение найдётся дальше
+    assert _expected_route_template(scope("POST", "/items/new")) == "/items/new"
+    assert _expected_route_template(scope("PUT", "/items/1")) == "/items/{item_id}"
+    assert _expected_route_template(scope("GET", "/other")) == "<unmatched>"
+    assert _route_template({}) == "<unmatched>"
+
+
+@pytest.mark.asyncio
+async def test_wrong_method_is_labelled_with_the_route(client):
+    before = _sample("http_requests_total", method="POST", route="/api/v1/health", status="405")
+    assert (await client.post("/api/v1/health")).status_code == 405
+    after = _sample("http_requests_total", method="POST", route="/api/v1/health", status="405")
+    assert after == before + 1
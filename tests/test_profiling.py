@@ -0,0 +1,154 @@
+import asyncio
+import sys
+import time
+
+import orjson
+import pytest
+
+from app.api.middleware import ProfilingMiddleware
+from app.core.config import settings
+from app.core.profiling import (
+    LOOP_IDLE,
+    OTHER_TASKS_FRAME,
+    PROFILE_HEADER,
+    PROFILE_ID_HEADER,
+    SamplingProfiler,
+    frame_layer,
+    speedscope_document,
+    summarize,
+)
+from app.main import app
+
+TEAM_PAYLOAD = {
+    "team_name": "backend",
+    "members": [
+        {"user_id": "u1", "username": "Alice", "is_active": True},
+        {"user_id": "u2", "username": "Bob", "is_active": True},
+    ],
+}
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_profiler_attributes_samples_to_the_profiled_task():
+    async def profiled() -> SamplingProfiler:
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.start()
+        # пока спим, цикл занят другой задачей, затем работаем сами
+        await asyncio.sleep(0.05)
+        _busy(0.05)
+        profiler.stop()
+        return profiler
+
+    async def other() -> None:
+        await asyncio.sleep(0)
+        _busy(0.05)
+
+    profiler, _ = await asyncio.gather(profiled(), other())
+
+    own = [s for s in profiler.samples if any(f[0] == "_busy" for f in s.stack)]
+    others = [s for s in profiler.samples if s.stack == (OTHER_TASKS_FRAME,)]
+    assert own and others
+    assert all(any(f[0].endswith("profiled") for f in s.stack) for s in own)
+    assert sum(s.seconds for s in profiler.samples) == pytest.approx(
+        profiler.wall_seconds, abs=0.02
+    )
+    assert {frame_layer(s) for s in own} == {"other (stdlib, uvicorn)"}
+
+    document = speedscope_document(profiler, "test")
+    profile = document["profiles"][0]
+    assert profile["type"] == "sampled"
+    assert len(profile["samples"]) == len(profile["weights"]) == len(profiler.samples)
+    frame_count = len(document["shared"]["frames"])
+    assert all(0 <= i < frame_count for stack in profile["samples"] for i in stack)
+
+    summary = summarize(profiler, "test", [])
+    assert "other tasks on the event loop" in summary
+    assert "_busy  tests/test_profiling.py" not in summary
+    assert "_busy" in summary
+
+
+@pytest.mark.asyncio
+async def test_overlapping_profiles_restore_switch_interval():
+    original = sys.getswitchinterval()
+    first = SamplingProfiler(interval=0.001, short_switch_interval=True)
+    second = SamplingProfiler(interval=0.002, short_switch_interval=True)
+    first.start()
+    second.start()
+    assert sys.getswitchinterval() < original
+    # первый остановлен раньше второго: второй ещё работает, интервал остаётся коротким
+    first.stop()
+    assert sys.getswitchinterval() < original
+    second.stop()
+    assert sys.getswitchinterval() == original
+
+
+@pytest.mark.asyncio
+async def test_switch_interval_is_left_alone_by_default():
+    original = sys.getswitchinterval()
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    assert sys.getswitchinterval() == original
+    profiler.stop()
+
+
+@pytest.fixture
+def profiled_client(client, tmp_path, monkeypatch):
+    # в приложении middleware подключается при старте, если профилирование включено
+    monkeypatch.setattr(app, "middleware_stack", ProfilingMiddleware(app.build_middleware_stack()))
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "secret")
+    monkeypatch.setattr(settings, "PROFILING_OUTPUT_DIR", str(tmp_path))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_request_with_token_is_profiled(profiled_client, tmp_path):
+    await profiled_client.post("/api/v1/team/add", json=TEAM_PAYLOAD)
+    r = await profiled_client.post(
+        "/api/v1/team/deactivateUsers",
+        json={"team_name": "backend", "user_ids": ["u2"]},
+        headers={PROFILE_HEADER: "secret"},
+    )
+    assert r.status_code == 200
+    profile_id = r.headers[PROFILE_ID_HEADER]
+    assert "api_v1_team_deactivateUsers" in profile_id
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        f"{profile_id}.speedscope.json",
+        f"{profile_id}.txt",
+    ]
+
+    document = orjson.loads((tmp_path / f"{profile_id}.speedscope.json").read_bytes())
+    assert document["profiles"][0]["samples"]
+    summary = (tmp_path / f"{profile_id}.txt").read_text()
+    assert summary.startswith(
+        "POST /api/v1/team/deactivateUsers (/api/v1/team/deactivateUsers) -> 200"
+    )
+    assert " SQL statements, " in summary
+    assert "time by layer" in summary
+    assert LOOP_IDLE in summary or "ORM / SQLAlchemy" in summary
+
+
+@pytest.mark.asyncio
+async def test_requests_without_valid_token_are_not_profiled(profiled_client, tmp_path):
+    r = await profiled_client.get("/api/v1/health")
+    assert PROFILE_ID_HEADER not in r.headers
+    r = await profiled_client.get("/api/v1/health", headers={PROFILE_HEADER: "wrong"})
+    assert PROFILE_ID_HEADER not in r.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_sample_rate_and_routes(profiled_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "PROFILING_SAMPLE_ROUTES", ["GET /api/v1/team/get"])
+    r = await profiled_client.get("/api/v1/health")
+    assert PROFILE_ID_HEADER not in r.headers
+    r = await profiled_client.get("/api/v1/team/get", params={"team_name": "missing"})
+    assert r.status_code == 404
+    assert PROFILE_ID_HEADER in r.headers
+    assert len(list(tmp_path.glob("*.txt"))) == 1
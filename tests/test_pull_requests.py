@@ -268,3 +268,33 @@ async def test_pr_reassign_after_merge_forbidden(client, monkeypatch):
 
     assert r.status_code == 409
     assert r.json()["detail"]["error"]["code"] == "PR_MERGED"
+
+
+@pytest.mark.asyncio
+async def test_pr_create_duplicate_conflict(client):
+    await client.post(
+        "/api/v1/team/add_or_update",
+        json={
+            "team_name": "backend",
+            "members": [
+                {"user_id": "u1", "username": "Alice", "is_active": True},
+                {"user_id": "u2", "username": "Bob", "is_active": True},
+            ],
+        },
+    )
+    payload = {"pull_request_id": "pr9", "pull_request_name": "Dup", "author_id": "u1"}
+
+    r1 = await client.post("/api/v1/pullRequest/create", json=payload)
+    assert r1.status_code == 201
+    assert r1.json()["pr"]["created_at"] is not None
+
+    r2 = await client.post("/api/v1/pullRequest/create", json=payload)
+    assert r2.status_code == 409
+    assert r2.json()["detail"]["error"]["code"] == "PR_EXISTS"
+
+    # PR уже есть, автор неизвестен — всё равно 409, не 404
+    r3 = await client.post(
+        "/api/v1/pullRequest/create",
+        json={**payload, "author_id": "missing"},
+    )
+    assert r3.status_code == 409
@@ -0,0 +1,89 @@
+import pytest
+
+import app.services.pr_service as pr_service_module
+
+TEAM_PAYLOAD = {
+    "team_name": "backend",
+    "members": [
+        {"user_id": "u1", "username": "Alice", "is_active": True},
+        {"user_id": "u2", "username": "Bob", "is_active": True},
+        {"user_id": "u3", "username": "Cathy", "is_active": True},
+        {"user_id": "u4", "username": "Dan", "is_active": False},
+    ],
+}
+
+
+@pytest.mark.asyncio
+async def test_pr_create_batch_reports_per_item_results(client, monkeypatch):
+    await client.post("/api/v1/team/add_or_update", json=TEAM_PAYLOAD)
+    await client.post(
+        "/api/v1/pullRequest/create",
+        json={"pull_request_id": "pr_old", "pull_request_name": "Old", "author_id": "u1"},
+    )
+
+    monkeypatch.setattr(pr_service_module.random, "sample", lambda seq, k: ["u2", "u3"])
+
+    r = await client.post(
+        "/api/v1/pullRequest/createBatch",
+        json={
+            "items": [
+                {"pull_request_id": "pr_b1", "pull_request_name": "B1", "author_id": "u1"},
+                {"pull_request_id": "pr_b2", "pull_request_name": "B2", "author_id": "u2"},
+                {"pull_request_id": "pr_b1", "pull_request_name": "Dup", "author_id": "u1"},
+                {"pull_request_id": "pr_old", "pull_request_name": "Old", "author_id": "u1"},
+                {"pull_request_id": "pr_b3", "pull_request_name": "B3", "author_id": "ghost"},
+            ]
+        },
+    )
+    assert r.status_code == 200
+    body = r.json()
+    assert body["created"] == 2
+    assert body["failed"] == 3
+
+    results = body["results"]
+    assert [x["index"] for x in results] == [0, 1, 2, 3, 4]
+    assert set(results[0]["pr"]["assigned_reviewers"]) == {"u2", "u3"}
+    assert results[1]["pr"]["author_id"] == "u2"
+    assert results[2]["error"]["code"] == "PR_EXISTS"
+    assert results[3]["error"]["code"] == "PR_EXISTS"
+    assert results[4]["error"]["code"] == "NOT_FOUND"
+
+    r_u3 = await client.get("/api/v1/users/getReview", params={"user_id": "u3"})
+    pr_ids = {pr["pull_request_id"] for pr in r_u3.json()["pull_requests"]}
+    assert {"pr_b1", "pr_b2"} <= pr_ids
+
+
+@pytest.mark.asyncio
+async def test_pr_create_batch_rejects_empty_list(client):
+    r = await client.post("/api/v1/pullRequest/createBatch", json={"items": []})
+    assert r.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_pr_merge_batch_splits_merged_already_merged_and_missing(client):
+    await client.post("/api/v1/team/add_or_update", json=TEAM_PAYLOAD)
+    await client.post(
+        "/api/v1/pullRequest/createBatch",
+        json={
+            "items": [
+                {"pull_request_id": f"pr_m{i}", "pull_request_name": "M", "author_id": "u1"}
+                for i in range(3)
+            ]
+        },
+    )
+    await client.post("/api/v1/pullRequest/merge", json={"pull_request_id": "pr_m0"})
+
+    ids = ["pr_m0", "pr_m1", "pr_m2", "missing"]
+    r = await client.post("/api/v1/pullRequest/mergeBatch", json={"pull_request_ids": ids})
+    assert r.status_code == 200
+    body = r.json()
+    assert {pr["pull_request_id"] for pr in body["merged"]} == {"pr_m1", "pr_m2"}
+    assert all(pr["status"] == "MERGED" and pr["merged_at"] for pr in body["merged"])
+    assert all(len(pr["assigned_reviewers"]) == 2 for pr in body["merged"])
+    assert body["already_merged"] == ["pr_m0"]
+    assert body["not_found"] == ["missing"]
+
+    # повторный вызов ничего не меняет
+    r2 = await client.post("/api/v1/pullRequest/mergeBatch", json={"pull_request_ids": ids})
+    assert r2.json()["merged"] == []
+    assert r2.json()["already_merged"] == ["pr_m0", "pr_m1", "pr_m2"]
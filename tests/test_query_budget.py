@@ -0,0 +1,126 @@
+import logging
+
+import pytest
+
+from app.core.config import settings
+from app.core.query_recorder import QueryBudgetExceededError, QueryRecorder, statement_shape
+from app.services.team_service import team_response_cache
+
+
+def _team(name: str, size: int) -> dict:
+    return {
+        "team_name": name,
+        "members": [
+            {"user_id": f"{name}_u{i}", "username": f"U{i}", "is_active": True} for i in range(size)
+        ],
+    }
+
+
+def test_statement_shape_collapses_parameter_lists():
+    assert statement_shape(
+        "SELECT users.user_id FROM users\n WHERE users.user_id IN ($1::VARCHAR, $2::VARCHAR)"
+    ) == statement_shape("SELECT users.user_id FROM users WHERE users.user_id IN ($1::VARCHAR)")
+    assert statement_shape(
+        "INSERT INTO t (a, b) VALUES ($1, $2), ($3, $4), ($5, $6)"
+    ) == statement_shape("INSERT INTO t (a, b) VALUES ($1, $2)")
+    assert statement_shape("SELECT 1 WHERE a = $1") != statement_shape("SELECT 1 WHERE b = $1")
+
+
+def test_nested_recorders_and_repeated_shapes():
+    outer = QueryRecorder()
+    inner = QueryRecorder(budget=2, raise_on_exceed=True, parent=outer)
+    for _ in range(2):
+        inner.record("SELECT * FROM users WHERE user_id = $1", 0.001)
+    with pytest.raises(QueryBudgetExceededError, match="3 queries \\(budget 2\\)"):
+        inner.record("SELECT * FROM users WHERE user_id = $1", 0.001)
+    assert outer.queries == 3
+    assert outer.repeated(2) == [("SELECT * FROM users WHERE user_id = ?", 3)]
+
+
+@pytest.mark.asyncio
+async def test_endpoint_query_counts(client, max_queries):
+    with max_queries(8):
+        r = await client.post("/api/v1/team/add", json=_team("backend", 5))
+    assert r.status_code == 201
+    with max_queries(2):
+        await client.get("/api/v1/team/get", params={"team_name": "backend"})
+    with max_queries(4):
+        r = await client.post(
+            "/api/v1/pullRequest/create",
+            json={"pull_request_id": "pr1", "pull_request_name": "P", "author_id": "backend_u0"},
+        )
+    reviewer_id = r.json()["pr"]["assigned_reviewers"][0]
+    with max_queries(2):
+        await client.get("/api/v1/users/getReview", params={"user_id": reviewer_id})
+    with max_queries(7):
+        await client.post("/api/v1/pullRequest/merge", json={"pull_request_id": "pr1"})
+
+
+def _pr_batch(name: str, author_ids: list[str], prefix: str) -> dict:
+    return {
+        "items": [
+            {"pull_request_id": f"{name}_{prefix}{i}", "pull_request_name": "P", "author_id": a}
+            for i, a in enumerate(author_ids)
+        ]
+    }
+
+
+async def _deactivate_reviewers(client, name: str, size: int):
+    # каждый из size ревьюеров назначен на открытые PR, их нужно переназначить
+    authors = [f"{name}_u{size + i % 3}" for i in range(size)]
+    r = await client.post("/api/v1/pullRequest/createBatch", json=_pr_batch(name, authors, "pr"))
+    assert r.json()["created"] == size
+    return client.post(
+        "/api/v1/team/deactivateUsers",
+        json={"team_name": name, "user_ids": [f"{name}_u{i}" for i in range(size)]},
+    )
+
+
+async def _create_batch(client, name: str, size: int):
+    authors = [f"{name}_u{i}" for i in range(size)]
+    return client.post("/api/v1/pullRequest/createBatch", json=_pr_batch(name, authors, "pr"))
+
+
+@pytest.mark.parametrize("prepare", [_deactivate_reviewers, _create_batch])
+@pytest.mark.asyncio
+async def test_query_count_does_not_grow_with_input_size(client, max_queries, prepare):
+    counts = []
+    for size in (3, 30):
+        name = f"team{size}"
+        await client.post("/api/v1/team/add", json=_team(name, size + 3))
+        request = await prepare(client, name, size)
+        with max_queries(20) as recorder:
+            r = await request
+        assert r.status_code == 200
+        counts.append(recorder.queries)
+    assert counts[0] == counts[1]
+
+
+@pytest.mark.asyncio
+async def test_add_or_update_query_count_does_not_grow(client, max_queries):
+    counts = []
+    for size in (3, 30):
+        await client.post("/api/v1/team/add", json=_team(f"team{size}", size + 3))
+        with max_queries(20) as recorder:
+            r = await client.post("/api/v1/team/add_or_update", json=_team(f"team{size}", size))
+        assert r.status_code == 201
+        counts.append(recorder.queries)
+    assert counts[0] == counts[1]
+
+
+@pytest.mark.asyncio
+async def test_route_budget_raise_and_log_modes(client, monkeypatch, caplog):
+    await client.post("/api/v1/team/add", json=_team("backend", 2))
+    monkeypatch.setattr(settings, "QUERY_BUDGET_ROUTES", {"GET /api/v1/team/get": 1})
+
+    monkeypatch.setattr(settings, "QUERY_BUDGET_MODE", "log")
+    with caplog.at_level(logging.WARNING, logger="app.core.query_recorder"):
+        r = await client.get("/api/v1/team/get", params={"team_name": "backend"})
+    assert r.status_code == 200
+    assert "GET /api/v1/team/get: 2 queries (budget 1)" in caplog.text
+
+    monkeypatch.setattr(settings, "QUERY_BUDGET_MODE", "raise")
+    # без кэша тела: версия и состав — два запроса
+    team_response_cache.clear()
+    with pytest.raises(QueryBudgetExceededError):
+        await client.get("/api/v1/team/get", params={"team_name": "backend"})
@@ -0,0 +1,372 @@
+"""
+Query-plan regression suite: every statement issued by app/repositories/* while
+the API is exercised is EXPLAINed with enable_seqscan = off, so the planner picks
+an index whenever one can serve the query. A remaining Seq Scan means the query
+has no usable index.
+"""
+
+import asyncio
+import contextvars
+import functools
+import importlib
+import inspect
+import json
+import pkgutil
+import re
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import app.repositories
+import app.services.pr_service as pr_service_module
+from app.repositories.deactivation_job_repo import DeactivationJobRepository
+from app.repositories.pull_request_repo import PullRequestRepository
+from app.schemas.schema_enums.pull_request_enums import PRStatus
+from app.services.stats_service import StatsService
+from app.services.team_service import TeamService
+
+# методы, которые по смыслу читают таблицу целиком (или вызываются не на горячем пути)
+FULL_SCAN_ALLOWED = {
+    "StatsRepository.get_snapshot",  # счётчики: размер таблиц — число пользователей
+    "StatsCounterRepository.compute_from_source",
+    "StatsCounterRepository.replace",
+    "StatsDailyRepository.rebuild",
+    "StatsDailyRepository.get_source_day_range",
+    "DeactivationJobRepository.get_unfinished_ids",  # только при старте воркера
+}
+
+# методы, которые сервисы не вызывают; новый метод должен попасть в сценарий ниже
+NOT_EXERCISED = {
+    "UserRepository.get_by_id",
+}
+
+_current_method: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "current_repository_method", default=None
+)
+
+
+def _repository_methods() -> dict[str, tuple[type, str]]:
+    methods = {}
+    for module_info in pkgutil.iter_modules(app.repositories.__path__):
+        module = importlib.import_module(f"app.repositories.{module_info.name}")
+        for cls in vars(module).values():
+            if not inspect.isclass(cls) or cls.__module__ != module.__name__:
+                continue
+            if not cls.__name__.endswith("Repository"):
+                continue
+            for name, attr in vars(cls).items():
+                if not name.startswith("_") and inspect.iscoroutinefunction(attr):
+                    methods[f"{cls.__name__}.{name}"] = (cls, name)
+    return methods
+
+
+def _trace(qualname: str, method, called: set[str]):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        called.add(qualname)
+        token = _current_method.set(qualname)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            _current_method.reset(token)
+
+    return wrapper
+
+
+def _full_scans(plan: dict, leading_columns: dict[str, str]) -> list[str]:
+    """
+    Seq Scans, and index scans that do not constrain the index's leading column:
+    with enable_seqscan = off the planner would rather read a whole unrelated
+    index than the table.
+    """
+    found = []
+    node_type = plan.get("Node Type")
+    if node_type == "Seq Scan":
+        found.append(f"Seq Scan on {plan['Relation Name']}")
+    elif node_type in ("Index Scan", "Index Only Scan", "Bitmap Index Scan"):
+        index_name = plan["Index Name"]
+        leading = leading_columns.get(index_name)
+        condition = plan.get("Index Cond", "")
+        if leading and not re.search(rf"(?<![.\w]){leading}\b", condition):
+            found.append(f"full {node_type} of {index_name}")
+    for child in plan.get("Plans", []):
+        found += _full_scans(child, leading_columns)
+    return found
+
+
+async def _seed_volume(engine) -> None:
+    """Enough rows that a full scan is never the cheapest way to fetch a handful."""
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(
+                "INSERT INTO users (user_id, username, is_active) "
+                "SELECT 'bulk_u' || g, 'Bulk', true FROM generate_series(1, 2000) AS g"
+            )
+        )
+        await conn.execute(text("INSERT INTO teams (team_name) VALUES ('bulk')"))
+        await conn.execute(
+            text(
+                "INSERT INTO team_members (team_name, user_id) "
+                "SELECT 'bulk', 'bulk_u' || g FROM generate_series(1, 2000) AS g"
+            )
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO pull_requests "
+                "(pull_request_id, pull_request_name, author_id, status, created_at) "
+                "SELECT 'bulk_pr' || g, 'Bulk', 'bulk_u' || (1 + g % 2000), "
+                "  (CASE WHEN g % 4 = 0 THEN 'OPEN' ELSE 'MERGED' END)::pr_status, "
+                "  now() - make_interval(mins => g) "
+                "FROM generate_series(1, 20000) AS g"
+            )
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO pr_reviewers (pull_request_id, reviewer_id, pr_created_at) "
+                "SELECT 'bulk_pr' || g, 'bulk_u' || (1 + (g + k) % 2000), "
+                "  now() - make_interval(mins => g) "
+                "FROM generate_series(1, 20000) AS g, generate_series(1, 2) AS k"
+            )
+        )
+
+
+async def _exercise_api(client, engine, monkeypatch) -> None:
+    monkeypatch.setattr(pr_service_module.random, "sample", lambda seq, k: list(seq)[:k])
+
+    for team in range(3):
+        members = [
+            {"user_id": f"t{team}_u{i}", "username": f"U{i}", "is_active": True} for i in range(10)
+        ]
+        r = await client.post(
+            "/api/v1/team/add", json={"team_name": f"t{team}", "members": members}
+        )
+        assert r.status_code == 201
+    r = await client.post(
+        "/api/v1/team/add_or_update",
+        json={
+            "team_name": "t0",
+            "members": [
+                # t0_u9 уходит из команды, t0_u10 приходит
+                {"user_id": f"t0_u{i}", "username": f"U{i}", "is_active": True}
+                for i in [*range(9), 10]
+            ],
+        },
+    )
+    assert r.status_code == 201
+    assert (await client.get("/api/v1/team/get", params={"team_name": "t0"})).status_code == 200
+    lines = [
+        json.dumps({"team_name": "imported", "user_id": f"imp_u{i}", "username": "I"})
+        for i in range(5)
+    ]
+    r = await client.post("/api/v1/team/import", content="\n".join(lines))
+    assert r.json()["members_added"] == 5
+    r = await client.get("/api/v1/team/get", params={"team_name": "t0", "since": 1})
+    assert r.json()["removed"] == ["t0_u9"]
+
+    for i in range(20):
+        r = await client.post(
+            "/api/v1/pullRequest/create",
+            json={"pull_request_id": f"pr{i}", "pull_request_name": "P", "author_id": "t0_u0"},
+        )
+        assert r.status_code == 201
+        if i == 1:
+            pr1_reviewer = r.json()["pr"]["assigned_reviewers"][0]
+    r = await client.post(
+        "/api/v1/pullRequest/create",
+        json={"pull_request_id": "pr0", "pull_request_name": "P", "author_id": "t0_u0"},
+    )
+    assert r.status_code == 409
+    r = await client.post(
+        "/api/v1/pullRequest/createBatch",
+        json={
+            "items": [
+                {"pull_request_id": f"b{i}", "pull_request_name": "B", "author_id": f"t1_u{i}"}
+                for i in range(10)
+            ]
+        },
+    )
+    assert r.json()["created"] == 10
+
+    assert (
+        await client.post("/api/v1/pullRequest/merge", json={"pull_request_id": "pr0"})
+    ).status_code == 200
+    r = await client.post("/api/v1/pullRequest/mergeBatch", json={"pull_request_ids": ["b0", "b1"]})
+    assert r.status_code == 200
+    r = await client.post(
+        "/api/v1/pullRequest/reassign",
+        json={"pull_request_id": "pr1", "old_reviewer_id": pr1_reviewer},
+    )
+    assert r.status_code == 200
+
+    # random.sample подменён: все PR автора t0_u0 получают одних и тех же ревьюеров
+    r = await client.get("/api/v1/users/getReview", params={"user_id": pr1_reviewer, "limit": 5})
+    cursor = r.json()["next_cursor"]
+    assert cursor is not None
+    r = await client.get(
+        "/api/v1/users/getReview",
+        params={"user_id": pr1_reviewer, "limit": 5, "status": "OPEN", "cursor": cursor},
+    )
+    assert r.status_code == 200
+    r = await client.post(
+        "/api/v1/users/setIsActive", json={"user_id": "t2_u9", "is_active": False}
+    )
+    assert r.status_code == 200
+
+    r = await client.post(
+        "/api/v1/team/deactivateUsers", json={"team_name": "t0", "user_ids": [pr1_reviewer]}
+    )
+    assert r.status_code == 200
+    r = await client.post(
+        "/api/v1/team/deactivateUsers",
+        params={"async": "true"},
+        json={"team_name": "t1", "user_ids": ["t1_u2", "t1_u3"]},
+    )
+    job_id = r.json()["job"]["job_id"]
+    for _ in range(100):
+        r = await client.get(f"/api/v1/team/deactivateUsers/jobs/{job_id}")
+        if r.json()["job"]["status"] == "DONE":
+            break
+        await asyncio.sleep(0.05)
+
+    assert (await client.get("/api/v1/stats")).status_code == 200
+    r = await client.get(
+        "/api/v1/export/pull_requests", params={"from": "2020-01-01", "status": "OPEN"}
+    )
+    assert r.status_code == 200
+    assert (await client.get("/api/v1/stats/window", params={"window": "7d"})).status_code == 200
+
+    async with engine.begin() as conn:
+        # расхождение, чтобы reconcile дошёл до перезаписи счётчиков
+        await conn.execute(text("UPDATE stats_pr_status SET count = 0 WHERE status = 'OPEN'"))
+    session_local = async_sessionmaker(bind=engine)
+    async with session_local() as session:
+        assert await StatsService().reconcile_counters(session)
+    async with session_local() as session:
+        await StatsService().backfill_daily(session)
+    async with session_local() as session:
+        await StatsService().reconcile_counters(session, dry_run=True)
+    async with session_local() as session:
+        await DeactivationJobRepository(session).get_unfinished_ids()
+    async with session_local() as session:
+        await TeamService().trim_change_log(session)
+
+
+@pytest.mark.asyncio
+async def test_repository_queries_use_indexes(client, engine, monkeypatch):
+    called: set[str] = set()
+    methods = _repository_methods()
+    for qualname, (cls, name) in methods.items():
+        monkeypatch.setattr(cls, name, _trace(qualname, getattr(cls, name), called))
+
+    statements: list[tuple[str | None, str, object]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        method = _current_method.get()
+        if statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "WITH", "UPDATE", "DELETE"):
+            params = parameters[0] if executemany and parameters else parameters
+            statements.append((method, statement, params))
+
+    await _seed_volume(engine)
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        await _exercise_api(client, engine, monkeypatch)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    missing = set(methods) - called - NOT_EXERCISED
+    assert not missing, f"repository methods not covered by the plan suite: {sorted(missing)}"
+
+    violations = []
+    async with engine.connect() as conn:
+        await conn.execute(text("ANALYZE"))
+        # запрещаем полные проходы и hash/merge join: если индекс есть,
+        # планировщик обязан им воспользоваться, в том числе для внутренней таблицы соединения
+        for setting in ("enable_seqscan", "enable_hashjoin", "enable_mergejoin"):
+            await conn.execute(text(f"SET {setting} = off"))
+        result = await conn.execute(
+            text(
+                "SELECT ic.relname, a.attname FROM pg_index i "
+                "JOIN pg_class ic ON ic.oid = i.indexrelid "
+                "JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0] "
+                "WHERE ic.relnamespace = current_schema()::regnamespace"
+            )
+        )
+        leading_columns = dict(result.all())
+        for method, statement, params in statements:
+            if method in FULL_SCAN_ALLOWED:
+                continue
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", params)
+            plan = result.scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            scans = _full_scans(plan[0]["Plan"], leading_columns)
+            if scans:
+                violations.append(f"{method or '<orm flush>'}: {scans}\n{statement}")
+
+    assert not violations, "\n\n".join(violations)
+
+
+def _plan_nodes(plan: dict) -> list[dict]:
+    return [plan, *(node for child in plan.get("Plans", []) for node in _plan_nodes(child))]
+
+
+@pytest.mark.asyncio
+async def test_review_page_is_read_in_index_order(engine):
+    """
+    The /users/getReview page walks ix_pr_reviewers_reviewer_created_at from the
+    cursor and stops after limit rows: no Sort over all of the reviewer's PRs.
+    """
+    await _seed_volume(engine)
+    statements: list[tuple[str, object]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    session_local = async_sessionmaker(bind=engine)
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        async with session_local() as session:
+            await PullRequestRepository(session).get_review_assignments_page(
+                "bulk_u7",
+                limit=6,
+                status=PRStatus.MERGED,
+                before=(datetime.now(UTC) - timedelta(hours=1), "bulk_pr60"),
+            )
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    (statement, params), *_ = statements
+    async with engine.connect() as conn:
+        await conn.execute(text("ANALYZE"))
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", params)
+        plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    nodes = _plan_nodes(plan[0]["Plan"])
+    shown = json.dumps(plan, indent=1)
+    assert not [node for node in nodes if node["Node Type"] in ("Sort", "Incremental Sort")], shown
+    (scan,) = [node for node in nodes if node.get("Relation Name") == "pr_reviewers"]
+    assert scan["Node Type"] in ("Index Scan", "Index Only Scan"), shown
+    assert scan["Index Name"] == "ix_pr_reviewers_reviewer_created_at", shown
+    assert scan["Scan Direction"] == "Backward", shown
+
+
+@pytest.mark.asyncio
+async def test_reviewer_lookups_share_one_index(engine):
+    """
+    ix_pr_reviewers_reviewer_created_at replaced ix_pr_reviewers_reviewer_id: it also
+    leads with reviewer_id, so lookups by reviewer (checked by the suite above) keep
+    their index, and a second index on the same prefix would only slow down writes.
+    """
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            text(
+                "SELECT ic.relname FROM pg_index i "
+                "JOIN pg_class ic ON ic.oid = i.indexrelid "
+                "JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0] "
+                "WHERE i.indrelid = 'pr_reviewers'::regclass AND a.attname = 'reviewer_id'"
+            )
+        )
+        assert result.scalars().all() == ["ix_pr_reviewers_reviewer_created_at"]
@@ -0,0 +1,187 @@
+"""
+Read routing against two databases on the same server: the test database is the
+primary, <DB_NAME>_replica stands in for a replica (no replication between them,
+so a read shows which of the two served it).
+"""
+
+import os
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import make_url, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.dependencies import get_read_router
+from app.core.config import settings
+from app.core.db import Base
+from app.core.db_routing import READ_YOUR_WRITES_HEADER, ReadRouter, read_your_writes_pinned
+from app.main import app
+from app.services.team_service import TeamService
+
+TEAM_PAYLOAD = {
+    "team_name": "backend",
+    "members": [
+        {"user_id": "u1", "username": "Alice", "is_active": True},
+        {"user_id": "u2", "username": "Bob", "is_active": True},
+    ],
+}
+
+# схема — как в conftest: импорт из conftest ломает mypy (модуль находится дважды)
+TEST_SCHEMA = os.getenv("TEST_SCHEMA", "test")
+REPLICA_URL = make_url(settings.postgres_async_url).set(database=f"{settings.DB_NAME}_replica")
+
+
+def _session_factory(engine) -> async_sessionmaker:
+    return async_sessionmaker(bind=engine, expire_on_commit=False)
+
+
+@pytest_asyncio.fixture
+async def replica_engine():
+    admin = create_async_engine(settings.postgres_async_url, isolation_level="AUTOCOMMIT")
+    async with admin.connect() as conn:
+        exists = await conn.scalar(
+            text("SELECT 1 FROM pg_database WHERE datname = :name"),
+            {"name": REPLICA_URL.database},
+        )
+        if not exists:
+            await conn.execute(text(f'CREATE DATABASE "{REPLICA_URL.database}"'))
+    await admin.dispose()
+
+    engine = create_async_engine(
+        REPLICA_URL, connect_args={"server_settings": {"search_path": TEST_SCHEMA}}
+    )
+    async with engine.begin() as conn:
+        await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{TEST_SCHEMA}"'))
+        await conn.run_sync(Base.metadata.create_all)
+        for table in reversed(Base.metadata.sorted_tables):
+            await conn.execute(table.delete())
+        # «отставшая» реплика: более старая версия команды, в ней пока только u1
+        # (кэш ответов /team/get общий для primary и реплик, он различает их по версии)
+        await conn.execute(text("INSERT INTO teams (team_name, version) VALUES ('backend', 0)"))
+        await conn.execute(
+            text("INSERT INTO users (user_id, username, is_active) VALUES ('u1', 'Alice', true)")
+        )
+        await conn.execute(
+            text("INSERT INTO team_members (team_name, user_id) VALUES ('backend', 'u1')")
+        )
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def route_to_replica(engine, replica_engine):
+    session_override = app.dependency_overrides[get_read_router]
+    router = ReadRouter(_session_factory(engine), [_session_factory(replica_engine)])
+    app.dependency_overrides[get_read_router] = lambda: router
+    yield router
+    app.dependency_overrides[get_read_router] = session_override
+
+
+def _member_ids(response) -> list[str]:
+    return [m["user_id"] for m in response.json()["team"]["members"]]
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica_and_writers_are_pinned_to_primary(client, route_to_replica):
+    r = await client.post("/api/v1/team/add", json=TEAM_PAYLOAD)
+    assert r.status_code == 201
+    token = r.headers[READ_YOUR_WRITES_HEADER]
+
+    r = await client.get("/api/v1/team/get", params={"team_name": "backend"})
+    assert _member_ids(r) == ["u1"]
+
+    r = await client.get(
+        "/api/v1/team/get",
+        params={"team_name": "backend"},
+        headers={READ_YOUR_WRITES_HEADER: token},
+    )
+    assert _member_ids(r) == ["u1", "u2"]
+
+    # пользователя u2 реплика ещё не видит: 404 — ошибка запроса, реплика остаётся в ротации
+    r = await client.get("/api/v1/users/getReview", params={"user_id": "u2"})
+    assert r.status_code == 404
+    assert route_to_replica.replicas[0].failures == 0
+
+
+@pytest.mark.asyncio
+async def test_pinned_stats_bypass_the_shared_cache(client, route_to_replica):
+    await client.post("/api/v1/team/add", json=TEAM_PAYLOAD)
+    r = await client.post(
+        "/api/v1/pullRequest/create",
+        json={"pull_request_id": "pr1", "pull_request_name": "P", "author_id": "u1"},
+    )
+    token = r.headers[READ_YOUR_WRITES_HEADER]
+
+    # реплика ещё не видит PR, её ответ попадает в кэш /stats
+    r = await client.get("/api/v1/stats")
+    assert r.json()["pr_count_by_status"]["OPEN"] == 0
+    r = await client.get("/api/v1/stats", headers={READ_YOUR_WRITES_HEADER: token})
+    assert r.json()["pr_count_by_status"]["OPEN"] == 1
+    # ответ primary в общий кэш не попадает
+    r = await client.get("/api/v1/stats")
+    assert r.json()["pr_count_by_status"]["OPEN"] == 0
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_token_only_on_successful_writes(client):
+    r = await client.post("/api/v1/team/add", json=TEAM_PAYLOAD)
+    assert READ_YOUR_WRITES_HEADER in r.headers
+    r = await client.post("/api/v1/team/add", json=TEAM_PAYLOAD)
+    assert r.status_code == 400
+    assert READ_YOUR_WRITES_HEADER not in r.headers
+    r = await client.get("/api/v1/team/get", params={"team_name": "backend"})
+    assert READ_YOUR_WRITES_HEADER not in r.headers
+
+    assert not read_your_writes_pinned(None, 5)
+    assert not read_your_writes_pinned("garbage", 5)
+    assert not read_your_writes_pinned("1000", 5)
+
+
+@pytest.mark.asyncio
+async def test_round_robin_and_failover(engine, replica_engine):
+    now = [0.0]
+    dead_engine = create_async_engine(
+        make_url(settings.postgres_async_url).set(port=1), pool_pre_ping=True
+    )
+    router = ReadRouter(
+        _session_factory(engine),
+        [_session_factory(replica_engine), _session_factory(dead_engine)],
+        retry_seconds=10,
+        clock=lambda: now[0],
+    )
+    assert [[t.name for t in router.candidates()] for _ in range(2)] == [
+        ["replica-0", "replica-1", "primary"],
+        ["replica-1", "replica-0", "primary"],
+    ]
+
+    async def current_database(db_session) -> str:
+        name: str = await db_session.scalar(text("SELECT current_database()"))
+        return name
+
+    # replica-1 недоступна: запрос уходит на следующую, она пропускается до retry
+    served = [await router.run(current_database) for _ in range(3)]
+    assert served == [REPLICA_URL.database] * 3
+    dead = router.replicas[1]
+    assert dead.failures == 1
+    assert [t.name for t in router.candidates()] == ["replica-0", "primary"]
+
+    # после retry_seconds реплика снова в ротации, за два запроса её пробуют ровно раз
+    now[0] = 11
+    assert "replica-1" in [t.name for t in router.candidates()]
+    served = [await router.run(current_database) for _ in range(2)]
+    assert served == [REPLICA_URL.database] * 2
+    assert dead.failures == 2
+
+    # все реплики недоступны — читаем из primary
+    router.replicas[0].down_until = now[0] + 100
+    dead.down_until = now[0] + 100
+    assert await router.run(current_database) == settings.DB_NAME
+    await dead_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_service_method_runs_through_router(engine, replica_engine):
+    router = ReadRouter(_session_factory(engine), [_session_factory(replica_engine)])
+    payload = await router.run(TeamService().get_team_payload, "backend")
+    assert b'"u1"' in payload.body
+    assert b'"u2"' not in payload.body
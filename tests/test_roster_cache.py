@@ -0,0 +1,69 @@
+import pytest
+
+from app.utils.ttl_cache import TTLCache
+
+TEAM_PAYLOAD = {
+    "team_name": "backend",
+    "members": [
+        {"user_id": "u1", "username": "Alice", "is_active": True},
+        {"user_id": "u2", "username": "Bob", "is_active": True},
+        {"user_id": "u3", "username": "Cathy", "is_active": True},
+    ],
+}
+
+
+def _roster_stats(body: dict) -> dict:
+    return next(c for c in body["caches"] if c["name"] == "team_roster")
+
+
+def test_ttl_cache_evicts_lru_and_expires():
+    now = [0.0]
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=10, clock=lambda: now[0])
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" становится самым старым
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    now[0] = 11
+    assert cache.get("a") is None
+    assert cache.stats().hits == 2
+    assert cache.stats().misses == 2
+
+
+@pytest.mark.asyncio
+async def test_pr_create_uses_cached_roster(client):
+    await client.post("/api/v1/team/add_or_update", json=TEAM_PAYLOAD)
+
+    for i in range(3):
+        r = await client.post(
+            "/api/v1/pullRequest/create",
+            json={"pull_request_id": f"pr{i}", "pull_request_name": "Cached", "author_id": "u1"},
+        )
+        assert r.status_code == 201
+
+    r = await client.get("/api/v1/internal/cache")
+    assert r.status_code == 200
+    stats = _roster_stats(r.json())
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_set_is_active_invalidates_cached_roster(client):
+    await client.post("/api/v1/team/add_or_update", json=TEAM_PAYLOAD)
+    await client.post(
+        "/api/v1/pullRequest/create",
+        json={"pull_request_id": "pr1", "pull_request_name": "Warm", "author_id": "u1"},
+    )
+
+    await client.post("/api/v1/users/setIsActive", json={"user_id": "u2", "is_active": False})
+
+    r = await client.post(
+        "/api/v1/pullRequest/create",
+        json={"pull_request_id": "pr2", "pull_request_name": "After", "author_id": "u1"},
+    )
+    assert r.status_code == 201
+    assert r.json()["pr"]["assigned_reviewers"] == ["u3"]
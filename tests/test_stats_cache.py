@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from app.core.query_recorder import QueryRecorder, current_query_recorder
+from app.services.stats_service import stats_response_cache
+from app.utils.swr_cache import StaleWhileRevalidate
+
+TEAM_PAYLOAD = {
+    "team_name": "backend",
+    "members": [
+        {"user_id": "u1", "username": "Alice", "is_active": True},
+        {"user_id": "u2", "username": "Bob", "is_active": True},
+    ],
+}
+
+
+@pytest.mark.asyncio
+async def test_swr_serves_stale_value_during_single_refresh():
+    now = [0.0]
+    cache: StaleWhileRevalidate[int] = StaleWhileRevalidate(
+        ttl=10, stale_ttl=20, clock=lambda: now[0]
+    )
+    calls = 0
+    release = asyncio.Event()
+
+    async def loader() -> int:
+        nonlocal calls
+        calls += 1
+        if calls > 1:
+            await release.wait()
+        return calls
+
+    # холодный кэш: параллельные запросы ждут одну загрузку
+    assert await asyncio.gather(cache.get(loader), cache.get(loader)) == [1, 1]
+    assert calls == 1
+
+    now[0] = 15
+    assert await cache.get(loader) == 1
+    assert await cache.get(loader) == 1
+    release.set()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert calls == 2
+    assert await cache.get(loader) == 2
+
+    # за пределами окна устаревания ждём свежее значение
+    now[0] = 100
+    assert await cache.get(loader) == 3
+
+
+@pytest.mark.asyncio
+async def test_stats_etag_and_not_modified(client, monkeypatch):
+    monkeypatch.setattr(stats_response_cache, "ttl", 60)
+    await client.post("/api/v1/team/add_or_update", json=TEAM_PAYLOAD)
+
+    r = await client.get("/api/v1/stats")
+    assert r.status_code == 200
+    etag = r.headers["ETag"]
+
+    r = await client.get("/api/v1/stats", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+
+    # внутри TTL ответ берётся из кэша, даже если данные уже изменились
+    await client.post(
+        "/api/v1/pullRequest/create",
+        json={"pull_request_id": "pr1", "pull_request_name": "P", "author_id": "u1"},
+    )
+    r = await client.get("/api/v1/stats", headers={"If-None-Match": f'W/{etag}, "other"'})
+    assert r.status_code == 304
+
+    r = await client.get("/api/v1/internal/cache")
+    stats = next(c for c in r.json()["caches"] if c["name"] == "stats_response")
+    assert stats == {
+        "name": "stats_response",
+        "hits": 2,
+        "misses": 1,
+        "hit_ratio": pytest.approx(2 / 3),
+        "size": 1,
+        "maxsize": 1,
+    }
+
+    stats_response_cache.clear()
+    r = await client.get("/api/v1/stats", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["ETag"] != etag
+    assert r.json()["pr_count_by_status"] == {"OPEN": 1, "MERGED": 0}
+
+
+@pytest.mark.asyncio
+async def test_swr_load_does_not_inherit_request_recorder():
+    cache: StaleWhileRevalidate[QueryRecorder | None] = StaleWhileRevalidate(ttl=10, stale_ttl=0)
+
+    async def loader() -> QueryRecorder | None:
+        return current_query_recorder.get()
+
+    token = current_query_recorder.set(QueryRecorder(budget=1, raise_on_exceed=True))
+    try:
+        # загрузка общая: её запросы не идут в бюджет запроса, который её запустил
+        assert await cache.get(loader) is None
+    finally:
+        current_query_recorder.reset(token)
@@ -0,0 +1,105 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import app.services.pr_service as pr_service_module
+import app.services.team_service as team_service_module
+from app.repositories.stats_counter_repo import StatsCounterRepository
+from app.repositories.stats_repo import StatsRepository
+from app.schemas.schema_enums.pull_request_enums import PRStatus
+from app.services.stats_service import StatsService
+
+TEAM_PAYLOAD = {
+    "team_name": "backend",
+    "members": [
+        {"user_id": "u1", "username": "Alice", "is_active": True},
+        {"user_id": "u2", "username": "Bob", "is_active": True},
+        {"user_id": "u3", "username": "Cathy", "is_active": True},
+        {"user_id": "u4", "username": "Dan", "is_active": True},
+    ],
+}
+
+
+async def _snapshots(engine):
+    async with async_sessionmaker(bind=engine)() as session:
+        stored = await StatsRepository(session).get_snapshot()
+        return stored, await StatsCounterRepository(session).compute_from_source()
+
+
+@pytest.mark.asyncio
+async def test_counters_follow_every_write_path(client, engine, monkeypatch):
+    await client.post("/api/v1/team/add_or_update", json=TEAM_PAYLOAD)
+    monkeypatch.setattr(pr_service_module.random, "sample", lambda seq, k: ["u2", "u3"])
+    monkeypatch.setattr(pr_service_module.random, "choice", lambda seq: "u4")
+    monkeypatch.setattr(team_service_module.random, "choice", lambda seq: "u4")
+
+    for pr_id in ("pr_1", "pr_2"):
+        await client.post(
+            "/api/v1/pullRequest/create",
+            json={"pull_request_id": pr_id, "pull_request_name": pr_id, "author_id": "u1"},
+        )
+    await client.post(
+        "/api/v1/pullRequest/createBatch",
+        json={
+            "items": [
+                {"pull_request_id": f"pr_b{i}", "pull_request_name": "B", "author_id": "u1"}
+                for i in range(3)
+            ]
+            + [{"pull_request_id": "pr_1", "pull_request_name": "dup", "author_id": "u1"}]
+        },
+    )
+    await client.post("/api/v1/pullRequest/merge", json={"pull_request_id": "pr_2"})
+    # повторный merge не должен менять счётчики
+    await client.post("/api/v1/pullRequest/merge", json={"pull_request_id": "pr_2"})
+    await client.post(
+        "/api/v1/pullRequest/mergeBatch", json={"pull_request_ids": ["pr_b0", "pr_2", "nope"]}
+    )
+    r = await client.post(
+        "/api/v1/pullRequest/reassign",
+        json={"pull_request_id": "pr_1", "old_reviewer_id": "u2"},
+    )
+    assert r.status_code == 200
+    r = await client.post(
+        "/api/v1/team/deactivateUsers", json={"team_name": "backend", "user_ids": ["u3"]}
+    )
+    assert r.status_code == 200
+
+    stored, actual = await _snapshots(engine)
+    assert stored == actual
+    assert stored.diff(actual) == []
+
+
+@pytest.mark.asyncio
+async def test_reconcile_fixes_drift(client, engine, monkeypatch):
+    await client.post("/api/v1/team/add_or_update", json=TEAM_PAYLOAD)
+    monkeypatch.setattr(pr_service_module.random, "sample", lambda seq, k: ["u2", "u3"])
+    await client.post(
+        "/api/v1/pullRequest/create",
+        json={"pull_request_id": "pr_1", "pull_request_name": "P", "author_id": "u1"},
+    )
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("UPDATE stats_reviewer_assignments SET count = 7 WHERE reviewer_id = 'u2'")
+        )
+        await conn.execute(text("DELETE FROM stats_pr_status"))
+
+    session_local = async_sessionmaker(bind=engine)
+    async with session_local() as session:
+        drift = await StatsService().reconcile_counters(session, dry_run=True)
+    assert {(counter, key) for counter, key, _, _ in drift} == {
+        ("reviewer_assignments", "u2"),
+        ("pr_status", PRStatus.OPEN),
+    }
+
+    async with session_local() as session:
+        assert len(await StatsService().reconcile_counters(session)) == 2
+    async with session_local() as session:
+        assert await StatsService().reconcile_counters(session) == []
+
+    stats = (await client.get("/api/v1/stats")).json()
+    assert {x["user_id"]: x["count"] for x in stats["assignments_per_reviewer"]} == {
+        "u2": 1,
+        "u3": 1,
+    }
+    assert stats["pr_count_by_status"] == {"OPEN": 1, "MERGED": 0}
@@ -0,0 +1,128 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import app.services.pr_service as pr_service_module
+from app.services.stats_service import StatsService
+from app.utils.histogram import histogram_percentile, merge_time_bucket
+
+TEAM_PAYLOAD = {
+    "team_name": "backend",
+    "members": [
+        {"user_id": "u1", "username": "Alice", "is_active": True},
+        {"user_id": "u2", "username": "Bob", "is_active": True},
+        {"user_id": "u3", "username": "Cathy", "is_active": True},
+    ],
+}
+
+
+def test_merge_time_histogram_percentiles():
+    assert merge_time_bucket(0) == 0
+    assert merge_time_bucket(299) == 0
+    assert merge_time_bucket(300) == 1
+    assert merge_time_bucket(10**9) == 15
+
+    # 10 PR в [0, 300), 10 PR в [300, 900)
+    counts = {0: 10, 1: 10}
+    assert histogram_percentile(counts, 0.25) == pytest.approx(150)
+    assert histogram_percentile(counts, 0.75) == pytest.approx(600)
+    assert histogram_percentile({15: 3}, 0.5) == 30 * 24 * 3600
+    assert histogram_percentile({}, 0.5) is None
+
+
+async def _seed(client, monkeypatch):
+    await client.post("/api/v1/team/add_or_update", json=TEAM_PAYLOAD)
+    monkeypatch.setattr(pr_service_module.random, "sample", lambda seq, k: ["u2", "u3"])
+    for pr_id in ("pr_1", "pr_2", "pr_3"):
+        await client.post(
+            "/api/v1/pullRequest/create",
+            json={"pull_request_id": pr_id, "pull_request_name": pr_id, "author_id": "u1"},
+        )
+    await client.post("/api/v1/pullRequest/merge", json={"pull_request_id": "pr_1"})
+
+
+@pytest.mark.asyncio
+async def test_window_stats_from_incremental_rollups(client, monkeypatch):
+    await _seed(client, monkeypatch)
+
+    r = await client.get("/api/v1/stats/window", params={"window": "1d"})
+    assert r.status_code == 200
+    body = r.json()
+    today = datetime.now(UTC).date()
+    assert body["date_from"] == body["date_to"] == today.isoformat()
+    assert body["opened_prs_per_author"] == [{"user_id": "u1", "count": 3}]
+    assert body["merged_prs_per_author"] == [{"user_id": "u1", "count": 1}]
+    assert body["assignments_per_reviewer"] == [
+        {"user_id": "u2", "count": 3},
+        {"user_id": "u3", "count": 3},
+    ]
+    assert body["time_to_merge"]["merged"] == 1
+    assert 0 <= body["time_to_merge"]["p50_seconds"] < 300
+
+    yesterday = (today - timedelta(days=1)).isoformat()
+    r = await client.get("/api/v1/stats/window", params={"from": yesterday, "to": yesterday})
+    assert r.json()["opened_prs_per_author"] == []
+    assert r.json()["time_to_merge"] == {
+        "merged": 0,
+        "p50_seconds": None,
+        "p90_seconds": None,
+        "p99_seconds": None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_backfill_matches_incremental_rollups(client, engine, monkeypatch):
+    await _seed(client, monkeypatch)
+    expected = (await client.get("/api/v1/stats/window", params={"window": "30d"})).json()
+
+    async with engine.begin() as conn:
+        await conn.execute(text("DELETE FROM stats_daily_users"))
+        await conn.execute(text("DELETE FROM stats_daily_merge_time"))
+        # PR из прошлого: попадает в свой день при backfill
+        await conn.execute(
+            text(
+                "UPDATE pull_requests SET created_at = now() - interval '40 days', "
+                "merged_at = now() - interval '38 days' WHERE pull_request_id = 'pr_2'"
+            )
+        )
+
+    session_local = async_sessionmaker(bind=engine)
+    async with session_local() as session:
+        backfilled = await StatsService().backfill_daily(session)
+    assert backfilled is not None
+    day_from, day_to, users_rows, merge_time_rows = backfilled
+    assert (day_to - day_from).days >= 40
+    assert users_rows == 7  # сегодня: u1, u2, u3; -40 дней: u1, u2, u3; -38 дней: u1
+    assert merge_time_rows == 2
+
+    body = (await client.get("/api/v1/stats/window", params={"window": "30d"})).json()
+    assert body["merged_prs_per_author"] == expected["merged_prs_per_author"]
+    assert body["opened_prs_per_author"] == [{"user_id": "u1", "count": 2}]
+    assert body["assignments_per_reviewer"] == [
+        {"user_id": "u2", "count": 2},
+        {"user_id": "u3", "count": 2},
+    ]
+
+    body = (await client.get("/api/v1/stats/window", params={"window": "60d"})).json()
+    assert body["merged_prs_per_author"] == [{"user_id": "u1", "count": 2}]
+    assert body["time_to_merge"]["merged"] == 2
+    assert body["time_to_merge"]["p99_seconds"] >= 24 * 3600
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"window": "week"},
+        {"window": "0d"},
+        {"window": "7d", "from": "2026-01-01"},
+        {"from": "2026-02-01", "to": "2026-01-01"},
+        {"from": "2020-01-01", "to": "2026-01-01"},
+    ],
+)
+async def test_window_stats_rejects_bad_range(client, params):
+    r = await client.get("/api/v1/stats/window", params=params)
+    assert r.status_code == 400
+    assert r.json()["detail"]["error"]["code"] == "BAD_WINDOW"
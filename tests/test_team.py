@@ -42,3 +42,42 @@ async def test_team_add_duplicate_should_conflict_by_openapi(client):
     r2 = await client.post("/api/v1/team/add_or_update", json=TEAM_PAYLOAD)
 
     assert r2.status_code in (200, 201)
+
+
+@pytest.mark.asyncio
+async def test_team_add_or_update_upserts_members_set_based(client):
+    await client.post("/api/v1/team/add_or_update", json=TEAM_PAYLOAD)
+    other = {
+        "team_name": "frontend",
+        "members": [{"user_id": "u3", "username": "Carol", "is_active": True}],
+    }
+    await client.post("/api/v1/team/add_or_update", json=other)
+    frontend_version = (
+        await client.get("/api/v1/team/get", params={"team_name": "frontend"})
+    ).json()["version"]
+
+    # u1 удалён, u2 переименован, u3 уже есть в другой команде, повтор id — последний побеждает;
+    # участники в ответе упорядочены по user_id, как в /team/get
+    payload = {
+        "team_name": "backend",
+        "members": [
+            {"user_id": "u3", "username": "Carol", "is_active": True},
+            {"user_id": "u2", "username": "Bob", "is_active": True},
+            {"user_id": "u2", "username": "Robert", "is_active": False},
+        ],
+    }
+    r = await client.post("/api/v1/team/add_or_update", json=payload)
+    assert r.status_code == 201
+    assert r.json()["team"]["members"] == [
+        {"user_id": "u2", "username": "Robert", "is_active": False},
+        {"user_id": "u3", "username": "Carol", "is_active": True},
+    ]
+
+    r = await client.get("/api/v1/team/get", params={"team_name": "backend"})
+    assert r.json()["team"]["members"] == [
+        {"user_id": "u2", "username": "Robert", "is_active": False},
+        {"user_id": "u3", "username": "Carol", "is_active": True},
+    ]
+    # u3 не изменился: версия другой команды прежняя
+    r = await client.get("/api/v1/team/get", params={"team_name": "frontend"})
+    assert r.json()["version"] == frontend_version
@@ -0,0 +1,85 @@
+import pytest
+
+from app.schemas.team import TeamGetResponse
+from app.services.team_service import team_response_cache
+
+TEAM_PAYLOAD: dict = {
+    "team_name": "backend",
+    "members": [
+        {"user_id": "u2", "username": "Bob", "is_active": True},
+        {"user_id": "u1", "username": "Alice", "is_active": True},
+    ],
+}
+
+
+async def _get_team(client, etag: str | None = None):
+    headers = {"If-None-Match": etag} if etag else {}
+    return await client.get("/api/v1/team/get", params={"team_name": "backend"}, headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_team_get_etag_and_not_modified(client):
+    await client.post("/api/v1/team/add", json=TEAM_PAYLOAD)
+
+    r = await _get_team(client)
+    assert r.status_code == 200
+    etag = r.headers["ETag"]
+    team = TeamGetResponse.model_validate(r.json()).team
+    assert [m.user_id for m in team.members] == ["u1", "u2"]
+
+    r = await _get_team(client, etag)
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["ETag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_team_get_serves_cached_body_until_version_changes(client):
+    await client.post("/api/v1/team/add", json=TEAM_PAYLOAD)
+
+    first = await _get_team(client)
+    second = await _get_team(client)
+    assert second.content == first.content
+    assert team_response_cache.stats().hits == 1
+
+    r = await client.post("/api/v1/users/setIsActive", json={"user_id": "u1", "is_active": False})
+    assert r.status_code == 200
+
+    r = await _get_team(client, first.headers["ETag"])
+    assert r.status_code == 200
+    assert r.headers["ETag"] != first.headers["ETag"]
+    members = {m["user_id"]: m for m in r.json()["team"]["members"]}
+    assert members["u1"]["is_active"] is False
+
+
+@pytest.mark.asyncio
+async def test_team_version_bumped_by_every_mutation(client):
+    await client.post("/api/v1/team/add", json=TEAM_PAYLOAD)
+    etags: list[str] = [(await _get_team(client)).headers["ETag"]]
+
+    async def changed() -> bool:
+        etags.append((await _get_team(client)).headers["ETag"])
+        return etags[-1] != etags[-2]
+
+    renamed = {**TEAM_PAYLOAD, "members": [{**TEAM_PAYLOAD["members"][0], "username": "Robert"}]}
+    await client.post("/api/v1/team/add_or_update", json=renamed)
+    assert await changed()
+
+    # повторная установка того же значения ничего не меняет
+    await client.post("/api/v1/users/setIsActive", json={"user_id": "u2", "is_active": True})
+    assert not await changed()
+
+    await client.post("/api/v1/team/deactivateUsers", json={"team_name": "backend"})
+    assert await changed()
+    r = await _get_team(client)
+    assert r.json()["team"]["members"] == [
+        {"user_id": "u2", "username": "Robert", "is_active": False}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_team_get_not_found_with_etag(client):
+    r = await client.get(
+        "/api/v1/team/get", params={"team_name": "missing"}, headers={"If-None-Match": '"v1"'}
+    )
+    assert r.status_code == 404
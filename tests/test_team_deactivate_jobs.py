@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+import app.services.pr_service as pr_service_module
+from app.core.config import settings
+
+TEAM_PAYLOAD = {
+    "team_name": "backend",
+    "members": [
+        {"user_id": "u1", "username": "Alice", "is_active": True},
+        {"user_id": "u2", "username": "Bob", "is_active": True},
+        {"user_id": "u3", "username": "Cathy", "is_active": True},
+        {"user_id": "u4", "username": "Dan", "is_active": True},
+        {"user_id": "u5", "username": "Eve", "is_active": True},
+    ],
+}
+
+
+async def _wait_for_job(client, job_id: str) -> dict:
+    for _ in range(100):
+        r = await client.get(f"/api/v1/team/deactivateUsers/jobs/{job_id}")
+        assert r.status_code == 200
+        job: dict = r.json()["job"]
+        if job["status"] in ("DONE", "FAILED"):
+            return job
+        await asyncio.sleep(0.05)
+    raise AssertionError("job did not finish")
+
+
+@pytest.mark.asyncio
+async def test_deactivate_users_async_processes_in_chunks(client, monkeypatch):
+    monkeypatch.setattr(settings, "DEACTIVATION_JOB_CHUNK_SIZE", 1)
+    await client.post("/api/v1/team/add_or_update", json=TEAM_PAYLOAD)
+
+    monkeypatch.setattr(pr_service_module.random, "sample", lambda seq, k: ["u2", "u3"])
+    await client.post(
+        "/api/v1/pullRequest/create",
+        json={"pull_request_id": "pr_j1", "pull_request_name": "Job", "author_id": "u1"},
+    )
+
+    r = await client.post(
+        "/api/v1/team/deactivateUsers",
+        params={"async": "true"},
+        json={"team_name": "backend", "user_ids": ["u2", "u3"]},
+    )
+    assert r.status_code == 202
+    job = r.json()["job"]
+    assert job["total_users"] == 2
+
+    job = await _wait_for_job(client, job["job_id"])
+    assert job["status"] == "DONE"
+    assert job["processed_users"] == 2
+    assert set(job["deactivated"]) == {"u2", "u3"}
+    assert job["reassigned_prs"] == 2
+
+    # замены берутся только из тех, кто не попадает под деактивацию
+    r_u4 = await client.get("/api/v1/users/getReview", params={"user_id": "u4"})
+    r_u5 = await client.get("/api/v1/users/getReview", params={"user_id": "u5"})
+    assert len(r_u4.json()["pull_requests"]) == 1
+    assert len(r_u5.json()["pull_requests"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_deactivate_users_async_team_not_found(client):
+    r = await client.post(
+        "/api/v1/team/deactivateUsers",
+        params={"async": "true"},
+        json={"team_name": "missing"},
+    )
+    assert r.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_deactivation_job_not_found(client):
+    r = await client.get("/api/v1/team/deactivateUsers/jobs/missing")
+    assert r.status_code == 404
+    assert r.json()["detail"]["error"]["code"] == "NOT_FOUND"
+
+
+@pytest.mark.asyncio
+async def test_deactivation_job_is_outside_the_request_query_budget(client, monkeypatch):
+    # задача делает больше запросов, чем разрешено запросу, который её запустил
+    monkeypatch.setattr(settings, "QUERY_BUDGET_PER_REQUEST", 20)
+    monkeypatch.setattr(settings, "DEACTIVATION_JOB_CHUNK_SIZE", 1)
+    members = [{"user_id": f"m{i}", "username": f"M{i}", "is_active": True} for i in range(30)]
+    await client.post("/api/v1/team/add", json={"team_name": "big", "members": members})
+
+    r = await client.post(
+        "/api/v1/team/deactivateUsers", params={"async": "true"}, json={"team_name": "big"}
+    )
+    assert r.status_code == 202
+
+    job = await _wait_for_job(client, r.json()["job"]["job_id"])
+    assert job["status"] == "DONE"
+    assert job["processed_users"] == 30
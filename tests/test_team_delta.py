@@ -0,0 +1,92 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.schemas.team import TeamDeltaResponse, TeamGetResponse
+from app.services.team_service import TeamService
+
+TEAM_PAYLOAD = {
+    "team_name": "backend",
+    "members": [
+        {"user_id": "u1", "username": "Alice", "is_active": True},
+        {"user_id": "u2", "username": "Bob", "is_active": True},
+        {"user_id": "u3", "username": "Carol", "is_active": True},
+    ],
+}
+
+
+async def _get_team(client, since: int | None = None):
+    params: dict = {"team_name": "backend"}
+    if since is not None:
+        params["since"] = since
+    r = await client.get("/api/v1/team/get", params=params)
+    assert r.status_code == 200
+    return r.json()
+
+
+@pytest.mark.asyncio
+async def test_team_get_since_returns_only_changes(client):
+    await client.post("/api/v1/team/add", json=TEAM_PAYLOAD)
+    version = (await _get_team(client))["version"]
+
+    members = [
+        {"user_id": "u1", "username": "Alice", "is_active": True},
+        {"user_id": "u2", "username": "Bobby", "is_active": True},
+        {"user_id": "u4", "username": "Dave", "is_active": True},
+    ]
+    await client.post(
+        "/api/v1/team/add_or_update", json={"team_name": "backend", "members": members}
+    )
+    await client.post("/api/v1/users/setIsActive", json={"user_id": "u4", "is_active": False})
+
+    delta = TeamDeltaResponse.model_validate(await _get_team(client, since=version))
+    assert delta.since == version
+    assert delta.version == version + 2
+    assert [(m.user_id, m.username, m.is_active) for m in delta.members] == [
+        ("u2", "Bobby", True),
+        ("u4", "Dave", False),
+    ]
+    assert delta.removed == ["u3"]
+
+    # следующая дельта — только последнее изменение
+    delta = TeamDeltaResponse.model_validate(await _get_team(client, since=version + 1))
+    assert [m.user_id for m in delta.members] == ["u4"]
+    assert delta.removed == []
+
+    delta = TeamDeltaResponse.model_validate(await _get_team(client, since=version + 2))
+    assert delta.members == [] and delta.removed == []
+
+
+@pytest.mark.asyncio
+async def test_team_get_since_falls_back_to_full_snapshot(client, engine):
+    await client.post("/api/v1/team/add", json=TEAM_PAYLOAD)
+    # версия создания не журналируется: дельта от 0 невозможна
+    full = TeamGetResponse.model_validate(await _get_team(client, since=0))
+    assert len(full.team.members) == 3
+
+    for username in ("A1", "A2"):
+        payload = {
+            "team_name": "backend",
+            "members": [{"user_id": "u1", "username": username, "is_active": True}],
+        }
+        await client.post("/api/v1/team/add_or_update", json=payload)
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("UPDATE team_member_changes SET changed_at = :at WHERE version = 2"),
+            {"at": datetime.now(UTC) - timedelta(days=30)},
+        )
+    async with async_sessionmaker(bind=engine)() as session:
+        assert await TeamService().trim_change_log(session) == 3
+
+    # изменения версии 2 вычищены: от версии 1 — полный снимок, от 2 — дельта
+    full = TeamGetResponse.model_validate(await _get_team(client, since=1))
+    assert full.version == 3
+    assert [m.username for m in full.team.members] == ["A2"]
+    delta = TeamDeltaResponse.model_validate(await _get_team(client, since=2))
+    assert [m.username for m in delta.members] == ["A2"]
+
+    # версия из будущего (например, после восстановления БД) — тоже полный снимок
+    assert "team" in await _get_team(client, since=100)
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.utils.ndjson import LineTooLongError, iter_lines
+
+
+def _ndjson(*rows) -> bytes:
+    return "\n".join(row if isinstance(row, str) else json.dumps(row) for row in rows).encode()
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024])
+async def test_iter_lines_splits_across_chunks(chunk_size):
+    data = b'{"a": 1}\n\n' + b"x" * 40 + b'\n{"b": 2}\r\n{"c": 3}'
+    lines = [
+        (line_no, line if isinstance(line, bytes) else type(line))
+        async for line_no, line in iter_lines(_chunks(data, chunk_size), max_line_bytes=20)
+    ]
+    assert lines == [
+        (1, b'{"a": 1}'),
+        (3, LineTooLongError),
+        (4, b'{"b": 2}\r'),
+        (5, b'{"c": 3}'),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_team_import_loads_teams_and_members(client, monkeypatch):
+    monkeypatch.setattr(settings, "TEAM_IMPORT_BATCH_SIZE", 2)
+    await client.post(
+        "/api/v1/team/add",
+        json={
+            "team_name": "backend",
+            "members": [{"user_id": "u1", "username": "Alice", "is_active": True}],
+        },
+    )
+
+    body = _ndjson(
+        {"team_name": "backend", "user_id": "u2", "username": "Bob"},
+        {"team_name": "frontend"},
+        "",
+        "{not json",
+        {"team_name": "frontend", "user_id": "u3"},
+        {"team_name": "frontend", "user_id": "u3", "username": "Carol", "is_active": False},
+        {"team_name": "backend", "user_id": "u1", "username": "Alice Smith"},
+        {"user_id": "u4", "username": "Dave"},
+    )
+    r = await client.post(
+        "/api/v1/team/import", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert r.status_code == 200
+    data = r.json()
+    assert data["lines"] == 7
+    assert data["imported_rows"] == 4
+    assert data["teams_created"] == 1
+    assert data["users_changed"] == 3  # u2, u3 созданы, u1 переименован
+    assert data["members_added"] == 2
+    assert [error["line"] for error in data["errors"]] == [4, 5, 8]
+    assert "username is required" in data["errors"][1]["error"]
+    assert data["errors"][2]["error"].startswith("team_name:")
+
+    r = await client.get("/api/v1/team/get", params={"team_name": "backend"})
+    assert r.json()["team"]["members"] == [
+        {"user_id": "u1", "username": "Alice Smith", "is_active": True},
+        {"user_id": "u2", "username": "Bob", "is_active": True},
+    ]
+    r = await client.get("/api/v1/team/get", params={"team_name": "frontend"})
+    assert r.json()["team"]["members"] == [
+        {"user_id": "u3", "username": "Carol", "is_active": False}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_team_import_truncates_error_report(client, monkeypatch):
+    monkeypatch.setattr(settings, "TEAM_IMPORT_MAX_ERRORS", 2)
+    r = await client.post("/api/v1/team/import", content=_ndjson("[]", "[]", "[]"))
+    data = r.json()
+    assert len(data["errors"]) == 2
+    assert data["errors_truncated"] is True
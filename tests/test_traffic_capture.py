@@ -0,0 +1,132 @@
+import json
+import threading
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.api.middleware import TrafficCaptureMiddleware
+from app.core.config import settings
+from app.core.traffic_capture import CapturedRequest, CaptureWriter
+from app.main import app
+from benchmarks.replay_traffic import apply_thresholds, replay, schedule, summarize
+
+TEAM_PAYLOAD = {
+    "team_name": "backend",
+    "members": [
+        {"user_id": "u1", "username": "Alice", "is_active": True},
+        {"user_id": "u2", "username": "Bob", "is_active": True},
+    ],
+}
+
+
+@pytest.fixture
+def capture_dir(client, tmp_path, monkeypatch):
+    # в приложении middleware подключается при старте, если доля записи больше нуля
+    monkeypatch.setattr(
+        app, "middleware_stack", TrafficCaptureMiddleware(app.build_middleware_stack())
+    )
+    monkeypatch.setattr(settings, "TRAFFIC_CAPTURE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "TRAFFIC_CAPTURE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _records(directory) -> list[dict]:
+    return [
+        json.loads(line)
+        for path in sorted(directory.glob("capture-*.jsonl*"))
+        for line in path.read_text().splitlines()
+    ]
+
+
+@pytest.mark.asyncio
+async def test_api_requests_are_captured(client, capture_dir, monkeypatch):
+    assert (await client.post("/api/v1/team/add", json=TEAM_PAYLOAD)).status_code == 201
+    r = await client.get("/api/v1/team/get", params={"team_name": "backend"})
+    assert r.status_code == 200
+    await client.get("/metrics")
+    monkeypatch.setattr(settings, "TRAFFIC_CAPTURE_MAX_BODY_BYTES", 10)
+    await client.post("/api/v1/team/add", json=TEAM_PAYLOAD)
+
+    add, get, too_big = _records(capture_dir)
+    assert add["method"] == "POST"
+    assert add["route"] == "/api/v1/team/add"
+    assert json.loads(add["body"]) == TEAM_PAYLOAD
+    assert add["headers"] == {"content-type": "application/json"}
+    assert add["status"] == 201
+    assert add["duration_ms"] > 0
+    assert get["query"] == "team_name=backend"
+    assert "body" not in get
+    assert too_big["body_truncated"] is True
+    assert "body" not in too_big
+    assert too_big["status"] == 400
+
+
+@pytest.mark.asyncio
+async def test_capture_is_written_off_the_event_loop(client, capture_dir, monkeypatch):
+    threads = []
+    write = CaptureWriter.write
+
+    def recording_write(self, captured):
+        threads.append(threading.get_ident())
+        write(self, captured)
+
+    monkeypatch.setattr(CaptureWriter, "write", recording_write)
+    await client.get("/api/v1/health")
+    assert threads and threads[0] != threading.get_ident()
+    assert _records(capture_dir)[0]["route"] == "/api/v1/health"
+
+
+def test_capture_files_rotate(tmp_path):
+    writer = CaptureWriter(str(tmp_path), max_file_bytes=1000, max_files=3)
+    for index in range(100):
+        writer.write(CapturedRequest(float(index), "GET", f"/api/v1/x/{index}", "", "/x", {}))
+    writer.close()
+    files = sorted(tmp_path.iterdir())
+    assert len(files) == 3
+    assert all(path.stat().st_size <= 1000 for path in files)
+    # пишется всегда основной файл, предыдущие сдвигаются в .1, .2
+    assert json.loads(writer.path.read_text().splitlines()[-1])["path"] == "/api/v1/x/99"
+
+
+def test_schedule_scales_offsets_and_reorders_within_windows():
+    records = [{"ts": 100 + index, "n": index} for index in range(6)]
+    planned = schedule(records, speed=2, reorder_window=3, seed=1)
+    assert [offset for offset, _ in planned] == [0, 0.5, 1, 1.5, 2, 2.5]
+    order = [record["n"] for _, record in planned]
+    assert sorted(order[:3]) == [0, 1, 2]
+    assert sorted(order[3:]) == [3, 4, 5]
+    assert order != list(range(6))
+    assert schedule(records, speed=2, reorder_window=3, seed=1) == planned
+    assert [offset for offset, _ in schedule(records, 0, 0, 0)] == [0] * 6
+
+
+@pytest.mark.asyncio
+async def test_replay_reports_in_k6_summary_shape(client, capture_dir, monkeypatch):
+    await client.post("/api/v1/team/add", json=TEAM_PAYLOAD)
+    await client.get("/api/v1/team/get", params={"team_name": "backend"})
+    await client.get("/api/v1/users/getReview", params={"user_id": "nobody"})
+    monkeypatch.setattr(settings, "TRAFFIC_CAPTURE_SAMPLE_RATE", 0.0)
+    records = sorted(_records(capture_dir), key=lambda record: record["ts"])
+
+    # повтор по той же базе: команда уже есть — add отвечает 400 вместо 201
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as target:
+        results, wall_seconds, peak = await replay(target, schedule(records, 0, 0, 0), 2)
+    summary = summarize(results, wall_seconds, peak, 2, {"target": "test"})
+
+    metrics = summary["metrics"]
+    assert metrics["http_reqs"]["count"] == 3
+    assert set(metrics["http_req_duration"]) == {"avg", "min", "med", "max", "p(90)", "p(95)"}
+    assert metrics["http_req_failed"] == {"passes": 2, "fails": 1, "value": 2 / 3}
+    assert metrics["checks"]["passes"] == 2
+    assert 1 <= metrics["vus"]["max"] <= 2
+    checks = summary["root_group"]["checks"]
+    add_check = checks["POST /api/v1/team/add status as captured"]
+    assert (add_check["passes"], add_check["fails"]) == (0, 1)
+    assert add_check["path"] == "::POST /api/v1/team/add status as captured"
+
+    crossed = apply_thresholds(
+        summary, ["http_req_duration:p(95)<60000", "http_req_failed:rate<0.001"]
+    )
+    assert crossed == ["http_req_failed: rate<0.001 (actual 0.666667)"]
+    assert metrics["http_req_duration"]["thresholds"] == {"p(95)<60000": False}
+    assert metrics["http_req_failed"]["thresholds"] == {"rate<0.001": True}
@@ -1,4 +1,8 @@
 import pytest
+from sqlalchemy import text
+
+import app.services.pr_service as pr_service_module
+from app.utils.cursor import decode_cursor
 
 TEAM_PAYLOAD = {
     "team_name": "backend",
@@ -44,3 +48,70 @@ async def test_users_get_review_user_not_found(client):
     r = await client.get("/api/v1/users/getReview", params={"user_id": "missing"})
     assert r.status_code == 404
     assert r.json()["detail"]["error"]["code"] == "NOT_FOUND"
+
+
+@pytest.mark.asyncio
+async def test_users_get_review_paginates_newest_first(client, engine, monkeypatch):
+    await client.post("/api/v1/team/add_or_update", json=TEAM_PAYLOAD)
+    monkeypatch.setattr(pr_service_module.random, "sample", lambda seq, k: ["u2", "u3"])
+    for i in range(5):
+        await client.post(
+            "/api/v1/pullRequest/create",
+            json={"pull_request_id": f"pr_{i}", "pull_request_name": f"P{i}", "author_id": "u1"},
+        )
+    await client.post("/api/v1/pullRequest/merge", json={"pull_request_id": "pr_3"})
+
+    seen: list[str] = []
+    cursor = None
+    while True:
+        params = {"user_id": "u2", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        r = await client.get("/api/v1/users/getReview", params=params)
+        assert r.status_code == 200
+        body = r.json()
+        assert len(body["pull_requests"]) <= 2
+        seen += [pr["pull_request_id"] for pr in body["pull_requests"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == ["pr_4", "pr_3", "pr_2", "pr_1", "pr_0"]
+
+    # курсор строится из ключа сортировки страницы — pr_reviewers.pr_created_at
+    r = await client.get("/api/v1/users/getReview", params={"user_id": "u2", "limit": 2})
+    async with engine.connect() as conn:
+        key = await conn.execute(
+            text(
+                "SELECT pr_created_at, pull_request_id FROM pr_reviewers "
+                "WHERE reviewer_id = 'u2' AND pull_request_id = 'pr_3'"
+            )
+        )
+    assert decode_cursor(r.json()["next_cursor"]) == tuple(key.one())
+
+    r = await client.get("/api/v1/users/getReview", params={"user_id": "u2", "status": "OPEN"})
+    body = r.json()
+    assert [pr["pull_request_id"] for pr in body["pull_requests"]] == [
+        "pr_4",
+        "pr_2",
+        "pr_1",
+        "pr_0",
+    ]
+    assert body["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"cursor": "not-a-cursor"},
+        {"limit": 0},
+        {"limit": 100_000},
+        {"status": "CLOSED"},
+    ],
+)
+async def test_users_get_review_rejects_bad_params(client, params):
+    await client.post("/api/v1/team/add_or_update", json=TEAM_PAYLOAD)
+    r = await client.get("/api/v1/users/getReview", params={"user_id": "u2", **params})
+    assert r.status_code in (400, 422)
+    if "cursor" in params:
+        assert r.json()["detail"]["error"]["code"] == "BAD_CURSOR"